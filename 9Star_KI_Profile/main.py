@@ -1,76 +1,98 @@
 import datetime
+from types import MappingProxyType
 from typing import Dict, Tuple
 
+# Element ids and their display names
+WATER, WOOD, FIRE, EARTH, METAL = range(5)
+ELEMENT_NAMES = ("Water", "Wood", "Fire", "Earth", "Metal")
+
+# Element associations for each number
+ELEMENTS = MappingProxyType({
+    1: (WATER, "The Diplomat", "Introspective, wise, flexible"),
+    2: (EARTH, "The Nurturer", "Gentle, supportive, detail-oriented"),
+    3: (WOOD, "The Pioneer", "Energetic, impulsive, action-oriented"),
+    4: (WOOD, "The Charmer", "Romantic, creative, social"),
+    5: (EARTH, "The Leader", "Powerful, commanding, transformative"),
+    6: (METAL, "The Mentor", "Responsible, perfectionist, idealistic"),
+    7: (METAL, "The Innovator", "Communicative, playful, pleasure-seeking"),
+    8: (EARTH, "The Influencer", "Ambitious, determined, results-driven"),
+    9: (FIRE, "The Inspiration", "Passionate, visionary, charismatic")
+})
+
+# Element interactions, indexed by element id
+SUPPORTIVE_CYCLES = (
+    (WOOD,),   # Water
+    (FIRE,),   # Wood
+    (EARTH,),  # Fire
+    (METAL,),  # Earth
+    (WATER,)   # Metal
+)
+
+CHALLENGING_CYCLES = (
+    (FIRE,),   # Water
+    (EARTH,),  # Wood
+    (METAL,),  # Fire
+    (WATER,),  # Earth
+    (WOOD,)    # Metal
+)
+
+# Main number per (gender, reduced birth-year digit sum), wrapped into 1..9
+MAIN_NUMBERS = MappingProxyType({
+    **{('m', r): (10 - r) % 9 + 1 for r in range(1, 10)},
+    **{('f', r): (r + 3) % 9 + 1 for r in range(1, 10)}
+})
+
+# Energy number per [main number][birth month] and trend number per
+# [energy number][birth day]; index 0 pads the 1-based inputs
+ENERGY_NUMBERS = tuple(
+    tuple((main + month - 2) % 9 + 1 for month in range(13)) for main in range(10)
+)
+TREND_NUMBERS = tuple(
+    tuple((energy + day - 2) % 9 + 1 for day in range(32)) for energy in range(10)
+)
+
+# Universal year energy cycle (Lo Shu square movement), starting from 2000 = 5
+CYCLE_PATTERN = (5, 6, 7, 8, 9, 1, 2, 3, 4)
+
+# Auspicious direction per main number; index 0 pads the 1-based numbers
+DIRECTIONS = (None, "North", "Southwest", "East", "Southeast", "Center",
+              "Northwest", "West", "Northeast", "South")
+
+BANNER = "=" * 50
+
 class NineStarKiCalculator:
-    def __init__(self):
-        # Element associations for each number
-        self.elements = {
-            1: ("Water", "The Diplomat", "Introspective, wise, flexible"),
-            2: ("Earth", "The Nurturer", "Gentle, supportive, detail-oriented"),
-            3: ("Wood", "The Pioneer", "Energetic, impulsive, action-oriented"),
-            4: ("Wood", "The Charmer", "Romantic, creative, social"),
-            5: ("Earth", "The Leader", "Powerful, commanding, transformative"),
-            6: ("Metal", "The Mentor", "Responsible, perfectionist, idealistic"),
-            7: ("Metal", "The Innovator", "Communicative, playful, pleasure-seeking"),
-            8: ("Earth", "The Influencer", "Ambitious, determined, results-driven"),
-            9: ("Fire", "The Inspiration", "Passionate, visionary, charismatic")
-        }
-        
-        # Element interactions
-        self.supportive_cycles = {
-            "Water": ["Wood"],
-            "Wood": ["Fire"],
-            "Fire": ["Earth"],
-            "Earth": ["Metal"],
-            "Metal": ["Water"]
-        }
-        
-        self.challenging_cycles = {
-            "Water": ["Fire"],
-            "Fire": ["Metal"],
-            "Metal": ["Wood"],
-            "Wood": ["Earth"],
-            "Earth": ["Water"]
-        }
+    # Shared lookup tables - built once at import, not per instance
+    elements = ELEMENTS
+    supportive_cycles = SUPPORTIVE_CYCLES
+    challenging_cycles = CHALLENGING_CYCLES
         
     def calculate_main_number(self, birth_year: int, gender: str) -> int:
         """Calculate main energy number from birth year and gender"""
         # Sum digits of birth year
-        year_sum = sum(int(digit) for digit in str(birth_year))
+        year = abs(birth_year)
+        year_sum = 0
+        while year:
+            year_sum += year % 10
+            year //= 10
         # Reduce to single digit
         reduced = (year_sum - 1) % 9 + 1
         
-        if gender.lower() == 'm':
-            # Male calculation
-            main_num = 11 - reduced
-            if main_num <= 0:
-                main_num += 9
-        else:
-            # Female calculation
-            main_num = reduced + 4
-            if main_num > 9:
-                main_num -= 9
-        
-        return main_num
+        return MAIN_NUMBERS[('m' if gender.lower() == 'm' else 'f', reduced)]
     
     def calculate_energy_number(self, birth_month: int, main_num: int) -> int:
         """Calculate energy number from birth month and main number"""
-        # Simple calculation based on month and main number
-        energy_num = (main_num + birth_month - 1) % 9
-        return 9 if energy_num == 0 else energy_num
+        return ENERGY_NUMBERS[main_num][birth_month]
     
     def calculate_trend_number(self, birth_day: int, energy_num: int) -> int:
         """Calculate trend number from birth day and energy number"""
-        trend_num = (energy_num + birth_day - 1) % 9
-        return 9 if trend_num == 0 else trend_num
+        return TREND_NUMBERS[energy_num][birth_day]
     
     def get_current_year_energy(self) -> int:
         """Calculate universal energy number for current Gregorian year"""
         current_year = datetime.datetime.now().year
         
-        # The cycle pattern (based on Lo Shu square movement)
+        # The cycle pattern (CYCLE_PATTERN) follows the Lo Shu square movement
         # This is a simplified calculation - in practice it follows the Flying Star pattern
-        cycle_pattern = [5, 6, 7, 8, 9, 1, 2, 3, 4]
         
         # Base year 2000 had energy 5
         base_year = 2000
@@ -80,23 +102,23 @@ class NineStarKiCalculator:
         years_diff = current_year - base_year
         energy_index = (years_diff % 9)
         
-        return cycle_pattern[energy_index]
+        return CYCLE_PATTERN[energy_index]
     
-    def get_element_interaction(self, user_element: str, year_element: str) -> Tuple[str, str]:
-        """Determine the interaction between user's element and year's element"""
+    def get_element_interaction(self, user_element: int, year_element: int) -> Tuple[str, str]:
+        """Determine the interaction between user's element and year's element (element ids)"""
         if user_element == year_element:
             return "Neutral", "You are in harmony with this year's energy. Focus on stability and consistency."
         
-        if year_element in self.supportive_cycles.get(user_element, []):
+        if year_element in self.supportive_cycles[user_element]:
             return "Supportive", "This year's energy supports you. A great time for growth and new beginnings."
         
-        if user_element in self.supportive_cycles.get(year_element, []):
+        if user_element in self.supportive_cycles[year_element]:
             return "Nourishing", "You nourish this year's energy. Focus on giving and contribution."
         
-        if year_element in self.challenging_cycles.get(user_element, []):
+        if year_element in self.challenging_cycles[user_element]:
             return "Challenging", "This year may bring challenges. Focus on patience and adaptability."
         
-        if user_element in self.challenging_cycles.get(year_element, []):
+        if user_element in self.challenging_cycles[year_element]:
             return "Controlling", "You control this year's energy. A good time for leadership and making changes."
         
         return "Neutral", "A balanced year. Focus on maintaining harmony."
@@ -110,7 +132,7 @@ class NineStarKiCalculator:
         
         forecast = f"""
         YEARLY FORECAST:
-        Your Energy ({user_num} {user_element}) meets Year Energy ({year_num} {year_element})
+        Your Energy ({user_num} {ELEMENT_NAMES[user_element]}) meets Year Energy ({year_num} {ELEMENT_NAMES[year_element]})
         Interaction: {interaction}
         
         {advice}
@@ -133,9 +155,9 @@ class NineStarKiCalculator:
         return forecast
 
 def main():
-    print("=" * 50)
+    print(BANNER)
     print("      9 STAR KI ENERGY CALCULATOR")
-    print("=" * 50)
+    print(BANNER)
     
     calculator = NineStarKiCalculator()
     
@@ -156,74 +178,62 @@ def main():
     year_energy = calculator.get_current_year_energy()
     
     # Display results
-    print("\n" + "=" * 50)
+    print("\n" + BANNER)
     print("YOUR 9 STAR KI PROFILE")
-    print("=" * 50)
+    print(BANNER)
     
     # Main number
     element, archetype, traits = calculator.elements[main_num]
-    print(f"\nMAIN ENERGY ({main_num} - {element}):")
+    print(f"\nMAIN ENERGY ({main_num} - {ELEMENT_NAMES[element]}):")
     print(f"Archetype: {archetype}")
     print(f"Traits: {traits}")
     
     # Energy number
     element_e, archetype_e, traits_e = calculator.elements[energy_num]
-    print(f"\nHEART ENERGY ({energy_num} - {element_e}):")
+    print(f"\nHEART ENERGY ({energy_num} - {ELEMENT_NAMES[element_e]}):")
     print(f"Your inner emotional world and motivations")
     
     # Trend number
     element_t, archetype_t, traits_t = calculator.elements[trend_num]
-    print(f"\nTREND ENERGY ({trend_num} - {element_t}):")
+    print(f"\nTREND ENERGY ({trend_num} - {ELEMENT_NAMES[element_t]}):")
     print(f"How you express yourself outwardly")
     
-    print("\n" + "=" * 50)
+    print("\n" + BANNER)
     print(f"UNIVERSAL ENERGY FOR {current_year}")
-    print("=" * 50)
+    print(BANNER)
     
     year_element, year_archetype, year_traits = calculator.elements[year_energy]
-    print(f"\nCurrent Year Energy: {year_energy} - {year_element}")
+    print(f"\nCurrent Year Energy: {year_energy} - {ELEMENT_NAMES[year_element]}")
     print(f"Theme: {year_archetype}")
     print(f"Global Influence: {year_traits}")
     
     # Get forecast
     forecast = calculator.get_forecast(main_num, year_energy)
-    print("\n" + "=" * 50)
+    print("\n" + BANNER)
     print("PERSONAL YEARLY FORECAST")
-    print("=" * 50)
+    print(BANNER)
     print(forecast)
     
     # Additional insights
-    print("\n" + "=" * 50)
+    print("\n" + BANNER)
     print("QUICK INSIGHTS")
-    print("=" * 50)
+    print(BANNER)
     
     # Lucky directions (simplified)
-    directions = {
-        1: "North",
-        2: "Southwest",
-        3: "East",
-        4: "Southeast",
-        5: "Center",
-        6: "Northwest",
-        7: "West",
-        8: "Northeast",
-        9: "South"
-    }
-    
-    print(f"\nYour Auspicious Direction: {directions[main_num]}")
+    print(f"\nYour Auspicious Direction: {DIRECTIONS[main_num]}")
     
     # Element compatibility
     user_element = calculator.elements[main_num][0]
-    compatible_elements = calculator.supportive_cycles.get(user_element, [])
-    challenging_elements = calculator.challenging_cycles.get(user_element, [])
+    compatible_elements = [ELEMENT_NAMES[e] for e in calculator.supportive_cycles[user_element]]
+    challenging_elements = [ELEMENT_NAMES[e] for e in calculator.challenging_cycles[user_element]]
     
-    print(f"\nYour element ({user_element}) works well with: {', '.join(compatible_elements) if compatible_elements else 'All elements in balance'}")
+    print(f"\nYour element ({ELEMENT_NAMES[user_element]}) works well with: {', '.join(compatible_elements) if compatible_elements else 'All elements in balance'}")
     print(f"Your element may face challenges with: {', '.join(challenging_elements) if challenging_elements else 'None - you harmonize well'}")
     
-    print("\n" + "=" * 50)
+    print("\n" + BANNER)
     print("Remember: 9 Star Ki is a guide, not a destiny.")
     print("Use this energy awareness to make conscious choices.")
-    print("=" * 50)
+    print(BANNER)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
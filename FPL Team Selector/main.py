@@ -1,163 +1,209 @@
-import urllib.request
 import json
-from pulp import *
-
-# Fetch static data (players, teams, gameweeks)
-bootstrap_url = "https://fantasy.premierleague.com/api/bootstrap-static/"
-with urllib.request.urlopen(bootstrap_url) as response:
-    bootstrap_data = json.loads(response.read().decode())
-
-players = bootstrap_data['elements']
-teams = bootstrap_data['teams']
-events = bootstrap_data['events']
-
-# Next gameweek
-next_gw = next((event['id'] for event in events if event['is_next']), None)
-if next_gw is None:
-    print("No upcoming gameweek found.")
-    exit()
-
-# Fetch fixtures for next gameweek
-fixtures_url = f"https://fantasy.premierleague.com/api/fixtures/?event={next_gw}"
-with urllib.request.urlopen(fixtures_url) as response:
-    fixtures = json.loads(response.read().decode())
-
-# Group fixtures by team: team_id -> list of {'opp_id': int, 'diff': int, 'home': bool}
-team_fixtures = {t['id']: [] for t in teams}
-for f in fixtures:
-    team_fixtures[f['team_h']].append({'opp_id': f['team_a'], 'diff': f['team_h_difficulty'], 'home': True})
-    team_fixtures[f['team_a']].append({'opp_id': f['team_h'], 'diff': f['team_a_difficulty'], 'home': False})
-
-# Average team strength for normalization
-avg_strength = sum(t['strength'] for t in teams) / len(teams)
-
-# Compute expected points for available players
-expected_points = {}
-for player in players:
-    team_id = player['team']
-    fixes = team_fixtures[team_id]
-    if not fixes:
-        continue  # Blank gameweek
-
-    chance = player['chance_of_playing_next_round']
-    if chance == 0:
-        continue  # Injured/suspended/unavailable
-    chance_factor = (chance if chance is not None else 100) / 100.0
-
-    base = (float(player['points_per_game']) * 0.4 + float(player['form']) * 0.6)  # Weight form higher
-    ict_boost = float(player['ict_index']) / 100 * 0.2  # Small boost for impact
-
-    exp = 0.0
-    for fix in fixes:
-        opp_id = fix['opp_id']
-        opp_strength = next(t['strength'] for t in teams if t['id'] == opp_id)
-        strength_factor = avg_strength / opp_strength  # >1 for weaker opponents
-        diff_factor = (6 - fix['diff']) / 5.0
-        home_bonus = 1.2 if fix['home'] else 0.9
-        fix_exp = base * diff_factor * home_bonus * strength_factor * (1 + ict_boost)
-        exp += fix_exp
-
-    exp *= chance_factor
-    expected_points[player['id']] = round(exp, 2)
-
-    # Store for later use
-    player['expected_points'] = expected_points[player['id']]
-    player['fixtures'] = fixes  # For reasons
-    player['chance'] = chance if chance is not None else 100
-    player['form_val'] = float(player['form'])
-    player['ppg_val'] = float(player['points_per_game'])
-    player['ict_val'] = float(player['ict_index'])
-
-# Filter available players
-avail_players = [p for p in players if p['id'] in expected_points]
-
-# Squad Optimization (full rebuild, e.g., wildcard)
-prob = LpProblem("FPL_Squad", LpMaximize)
-select = LpVariable.dicts("Select", (p['id'] for p in avail_players), cat='Binary')
-prob += lpSum([select[p['id']] * expected_points[p['id']] for p in avail_players])
-prob += lpSum([select[p['id']] * (p['now_cost'] / 10.0) for p in avail_players]) <= 100.0  # Budget 100m
-prob += lpSum(select[p['id']] for p in avail_players) == 15  # Squad size
-pos_counts = {1: 2, 2: 5, 3: 5, 4: 3}  # GK, DEF, MID, FWD
-for pos, count in pos_counts.items():
-    prob += lpSum([select[p['id']] for p in avail_players if p['element_type'] == pos]) == count
-for team_id in range(1, 21):
-    prob += lpSum([select[p['id']] for p in avail_players if p['team'] == team_id]) <= 3
-prob.solve(PULP_CBC_CMD(msg=0))
-
-if LpStatus[prob.status] != 'Optimal':
-    print("No optimal squad found.")
-    exit()
-
-selected = [p for p in avail_players if select[p['id']].value() == 1]
-total_cost = sum(p['now_cost'] / 10.0 for p in selected)
-squad_expected = sum(p['expected_points'] for p in selected)
-
-# Starting 11 Optimization: Test formations and pick best (incl. captain double)
-formations = [(3,5,2), (3,4,3), (4,4,2), (4,3,3), (4,5,1), (5,4,1), (5,3,2)]
-best_form = None
-best_proj = 0
-best_lineup = []
-best_captain = None
-best_vice = None
-for def_c, mid_c, fwd_c in formations:
-    prob2 = LpProblem("FPL_Lineup", LpMaximize)
-    select2 = LpVariable.dicts("Select2", (p['id'] for p in selected), cat='Binary')
-    prob2 += lpSum([select2[p['id']] * expected_points[p['id']] for p in selected])
-    prob2 += lpSum(select2[p['id']] for p in selected) == 11
-    prob2 += lpSum([select2[p['id']] for p in selected if p['element_type'] == 1]) == 1  # 1 GK
-    prob2 += lpSum([select2[p['id']] for p in selected if p['element_type'] == 2]) == def_c
-    prob2 += lpSum([select2[p['id']] for p in selected if p['element_type'] == 3]) == mid_c
-    prob2 += lpSum([select2[p['id']] for p in selected if p['element_type'] == 4]) == fwd_c
-    prob2.solve(PULP_CBC_CMD(msg=0))
-
-    if LpStatus[prob2.status] == 'Optimal':
-        lineup = [p for p in selected if select2[p['id']].value() == 1]
-        lineup_sum = sum(p['expected_points'] for p in lineup)
-        exps = sorted([p['expected_points'] for p in lineup], reverse=True)
-        cap_bonus = exps[0] if exps else 0  # Captain double
-        proj_total = lineup_sum + cap_bonus
-        if proj_total > best_proj:
-            best_proj = proj_total
-            best_form = f"{def_c}-{mid_c}-{fwd_c}"
-            best_lineup = lineup
-            best_captain = max(lineup, key=lambda p: p['expected_points'])
-            best_vice = sorted(lineup, key=lambda p: p['expected_points'], reverse=True)[1]
-
-# Bench: Remaining, sorted by expected descending
-bench = sorted([p for p in selected if p not in best_lineup], key=lambda p: p['expected_points'], reverse=True)
-
-# Helper to get team name
-def get_team_name(tid):
-    return next(t['short_name'] for t in teams if t['id'] == tid)
-
-# Output
-print(f"Optimal Team for Gameweek {next_gw} (Total Cost: {total_cost}m, Squad Expected Points: {squad_expected}, Lineup Projected Points with Captain: {best_proj})")
-print(f"Recommended Formation: {best_form}")
-print("\nStarting 11:")
-
-positions = {1: 'GK', 2: 'DEF', 3: 'MID', 4: 'FWD'}
-for pos in [1, 2, 3, 4]:
-    pos_players = sorted([p for p in best_lineup if p['element_type'] == pos], key=lambda p: p['expected_points'], reverse=True)
-    if pos_players:
-        print(f"\n{positions[pos]}:")
-        for p in pos_players:
-            price = p['now_cost'] / 10.0
-            team_name = get_team_name(p['team'])
-            fix_str = ', '.join(f"vs {get_team_name(f['opp_id'])} ({'H' if f['home'] else 'A'}, diff {f['diff']})" for f in p['fixtures'])
-            reason = f"Selected for high expected {p['expected_points']} pts (form {p['form_val']}, PPG {p['ppg_val']}, ICT {p['ict_val']}); favorable fixtures: {fix_str}; chance {p['chance']}%; strong vs opponent strength."
-            print(f"- {p['web_name']} ({team_name}, {price}m, Pos: {positions[pos]}) - Expected: {p['expected_points']} - Reason: {reason}")
-            if p == best_captain:
-                print("  (Captain - Double points potential)")
-            elif p == best_vice:
-                print("  (Vice-Captain)")
-
-print("\nBench (in priority order):")
-for p in bench:
-    price = p['now_cost'] / 10.0
-    team_name = get_team_name(p['team'])
-    pos_name = positions[p['element_type']]
-    fix_str = ', '.join(f"vs {get_team_name(f['opp_id'])} ({'H' if f['home'] else 'A'}, diff {f['diff']})" for f in p['fixtures'])
-    reason = f"Backup with {p['expected_points']} pts potential (form {p['form_val']}, PPG {p['ppg_val']}); fixtures: {fix_str}; chance {p['chance']}%."
-    print(f"- {p['web_name']} ({team_name}, {price}m, Pos: {pos_name}) - Expected: {p['expected_points']} - Reason: {reason}")
-
-print("\nWhat you stand to gain: This team maximizes projected points by balancing form, fixtures, and value. Use wildcard if needed for full changes; otherwise, adapt for limited transfers.")
\ No newline at end of file
+import numpy as np
+
+
+def fetch_json(url):
+    """Fetch and decode a JSON payload from the FPL API."""
+    import urllib.request  # Deferred so importing this module stays cheap
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read().decode())
+
+
+def solve_squad(avail_players, avail_by_pos, avail_by_team, expected_points):
+    """Pick the best 15-man squad under budget, position and team limits; None if no optimal squad."""
+    from pulp import LpProblem, LpMaximize, LpVariable, LpStatus, PULP_CBC_CMD, lpSum  # PuLP is slow to import
+
+    prob = LpProblem("FPL_Squad", LpMaximize)
+    select = LpVariable.dicts("Select", (p['id'] for p in avail_players), cat='Binary')
+    prob += lpSum([select[p['id']] * expected_points[p['id']] for p in avail_players])
+    prob += lpSum([select[p['id']] * (p['now_cost'] / 10.0) for p in avail_players]) <= 100.0  # Budget 100m
+    prob += lpSum(select[p['id']] for p in avail_players) == 15  # Squad size
+    pos_counts = {1: 2, 2: 5, 3: 5, 4: 3}  # GK, DEF, MID, FWD
+    for pos, count in pos_counts.items():
+        prob += lpSum([select[p['id']] for p in avail_by_pos[pos]]) == count
+    for team_id in range(1, 21):
+        prob += lpSum([select[p['id']] for p in avail_by_team.get(team_id, [])]) <= 3
+    prob.solve(PULP_CBC_CMD(msg=0))
+
+    if LpStatus[prob.status] != 'Optimal':
+        return None
+    return [p for p in avail_players if select[p['id']].value() == 1]
+
+
+def main():
+    # Fetch static data (players, teams, gameweeks)
+    bootstrap_data = fetch_json("https://fantasy.premierleague.com/api/bootstrap-static/")
+
+    players = bootstrap_data['elements']
+    teams = bootstrap_data['teams']
+    events = bootstrap_data['events']
+
+    # Next gameweek
+    next_gw = next((event['id'] for event in events if event['is_next']), None)
+    if next_gw is None:
+        print("No upcoming gameweek found.")
+        return
+
+    # Fetch fixtures for next gameweek
+    fixtures = fetch_json(f"https://fantasy.premierleague.com/api/fixtures/?event={next_gw}")
+
+    # Group fixtures by team: team_id -> list of {'opp_id': int, 'diff': int, 'home': bool}
+    team_fixtures = {t['id']: [] for t in teams}
+    for f in fixtures:
+        team_fixtures[f['team_h']].append({'opp_id': f['team_a'], 'diff': f['team_h_difficulty'], 'home': True})
+        team_fixtures[f['team_a']].append({'opp_id': f['team_h'], 'diff': f['team_a_difficulty'], 'home': False})
+
+    # Team strength indexed by team id, and average team strength for normalization
+    team_strength = np.zeros(max(team_fixtures) + 1)
+    team_strength[[t['id'] for t in teams]] = [t['strength'] for t in teams]
+    avg_strength = float(sum(t['strength'] for t in teams)) / len(teams)
+
+    # One (team, opponent, difficulty, home) row per team fixture, as column arrays
+    fix_table = np.array([(tid, fix['opp_id'], fix['diff'], fix['home'])
+                          for tid, fixes in team_fixtures.items() for fix in fixes], dtype=float).reshape(-1, 4)
+    fix_team, fix_opp = fix_table[:, 0].astype(np.intp), fix_table[:, 1].astype(np.intp)
+
+    # Per-team fixture multiplier (indexed by team id): identical for every player on the same team
+    fix_mult = (((6 - fix_table[:, 2]) / 5.0)  # Easier fixtures score higher
+                * np.where(fix_table[:, 3] > 0, 1.2, 0.9)  # Home bonus
+                * (avg_strength / team_strength[fix_opp]))  # >1 for weaker opponents
+    team_fix_mult = np.bincount(fix_team, weights=fix_mult, minlength=len(team_strength))
+
+    # Players with a fixture who are not ruled out, with numeric fields cast in the same pass
+    size = len(players)
+    form, ppg, ict, chance = np.empty(size), np.empty(size), np.empty(size), np.empty(size)
+    team_idx = np.empty(size, dtype=np.intp)
+    active = []
+    for player in players:
+        fixes = team_fixtures[player['team']]
+        if not fixes:
+            continue  # Blank gameweek
+
+        chance_val = player['chance_of_playing_next_round']
+        if chance_val == 0:
+            continue  # Injured/suspended/unavailable
+
+        if chance_val is None:
+            chance_val = 100  # No injury news
+
+        i = len(active)
+        form[i] = float(player['form'])
+        ppg[i] = float(player['points_per_game'])
+        ict[i] = float(player['ict_index'])
+        team_idx[i] = player['team']
+        chance[i] = chance_val
+        active.append(player)
+
+    # Compute expected points for all available players in one pass
+    n = len(active)
+    form, ppg, ict, chance, team_idx = form[:n], ppg[:n], ict[:n], chance[:n], team_idx[:n]
+
+    base = ppg * 0.4 + form * 0.6  # Weight form higher
+    ict_boost = ict / 100 * 0.2  # Small boost for impact
+    exp = base * (1 + ict_boost) * team_fix_mult[team_idx] * (chance / 100.0)
+
+    # Only the score goes back onto every player; display fields are attached to the printed 15 below
+    expected_points = {}
+    for player, exp_val in zip(active, exp.tolist()):
+        expected_points[player['id']] = exp_val
+        player['expected_points'] = exp_val
+
+    # Filter available players, bucketed once by position and team for the squad constraints
+    avail_players = [p for p in players if p['id'] in expected_points]
+    avail_by_pos = {1: [], 2: [], 3: [], 4: []}
+    avail_by_team = {}
+    for p in avail_players:
+        avail_by_pos[p['element_type']].append(p)
+        avail_by_team.setdefault(p['team'], []).append(p)
+
+    # Squad Optimization (full rebuild, e.g., wildcard)
+    selected = solve_squad(avail_players, avail_by_pos, avail_by_team, expected_points)
+    if selected is None:
+        print("No optimal squad found.")
+        return
+
+    total_cost = sum(p['now_cost'] / 10.0 for p in selected)
+    squad_expected = sum(p['expected_points'] for p in selected)
+
+    # Starting 11 Optimization: Test formations and pick best (incl. captain double)
+    formations = [(3,5,2), (3,4,3), (4,4,2), (4,3,3), (4,5,1), (5,4,1), (5,3,2)]
+    best_form = None
+    best_proj = 0
+    best_lineup = []
+    best_captain = None
+    best_vice = None
+    # Only per-position counts apply, so each formation's best lineup is the top players per position
+    by_pos = {1: [], 2: [], 3: [], 4: []}
+    for p in selected:
+        by_pos[p['element_type']].append(p)
+    for group in by_pos.values():
+        group.sort(key=lambda p: expected_points[p['id']], reverse=True)
+    for def_c, mid_c, fwd_c in formations:
+        counts = {1: 1, 2: def_c, 3: mid_c, 4: fwd_c}  # 1 GK
+        if all(len(by_pos[pos]) >= n for pos, n in counts.items()):
+            picked = {p['id'] for pos, n in counts.items() for p in by_pos[pos][:n]}
+            lineup = [p for p in selected if p['id'] in picked]
+            lineup_sum = sum(p['expected_points'] for p in lineup)
+            exps = sorted([p['expected_points'] for p in lineup], reverse=True)
+            cap_bonus = exps[0] if exps else 0  # Captain double
+            proj_total = lineup_sum + cap_bonus
+            if proj_total > best_proj:
+                best_proj = proj_total
+                best_form = f"{def_c}-{mid_c}-{fwd_c}"
+                best_lineup = lineup
+                best_captain = max(lineup, key=lambda p: p['expected_points'])
+                best_vice = sorted(lineup, key=lambda p: p['expected_points'], reverse=True)[1]
+
+    # Bench: Remaining, sorted by expected descending
+    lineup_ids = {p['id'] for p in best_lineup}
+    bench = sorted((p for p in selected if p['id'] not in lineup_ids), key=lambda p: p['expected_points'], reverse=True)
+
+    # Team short names by id, for output
+    team_name_by_id = {t['id']: t['short_name'] for t in teams}
+
+    # Reasons shown for each squad player
+    for p in selected:
+        chance_val = p['chance_of_playing_next_round']
+        p['fixtures'] = team_fixtures[p['team']]
+        p['chance'] = 100 if chance_val is None else chance_val
+        p['form_val'] = float(p['form'])
+        p['ppg_val'] = float(p['points_per_game'])
+        p['ict_val'] = float(p['ict_index'])
+        p['_fix_str'] = ', '.join(f"vs {team_name_by_id[f['opp_id']]} ({'H' if f['home'] else 'A'}, diff {f['diff']})" for f in p['fixtures'])
+        p['_price_str'] = f"{p['now_cost'] / 10.0}"
+
+    # Output
+    print(f"Optimal Team for Gameweek {next_gw} (Total Cost: {total_cost}m, Squad Expected Points: {squad_expected:.2f}, Lineup Projected Points with Captain: {best_proj:.2f})")
+    print(f"Recommended Formation: {best_form}")
+    print("\nStarting 11:")
+
+    positions = {1: 'GK', 2: 'DEF', 3: 'MID', 4: 'FWD'}
+    lineup_by_pos = {1: [], 2: [], 3: [], 4: []}
+    for p in best_lineup:
+        lineup_by_pos[p['element_type']].append(p)
+    captain_id, vice_id = best_captain['id'], best_vice['id']  # Compare ids, not whole player dicts
+    for pos in [1, 2, 3, 4]:
+        pos_players = sorted(lineup_by_pos[pos], key=lambda p: p['expected_points'], reverse=True)
+        if pos_players:
+            print(f"\n{positions[pos]}:")
+            for p in pos_players:
+                team_name = team_name_by_id[p['team']]
+                reason = f"Selected for high expected {p['expected_points']:.2f} pts (form {p['form_val']}, PPG {p['ppg_val']}, ICT {p['ict_val']}); favorable fixtures: {p['_fix_str']}; chance {p['chance']}%; strong vs opponent strength."
+                print(f"- {p['web_name']} ({team_name}, {p['_price_str']}m, Pos: {positions[pos]}) - Expected: {p['expected_points']:.2f} - Reason: {reason}")
+                if p['id'] == captain_id:
+                    print("  (Captain - Double points potential)")
+                elif p['id'] == vice_id:
+                    print("  (Vice-Captain)")
+
+    print("\nBench (in priority order):")
+    for p in bench:
+        team_name = team_name_by_id[p['team']]
+        pos_name = positions[p['element_type']]
+        reason = f"Backup with {p['expected_points']:.2f} pts potential (form {p['form_val']}, PPG {p['ppg_val']}); fixtures: {p['_fix_str']}; chance {p['chance']}%."
+        print(f"- {p['web_name']} ({team_name}, {p['_price_str']}m, Pos: {pos_name}) - Expected: {p['expected_points']:.2f} - Reason: {reason}")
+
+    print("\nWhat you stand to gain: This team maximizes projected points by balancing form, fixtures, and value. Use wildcard if needed for full changes; otherwise, adapt for limited transfers.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,36 @@
+import io
 import os
+import sys
 import json
+import time
+import hashlib
+import urllib.error
 import urllib.request
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from pulp import LpProblem, LpMaximize, LpVariable, LpStatus, PULP_CBC_CMD, lpSum
 import logging
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; without it the kernels run as plain NumPy
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # OR-Tools is optional; without it transfers are solved by CBC through PuLP
+    cp_model = None
+
 # Constants
 SQUAD_FILE = 'current_squad.json'
 LOG_FILE = 'fpl_optimizer.log'
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'fpl')
+CACHE_TTL = 15 * 60  # seconds before a cached API response is revalidated
+LAST_GW_FILE = os.path.join(CACHE_DIR, 'last_gameweek')
+BOOTSTRAP_URL = "https://fantasy.premierleague.com/api/bootstrap-static/"
+FIXTURES_URL = "https://fantasy.premierleague.com/api/fixtures/?event={}"
 
 # Configure logging
 logging.basicConfig(filename=LOG_FILE, level=logging.INFO,
@@ -37,18 +60,91 @@ def save_squad(selected):
         logging.error(f"Error saving squad to {SQUAD_FILE}: {e}")
 
 
+def fetch_json(url, ttl=CACHE_TTL):
+    """Fetch JSON from a URL, using the disk cache while fresh and ETag/Last-Modified revalidation after."""
+    key = hashlib.sha1(url.encode()).hexdigest()
+    data_path = os.path.join(CACHE_DIR, f"{key}.json")
+    meta_path = os.path.join(CACHE_DIR, f"{key}.meta")
+
+    cached = None
+    if os.path.exists(data_path):
+        try:
+            with open(data_path, 'rb') as f:
+                cached = json.loads(f.read())
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cache file {data_path}: {e}")
+    if cached is not None and time.time() - os.path.getmtime(data_path) < ttl:
+        return cached
+
+    headers = {}
+    if cached is not None and os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            body = response.read()
+            meta = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or cached is None:
+            raise
+        os.utime(data_path)  # Not modified: restart the TTL on the cached copy
+        return cached
+
+    data = json.loads(body.decode())
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(data_path, 'wb') as f:
+            f.write(body)
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+    except OSError as e:
+        logging.warning(f"Could not cache response for {url}: {e}")
+    return data
+
+
+def load_last_gameweek():
+    """Return the gameweek seen on the previous run, or None."""
+    try:
+        with open(LAST_GW_FILE, 'r') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def save_last_gameweek(next_gw):
+    """Remember the gameweek so the next run can prefetch its fixtures."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(LAST_GW_FILE, 'w') as f:
+            f.write(str(next_gw))
+    except OSError as e:
+        logging.warning(f"Could not save last gameweek: {e}")
+
+
 def fetch_data():
     """Fetch player, team, and fixture data from FPL API for the next gameweek."""
     try:
-        bootstrap_url = "https://fantasy.premierleague.com/api/bootstrap-static/"
-        with urllib.request.urlopen(bootstrap_url) as response:
-            bootstrap_data = json.loads(response.read().decode())
-        # Fetch fixtures for the next gameweek dynamically
-        events = bootstrap_data['events']
-        next_gw = get_next_gameweek(events)
-        fixtures_url = f"https://fantasy.premierleague.com/api/fixtures/?event={next_gw}"
-        with urllib.request.urlopen(fixtures_url) as response:
-            fixtures = json.loads(response.read().decode())
+        # Fetch fixtures for last run's gameweek alongside bootstrap; usually it is still the next one
+        guess_gw = load_last_gameweek()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            bootstrap_future = pool.submit(fetch_json, BOOTSTRAP_URL)
+            fixtures_future = pool.submit(fetch_json, FIXTURES_URL.format(guess_gw)) if guess_gw else None
+            bootstrap_data = bootstrap_future.result()
+            events = bootstrap_data['events']
+            next_gw = get_next_gameweek(events)
+            if next_gw == guess_gw:
+                fixtures = fixtures_future.result()
+            else:
+                fixtures = fetch_json(FIXTURES_URL.format(next_gw))
+        save_last_gameweek(next_gw)
         return bootstrap_data['elements'], bootstrap_data['teams'], events, fixtures, next_gw
     except Exception as e:
         logging.error(f"Error fetching data: {e}")
@@ -68,9 +164,7 @@ def get_next_gameweek(events):
 def update_fixtures(next_gw):
     """Fetch fixtures for the specified gameweek."""
     try:
-        fixtures_url = f"https://fantasy.premierleague.com/api/fixtures/?event={next_gw}"
-        with urllib.request.urlopen(fixtures_url) as response:
-            return json.loads(response.read().decode())
+        return fetch_json(FIXTURES_URL.format(next_gw))
     except Exception as e:
         logging.error(f"Error fetching fixtures: {e}")
         raise
@@ -85,219 +179,364 @@ def calculate_team_fixtures(teams, fixtures):
     return team_fixtures
 
 
+@njit(cache=True)
+def _compute_exp(form, ppg, ict, chance, team_idx, team_fix_mult):
+    """Expected points for each player from typed per-player arrays."""
+    base = form * 0.6 + ppg * 0.4
+    ict_boost = ict / 100 * 0.2
+    return base * (1 + ict_boost) * team_fix_mult[team_idx] * chance
+
+
 def calculate_expected_points(players, teams, team_fixtures):
     """Calculate expected points for each player based on form, fixtures, and scoring rules."""
     avg_strength = sum(t['strength'] for t in teams) / len(teams)
     expected_points = {}
-    team_strength = {t['id']: t['strength'] for t in teams}
-
+    # One (team, opponent, difficulty, home) row per team fixture, as column arrays
+    fix_table = np.array([(tid, fix['opp_id'], fix['diff'], fix['home'])
+                          for tid, fixes in team_fixtures.items() for fix in fixes], dtype=float).reshape(-1, 4)
+    fix_team, fix_opp = fix_table[:, 0].astype(np.intp), fix_table[:, 1].astype(np.intp)
+    # Team strength indexed by team id; ids without a team entry count as average
+    team_strength = np.full(max([t['id'] for t in teams] + fix_opp.tolist()) + 1, avg_strength)
+    team_strength[[t['id'] for t in teams]] = [t['strength'] for t in teams]
+    # Fixture multiplier per team, shared by all of that team's players (indexed by team id)
+    fix_mult = ((6 - fix_table[:, 2]) / 5.0) * np.where(fix_table[:, 3] > 0, 1.2, 0.9) * (
+        avg_strength / team_strength[fix_opp])
+    team_fix_mult = np.bincount(fix_team, weights=fix_mult, minlength=max(team_fixtures, default=0) + 1)
+
+    # Collect players with a fixture who are not ruled out, casting their numeric fields in the same pass
+    size = len(players)
+    form, ppg, ict, chance = np.empty(size), np.empty(size), np.empty(size), np.empty(size)
+    team_idx = np.empty(size, dtype=np.intp)
+    active = []
     for player in players:
-        team_id = player['team']
-        fixes = team_fixtures.get(team_id, [])
-        if not fixes:
+        if not team_fixtures.get(player['team']):
             continue
-        chance = player.get('chance_of_playing_next_round', 100)  # Default to 100 if None
-        if chance == 0:
+        chance_val = player.get('chance_of_playing_next_round', 100)  # Default to 100 if None
+        if chance_val == 0:
             continue
         # Ensure chance is a number before division
         try:
-            chance_factor = float(chance) / 100.0
+            chance_factor = float(chance_val) / 100.0
         except (TypeError, ValueError) as e:
             logging.warning(
-                f"Invalid chance value for player {player['id']} ({player['web_name']}): {chance}. Setting to 1.0.")
+                f"Invalid chance value for player {player['id']} ({player['web_name']}): {chance_val}. Setting to 1.0.")
             chance_factor = 1.0
+        i = len(active)
+        form[i] = float(player.get('form', 0))
+        ppg[i] = float(player.get('points_per_game', 0))
+        ict[i] = float(player.get('ict_index', 0))
+        team_idx[i] = player['team']
+        chance[i] = chance_factor
+        active.append(player)
+
+    # Score all active players at once; only the score goes back onto the player dicts here, the
+    # display fields are attached to the few printed players by attach_display_stats
+    n = len(active)
+    exp = _compute_exp(form[:n], ppg[:n], ict[:n], chance[:n], team_idx[:n], team_fix_mult)
+
+    for player, exp_val in zip(active, exp.tolist()):
+        expected_points[player['id']] = exp_val
+        player['expected_points'] = exp_val
+
+    return expected_points
+
 
-        base = (float(player.get('form', 0)) * 0.6 + float(player.get('points_per_game', 0)) * 0.4)
-        ict_boost = float(player.get('ict_index', 0)) / 100 * 0.2
-
-        exp = 0.0
-        for fix in fixes:
-            opp_id = fix['opp_id']
-            opp_strength = team_strength.get(opp_id, avg_strength)
-            strength_factor = avg_strength / opp_strength
-            diff_factor = (6 - fix['diff']) / 5.0
-            home_bonus = 1.2 if fix['home'] else 0.9
-            fix_exp = base * diff_factor * home_bonus * strength_factor * (1 + ict_boost)
-            exp += fix_exp
-
-        exp *= chance_factor
-        expected_points[player['id']] = round(exp, 2)
-        player['expected_points'] = expected_points[player['id']]
-        player['fixtures'] = fixes
-        player['chance'] = chance
+def attach_display_stats(players, team_fixtures):
+    """Attach the fixtures, chance and parsed form/PPG/ICT shown in the printout."""
+    for player in players:
+        player['fixtures'] = team_fixtures[player['team']]
+        player['chance'] = player.get('chance_of_playing_next_round', 100)
         player['form_val'] = float(player.get('form', 0))
         player['ppg_val'] = float(player.get('points_per_game', 0))
         player['ict_val'] = float(player.get('ict_index', 0))
 
-    return expected_points
+
+SQUAD_BUDGET = 1000  # in now_cost units (tenths of a million)
+POS_COUNTS = {1: 2, 2: 5, 3: 5, 4: 3}
+MAX_PER_TEAM = 3
+POINTS_SCALE = 10000  # CP-SAT needs integer coefficients, so points are kept to 4 decimal places
+
+
+def _solve_fresh_squad(avail_players, expected_points, budget=SQUAD_BUDGET):
+    """Solve the fresh-squad LP (wildcard, free hit or no current squad); returns None if no squad fits."""
+    by_pos, by_team = bucket_by_position(avail_players), bucket_by_team(avail_players)
+    prob = LpProblem("FPL_Squad", LpMaximize)
+    select = LpVariable.dicts("Select", (p['id'] for p in avail_players), cat='Binary')
+    prob += lpSum([select[p['id']] * expected_points[p['id']] for p in avail_players])
+    prob += lpSum([select[p['id']] * p['now_cost'] for p in avail_players]) <= budget
+    for pos, count in POS_COUNTS.items():
+        prob += lpSum([select[p['id']] for p in by_pos[pos]]) == count
+    for team_players in by_team.values():
+        prob += lpSum([select[p['id']] for p in team_players]) <= MAX_PER_TEAM
+    prob.solve(PULP_CBC_CMD(msg=0))
+    if LpStatus[prob.status] != 'Optimal':
+        return None
+    return [p for p in avail_players if select[p['id']].value() == 1]
+
+
+def bucket_by_position(players):
+    """Group players by element_type (1=GK .. 4=FWD) in a single pass."""
+    by_pos = {1: [], 2: [], 3: [], 4: []}
+    for p in players:
+        by_pos[p['element_type']].append(p)
+    return by_pos
+
+
+def bucket_by_team(players):
+    """Group players by team id in a single pass."""
+    by_team = {}
+    for p in players:
+        by_team.setdefault(p['team'], []).append(p)
+    return by_team
 
 
 def optimize_squad(players, expected_points, current_squad, free_transfers, chip):
     """Optimize a 15-player squad, considering transfers if provided."""
     avail_players = [p for p in players if p['id'] in expected_points]
-    prob = LpProblem("FPL_Squad", LpMaximize)
 
     # Map current squad to full player objects
     current_squad_players = []
     if current_squad:
+        avail_by_id = {p['id']: p for p in avail_players}
         for squad_player in current_squad:
             if isinstance(squad_player, dict) and 'id' in squad_player:
-                matching_players = [p for p in avail_players if p['id'] == squad_player['id']]
-                if matching_players:
-                    current_squad_players.append(matching_players[0])
+                match = avail_by_id.get(squad_player['id'])
+                if match is not None:
+                    current_squad_players.append(match)
                 else:
                     logging.warning(f"Player with ID {squad_player['id']} not found in current data. Skipping.")
             else:
                 logging.warning(f"Invalid squad player format: {squad_player}. Skipping.")
 
-    # Variables for transfers
-    keep = LpVariable.dicts("Keep", (p['id'] for p in current_squad_players),
-                            cat='Binary') if current_squad_players else {}
-    buy = LpVariable.dicts("Buy", (p['id'] for p in avail_players if p not in current_squad_players),
-                           cat='Binary') if current_squad_players else LpVariable.dicts("Buy", (p['id'] for p in
-                                                                                                avail_players),
-                                                                                        cat='Binary')
+    if not current_squad_players or chip in ['wildcard', 'free_hit']:
+        selected = _solve_fresh_squad(avail_players, expected_points)
+        if selected is None:
+            logging.error("No optimal squad found.")
+            raise ValueError("No optimal squad.")
+    else:
+        selected = _optimize_transfers(avail_players, expected_points, current_squad_players, free_transfers)
+    total_cost = sum(p['now_cost'] / 10.0 for p in selected)
+    squad_expected = sum(p['expected_points'] for p in selected)
+    return selected, total_cost, squad_expected
+
+
+def _optimize_transfers(avail_players, expected_points, current_squad_players, free_transfers):
+    """Solve the transfer LP: keep or sell current players, paying 4 points per extra transfer."""
+    current_ids = {p['id'] for p in current_squad_players}
+    candidates = [p for p in avail_players if p['id'] not in current_ids]
+    if cp_model is not None:
+        return _optimize_transfers_cp_sat(candidates, expected_points, current_squad_players, free_transfers)
+
+    prob = LpProblem("FPL_Squad", LpMaximize)
+    keep = LpVariable.dicts("Keep", (p['id'] for p in current_squad_players), cat='Binary')
+    buy = LpVariable.dicts("Buy", (p['id'] for p in candidates), cat='Binary')
 
     # Objective
-    if current_squad_players and chip not in ['wildcard', 'free_hit']:
-        extra_transfers = LpVariable("ExtraTransfers", lowBound=0, cat='Integer')
-        prob += lpSum([keep[p['id']] * expected_points[p['id']] for p in current_squad_players]) + lpSum(
-            [buy[p['id']] * expected_points[p['id']] for p in avail_players if
-             p not in current_squad_players]) - 4 * extra_transfers
-        prob += lpSum([1 - keep[p['id']] for p in current_squad_players]) <= free_transfers + extra_transfers
-    else:
-        select = LpVariable.dicts("Select", (p['id'] for p in avail_players), cat='Binary')
-        prob += lpSum([select[p['id']] * expected_points[p['id']] for p in avail_players])
+    extra_transfers = LpVariable("ExtraTransfers", lowBound=0, cat='Integer')
+    prob += lpSum([keep[p['id']] * expected_points[p['id']] for p in current_squad_players]) + lpSum(
+        [buy[p['id']] * expected_points[p['id']] for p in candidates]) - 4 * extra_transfers
+    prob += lpSum([1 - keep[p['id']] for p in current_squad_players]) <= free_transfers + extra_transfers
 
     # Constraints
-    if current_squad_players and chip not in ['wildcard', 'free_hit']:
-        prob += lpSum(keep.values()) + lpSum(buy.values()) == 15
-        prob += lpSum([1 - keep[p['id']] for p in current_squad_players]) == lpSum(buy.values())
-        sold_value = lpSum([(1 - keep[p['id']]) * (p['now_cost'] / 10.0) for p in current_squad_players])
-        buy_cost = lpSum(
-            [buy[p['id']] * (p['now_cost'] / 10.0) for p in avail_players if p not in current_squad_players])
-        prob += buy_cost <= sold_value
-    else:
-        prob += lpSum(select.values()) == 15
-        prob += lpSum([select[p['id']] * (p['now_cost'] / 10.0) for p in avail_players]) <= 100.0
+    prob += lpSum(keep.values()) + lpSum(buy.values()) == 15
+    prob += lpSum([1 - keep[p['id']] for p in current_squad_players]) == lpSum(buy.values())
+    sold_value = lpSum([(1 - keep[p['id']]) * (p['now_cost'] / 10.0) for p in current_squad_players])
+    buy_cost = lpSum([buy[p['id']] * (p['now_cost'] / 10.0) for p in candidates])
+    prob += buy_cost <= sold_value
 
     # Position and team constraints
-    pos_counts = {1: 2, 2: 5, 3: 5, 4: 3}
-    if current_squad_players and chip not in ['wildcard', 'free_hit']:
-        for pos, count in pos_counts.items():
-            prob += lpSum([keep[p['id']] for p in current_squad_players if p['element_type'] == pos]) + lpSum(
-                [buy[p['id']] for p in avail_players if
-                 p not in current_squad_players and p['element_type'] == pos]) == count
-        for team_id in range(1, 21):
-            prob += lpSum([keep[p['id']] for p in current_squad_players if p['team'] == team_id]) + lpSum(
-                [buy[p['id']] for p in avail_players if p not in current_squad_players and p['team'] == team_id]) <= 3
-    else:
-        for pos, count in pos_counts.items():
-            prob += lpSum([select[p['id']] for p in avail_players if p['element_type'] == pos]) == count
-        for team_id in range(1, 21):
-            prob += lpSum([select[p['id']] for p in avail_players if p['team'] == team_id]) <= 3
-
-    prob.solve(PULP_CBC_CMD(msg=0))
+    keep_by_pos, buy_by_pos = bucket_by_position(current_squad_players), bucket_by_position(candidates)
+    keep_by_team, buy_by_team = bucket_by_team(current_squad_players), bucket_by_team(candidates)
+    for pos, count in POS_COUNTS.items():
+        prob += lpSum([keep[p['id']] for p in keep_by_pos[pos]]) + lpSum(
+            [buy[p['id']] for p in buy_by_pos[pos]]) == count
+    for team_id in range(1, 21):
+        prob += lpSum([keep[p['id']] for p in keep_by_team.get(team_id, [])]) + lpSum(
+            [buy[p['id']] for p in buy_by_team.get(team_id, [])]) <= MAX_PER_TEAM
+
+    # Keeping the whole current squad is usually feasible, so hand it to CBC as the starting incumbent
+    if len(current_squad_players) == 15:
+        for var in keep.values():
+            var.setInitialValue(1)
+        for var in buy.values():
+            var.setInitialValue(0)
+        extra_transfers.setInitialValue(0)
+    prob.solve(PULP_CBC_CMD(msg=0, warmStart=len(current_squad_players) == 15))
     if LpStatus[prob.status] != 'Optimal':
         logging.error("No optimal squad found.")
         raise ValueError("No optimal squad.")
 
-    if current_squad_players and chip not in ['wildcard', 'free_hit']:
-        selected = [p for p in current_squad_players if keep[p['id']].value() == 1] + [p for p in avail_players if
-                                                                                       p not in current_squad_players and buy.get(
-                                                                                           p['id'], 0).value() == 1]
-    else:
-        selected = [p for p in avail_players if select[p['id']].value() == 1]
-    total_cost = sum(p['now_cost'] / 10.0 for p in selected)
-    squad_expected = sum(p['expected_points'] for p in selected)
-    return selected, total_cost, squad_expected
+    return [p for p in current_squad_players if keep[p['id']].value() == 1] + [p for p in candidates if
+                                                                               buy[p['id']].value() == 1]
+
+
+def _optimize_transfers_cp_sat(candidates, expected_points, current_squad_players, free_transfers):
+    """The transfer model of _optimize_transfers, solved by OR-Tools CP-SAT on all cores."""
+    model = cp_model.CpModel()
+    keep = {p['id']: model.new_bool_var(f"keep_{p['id']}") for p in current_squad_players}
+    buy = {p['id']: model.new_bool_var(f"buy_{p['id']}") for p in candidates}
+    extra_transfers = model.new_int_var(0, 15, 'extra_transfers')
+
+    def weighted(variables, players, weight):
+        return cp_model.LinearExpr.weighted_sum([variables[p['id']] for p in players], [weight(p) for p in players])
+
+    def total(variables, players):
+        return sum(variables[p['id']] for p in players)
+
+    # Objective
+    points = lambda p: round(expected_points[p['id']] * POINTS_SCALE)
+    model.maximize(weighted(keep, current_squad_players, points) + weighted(buy, candidates, points)
+                   - 4 * POINTS_SCALE * extra_transfers)
+    sold = len(current_squad_players) - total(keep, current_squad_players)
+    model.add(sold <= free_transfers + extra_transfers)
+
+    # Constraints (now_cost is already an integer, in tenths of a million)
+    model.add(total(keep, current_squad_players) + total(buy, candidates) == 15)
+    model.add(sold == total(buy, candidates))
+    cost = lambda p: p['now_cost']
+    model.add(weighted(buy, candidates, cost) <= sum(map(cost, current_squad_players))
+              - weighted(keep, current_squad_players, cost))
+
+    # Position and team constraints
+    keep_by_pos, buy_by_pos = bucket_by_position(current_squad_players), bucket_by_position(candidates)
+    keep_by_team, buy_by_team = bucket_by_team(current_squad_players), bucket_by_team(candidates)
+    for pos, count in POS_COUNTS.items():
+        model.add(total(keep, keep_by_pos[pos]) + total(buy, buy_by_pos[pos]) == count)
+    for team_id in range(1, 21):
+        model.add(total(keep, keep_by_team.get(team_id, [])) + total(buy, buy_by_team.get(team_id, [])) <= MAX_PER_TEAM)
+
+    # Same starting incumbent as the CBC path: keep the whole current squad
+    if len(current_squad_players) == 15:
+        for var in keep.values():
+            model.add_hint(var, 1)
+        for var in buy.values():
+            model.add_hint(var, 0)
+        model.add_hint(extra_transfers, 0)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = os.cpu_count() or 1
+    if solver.solve(model) != cp_model.OPTIMAL:
+        logging.error("No optimal squad found.")
+        raise ValueError("No optimal squad.")
+
+    return [p for p in current_squad_players if solver.boolean_value(keep[p['id']])] + [
+        p for p in candidates if solver.boolean_value(buy[p['id']])]
+
+
+FORMATIONS = np.array([(3, 5, 2), (3, 4, 3), (4, 4, 2), (4, 3, 3), (4, 5, 1), (5, 4, 1), (5, 3, 2)])
+
+
+@njit(cache=True)
+def _lineup_kernel(points, positions, formations, cap_mult, bench_boost):
+    """Best formation for a squad as (formation row or -1, lineup mask, projected points, captain, vice).
+
+    With only per-position counts to satisfy, each formation's best lineup is simply the top players of
+    each position, so one stable sort of the squad serves every formation."""
+    n = len(points)
+    order = np.argsort(-points, kind='mergesort')  # Stable, so ties keep squad order
+    available = np.zeros(5, dtype=np.int64)
+    for i in range(n):
+        available[positions[i]] += 1
+
+    best_f, best_proj, best_cap, best_vice = -1, 0.0, -1, -1
+    best_mask = np.zeros(n, dtype=np.bool_)
+    counts = np.empty(5, dtype=np.int64)
+    for f in range(formations.shape[0]):
+        counts[1], counts[2], counts[3], counts[4] = 1, formations[f, 0], formations[f, 1], formations[f, 2]
+        if (available[1:] < counts[1:]).any():
+            continue
+        mask = np.zeros(n, dtype=np.bool_)
+        cap, vice = -1, -1
+        for i in order:
+            if counts[positions[i]] > 0:
+                counts[positions[i]] -= 1
+                mask[i] = True
+                if cap < 0:
+                    cap = i
+                elif vice < 0:
+                    vice = i
+        lineup_sum, bench_sum = 0.0, 0.0
+        for i in range(n):
+            if mask[i]:
+                lineup_sum += points[i]
+            else:
+                bench_sum += points[i]
+        proj_total = lineup_sum + points[cap] * cap_mult
+        if bench_boost:
+            proj_total += bench_sum
+        if proj_total > best_proj:
+            best_f, best_proj, best_cap, best_vice = f, proj_total, cap, vice
+            best_mask = mask
+    return best_f, best_mask, best_proj, best_cap, best_vice
 
 
 def optimize_lineup(selected, expected_points, chip):
     """Optimize starting 11 and select captain/vice-captain."""
-    formations = [(3, 5, 2), (3, 4, 3), (4, 4, 2), (4, 3, 3), (4, 5, 1), (5, 4, 1), (5, 3, 2)]
-    best_form = None
-    best_proj = 0
-    best_lineup = []
-    best_captain = None
-    best_vice = None
-
-    for def_c, mid_c, fwd_c in formations:
-        prob2 = LpProblem("FPL_Lineup", LpMaximize)
-        select2 = LpVariable.dicts("Select2", (p['id'] for p in selected), cat='Binary')
-        prob2 += lpSum([select2[p['id']] * expected_points[p['id']] for p in selected])
-        prob2 += lpSum(select2[p['id']] for p in selected) == 11
-        prob2 += lpSum([select2[p['id']] for p in selected if p['element_type'] == 1]) == 1
-        prob2 += lpSum([select2[p['id']] for p in selected if p['element_type'] == 2]) == def_c
-        prob2 += lpSum([select2[p['id']] for p in selected if p['element_type'] == 3]) == mid_c
-        prob2 += lpSum([select2[p['id']] for p in selected if p['element_type'] == 4]) == fwd_c
-        prob2.solve(PULP_CBC_CMD(msg=0))
-
-        if LpStatus[prob2.status] == 'Optimal':
-            lineup = [p for p in selected if select2[p['id']].value() == 1]
-            lineup_sum = sum(p['expected_points'] for p in lineup)
-            exps = sorted([p['expected_points'] for p in lineup], reverse=True)
-            cap_bonus = exps[0] * (2 if chip != 'triple_captain' else 3) if exps else 0
-            proj_total = lineup_sum + cap_bonus
-            if chip == 'bench_boost':
-                proj_total += sum(p['expected_points'] for p in selected if p not in lineup)
-            if proj_total > best_proj:
-                best_proj = proj_total
-                best_form = f"{def_c}-{mid_c}-{fwd_c}"
-                best_lineup = lineup
-                best_captain = max(lineup, key=lambda p: p['expected_points'])
-                best_vice = sorted(lineup, key=lambda p: p['expected_points'], reverse=True)[1] if len(
-                    lineup) > 1 else None
-
-    return best_lineup, best_form, best_proj, best_captain, best_vice
-
-
-def get_team_name(teams, tid):
-    """Get team short name from ID."""
-    return next((t['short_name'] for t in teams if t['id'] == tid), "Unknown")
+    points = np.array([expected_points[p['id']] for p in selected], dtype=float)
+    positions = np.array([p['element_type'] for p in selected], dtype=np.int64)
+    f, mask, best_proj, cap, vice = _lineup_kernel(points, positions, FORMATIONS,
+                                                   3.0 if chip == 'triple_captain' else 2.0, chip == 'bench_boost')
+    if f < 0:
+        return [], None, 0, None, None
+
+    best_lineup = [p for p, picked in zip(selected, mask.tolist()) if picked]
+    def_c, mid_c, fwd_c = FORMATIONS[f].tolist()
+    best_vice = selected[vice] if vice >= 0 else None
+    return best_lineup, f"{def_c}-{mid_c}-{fwd_c}", float(best_proj), selected[cap], best_vice
+
+
+def team_names_by_id(teams):
+    """Map team IDs to short names."""
+    return {t['id']: t['short_name'] for t in teams}
 
 
 def print_output(next_gw, selected, total_cost, squad_expected, best_lineup, best_form, best_proj, best_captain,
                  best_vice, bench, teams, chip):
     """Print optimized squad, lineup, and bench."""
+    team_names = team_names_by_id(teams)
+    # Collect the report in memory and write it out once, rather than one terminal write per line
+    out = io.StringIO()
+    # Fixture and price text for every squad player, built once for both the lineup and bench sections
+    for p in selected:
+        p['_fix_str'] = ', '.join(
+            f"vs {team_names.get(f['opp_id'], 'Unknown')} ({'H' if f['home'] else 'A'}, diff {f['diff']})" for f in
+            p['fixtures'])
+        p['_price_str'] = f"{p['now_cost'] / 10.0:.1f}"
     print(
-        f"Optimal Team for Gameweek {next_gw} (Total Cost: £{total_cost:.1f}, Squad Expected Points: {squad_expected:.2f}, Lineup Projected Points: {best_proj:.2f})")
+        f"Optimal Team for Gameweek {next_gw} (Total Cost: £{total_cost:.1f}, Squad Expected Points: {squad_expected:.2f}, Lineup Projected Points: {best_proj:.2f})", file=out)
     if chip:
-        print(f"Chip Active: {chip.replace('_', ' ').title()}")
-    print(f"Recommended Formation: {best_form}")
+        print(f"Chip Active: {chip.replace('_', ' ').title()}", file=out)
+    print(f"Recommended Formation: {best_form}", file=out)
 
     positions = {1: 'GK', 2: 'DEF', 3: 'MID', 4: 'FWD'}
-    print("\nStarting 11:")
+    print("\nStarting 11:", file=out)
+    lineup_by_pos = bucket_by_position(best_lineup)
+    # Compare by player id rather than dict equality (which walks every field, fixtures included)
+    captain_id = best_captain['id'] if best_captain else None
+    vice_id = best_vice['id'] if best_vice else None
     for pos in [1, 2, 3, 4]:
-        pos_players = sorted([p for p in best_lineup if p['element_type'] == pos], key=lambda p: p['expected_points'],
-                             reverse=True)
+        pos_players = sorted(lineup_by_pos[pos], key=lambda p: p['expected_points'], reverse=True)
         if pos_players:
-            print(f"\n{positions[pos]}:")
+            print(f"\n{positions[pos]}:", file=out)
             for p in pos_players:
-                price = p['now_cost'] / 10.0
-                team_name = get_team_name(teams, p['team'])
-                fix_str = ', '.join(
-                    f"vs {get_team_name(teams, f['opp_id'])} ({'H' if f['home'] else 'A'}, diff {f['diff']})" for f in
-                    p['fixtures'])
-                reason = f"Selected for {p['expected_points']} pts (form {p['form_val']:.1f}, PPG {p['ppg_val']:.1f}, ICT {p['ict_val']:.1f}); fixtures: {fix_str}; chance {p['chance']}%."
+                team_name = team_names.get(p['team'], "Unknown")
+                reason = f"Selected for {p['expected_points']:.2f} pts (form {p['form_val']:.1f}, PPG {p['ppg_val']:.1f}, ICT {p['ict_val']:.1f}); fixtures: {p['_fix_str']}; chance {p['chance']}%."
                 print(
-                    f"- {p['web_name']} ({team_name}, £{price:.1f}, Pos: {positions[pos]}) - Expected: {p['expected_points']:.2f} - Reason: {reason}")
-                if p == best_captain:
-                    print("  (Captain - Double points potential)")
-                elif p == best_vice:
-                    print("  (Vice-Captain)")
+                    f"- {p['web_name']} ({team_name}, £{p['_price_str']}, Pos: {positions[pos]}) - Expected: {p['expected_points']:.2f} - Reason: {reason}", file=out)
+                if p['id'] == captain_id:
+                    print("  (Captain - Double points potential)", file=out)
+                elif p['id'] == vice_id:
+                    print("  (Vice-Captain)", file=out)
 
-    print("\nBench (in priority order):")
+    print("\nBench (in priority order):", file=out)
     for p in bench:
-        price = p['now_cost'] / 10.0
-        team_name = get_team_name(teams, p['team'])
+        team_name = team_names.get(p['team'], "Unknown")
         pos_name = positions[p['element_type']]
-        fix_str = ', '.join(
-            f"vs {get_team_name(teams, f['opp_id'])} ({'H' if f['home'] else 'A'}, diff {f['diff']})" for f in
-            p['fixtures'])
-        reason = f"Backup with {p['expected_points']} pts potential (form {p['form_val']:.1f}, PPG {p['ppg_val']:.1f}); fixtures: {fix_str}; chance {p['chance']}%."
+        reason = f"Backup with {p['expected_points']:.2f} pts potential (form {p['form_val']:.1f}, PPG {p['ppg_val']:.1f}); fixtures: {p['_fix_str']}; chance {p['chance']}%."
         print(
-            f"- {p['web_name']} ({team_name}, £{price:.1f}, Pos: {pos_name}) - Expected: {p['expected_points']:.2f} - Reason: {reason}")
+            f"- {p['web_name']} ({team_name}, £{p['_price_str']}, Pos: {pos_name}) - Expected: {p['expected_points']:.2f} - Reason: {reason}", file=out)
+
+    sys.stdout.write(out.getvalue())
 
 
 def main():
@@ -330,11 +569,13 @@ def main():
     selected, total_cost, squad_expected = optimize_squad(players, expected_points, current_squad, free_transfers,
                                                           args.chip)
     best_lineup, best_form, best_proj, best_captain, best_vice = optimize_lineup(selected, expected_points, args.chip)
-    bench = sorted([p for p in selected if p not in best_lineup], key=lambda p: p['expected_points'], reverse=True)
+    lineup_ids = {p['id'] for p in best_lineup}
+    bench = sorted((p for p in selected if p['id'] not in lineup_ids), key=lambda p: p['expected_points'], reverse=True)
 
     # Save new squad
     save_squad(selected)
 
+    attach_display_stats(selected, team_fixtures)
     print_output(next_gw, selected, total_cost, squad_expected, best_lineup, best_form, best_proj, best_captain,
                  best_vice, bench, teams, args.chip)
 
@@ -1,5 +1,23 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import re
+import warnings
+
+# A field holding nothing but whitespace, which np.fromstring would read as -1
+EMPTY_FIELD_RE = re.compile(r'(?:^|,)\s*(?:,|$)')
+
+
+def parse_values(text):
+    """Parse comma-separated numbers in a single NumPy call; raises ValueError on bad or empty fields."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)  # older NumPy only warns on bad text
+            values = np.fromstring(text, sep=',')
+    except DeprecationWarning as e:
+        raise ValueError(str(e))
+    if EMPTY_FIELD_RE.search(text) or values.size != text.count(',') + 1:
+        raise ValueError(f"could not parse {text!r}")
+    return values
 
 
 def main():
@@ -11,8 +29,8 @@ def main():
 
     # Parse the inputs into lists of floats
     try:
-        x = np.array([float(val) for val in x_input.split(',')])
-        y = np.array([float(val) for val in y_input.split(',')])
+        x = parse_values(x_input)
+        y = parse_values(y_input)
 
         if len(x) != len(y):
             print("Error: x and y must have the same number of values.")
@@ -2,27 +2,43 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import argparse
+import warnings
 
 
 def parse_input(input_str):
     if not input_str:
         raise ValueError("Input cannot be empty.")
+    # Drop empty fields (e.g. a trailing comma), then parse the whole line in NumPy's C parser
+    cleaned = ','.join(val for val in input_str.split(',') if val.strip())
+    if not cleaned:
+        return np.array([])
     try:
-        return np.array([float(val) for val in input_str.split(',') if val.strip()])
-    except ValueError:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)  # older NumPy only warns on bad text
+            values = np.fromstring(cleaned, sep=',')
+    except (ValueError, DeprecationWarning):
+        values = None
+    if values is None or values.size != cleaned.count(',') + 1:
         raise ValueError("Invalid input. Please enter numeric values separated by commas.")
+    return values
+
+
+def load_csv(filename):
+    # PyArrow's multithreaded tokenizer is much faster on large files; fall back to the C engine without it
+    try:
+        return pd.read_csv(filename, engine='pyarrow')
+    except ImportError:
+        return pd.read_csv(filename)
 
 
 def read_csv_data(filename):
     try:
-        df = pd.read_csv(filename)
+        df = load_csv(filename)
         if 'x' not in df.columns:
             raise ValueError("CSV file must contain an 'x' column.")
-        x = df['x'].values
-        y_datasets = [df[col].values for col in df.columns if col != 'x']
-        for y in y_datasets:
-            if len(y) != len(x):
-                raise ValueError("All columns in CSV must have the same length as 'x'.")
+        # Every DataFrame column already has the same length as 'x', so no per-column length check is needed
+        x = df['x'].to_numpy()
+        y_datasets = [df[col].to_numpy() for col in df.columns if col != 'x']
         return x, y_datasets
     except Exception as e:
         raise ValueError(f"Error reading CSV file: {e}")
@@ -39,20 +55,27 @@ def plot_graph(x, y_datasets, plot_type, save_file=None, show_grid=False):
     fig.patch.set_facecolor('black')
     ax.set_facecolor('black')
 
+    # Past a thousand points, per-point markers and bar patches dominate render time, so large series
+    # are drawn without markers, bars become a single vlines collection, and everything is rasterized
+    large = len(x) > 1000
+    line_style = dict(marker=None if large else 'o', linestyle='-', linewidth=2, markersize=6, rasterized=large)
+
     colors = ['white', 'red', 'blue', 'green', 'yellow']
     for i, y in enumerate(y_datasets):
         label = f'Series {i + 1}'
+        color = colors[i % len(colors)]
         if plot_type.lower() == 'line':
-            ax.plot(x, y, color=colors[i % len(colors)], marker='o', linestyle='-', linewidth=2, markersize=6,
-                    label=label)
+            ax.plot(x, y, color=color, label=label, **line_style)
         elif plot_type.lower() == 'scatter':
-            ax.scatter(x, y, color=colors[i % len(colors)], s=50, label=label)
+            ax.scatter(x, y, color=color, s=50, label=label, rasterized=large)
         elif plot_type.lower() == 'bar':
-            ax.bar(x + i * 0.2, y, width=0.2, color=colors[i % len(colors)], label=label)
+            if large:
+                ax.vlines(x + i * 0.2, 0, y, colors=color, label=label, rasterized=True)
+            else:
+                ax.bar(x + i * 0.2, y, width=0.2, color=color, label=label)
         else:
             print("Unsupported plot type. Using line plot.")
-            ax.plot(x, y, color=colors[i % len(colors)], marker='o', linestyle='-', linewidth=2, markersize=6,
-                    label=label)
+            ax.plot(x, y, color=color, label=label, **line_style)
 
     ax.set_xlabel('X-axis', color='white')
     ax.set_ylabel('Y-axis', color='white')
@@ -23,17 +23,45 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import requests
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+import os
 import time
+import threading
 import warnings
 import json
+import hashlib
+import pickle
 import re
+import string
+import html
+import atexit
 from pathlib import Path
-import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+import shutil
 import yfinance as yf
 from typing import Dict, List, Optional, Tuple
 import logging
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; without it the kernels run as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; without it keywords are matched with compiled regexes
+    ahocorasick = None
+
+try:
+    import xlsxwriter  # noqa: F401
+    EXCEL_ENGINE = 'xlsxwriter'
+except ImportError:  # XlsxWriter is optional; openpyxl writes the same workbook, only slower
+    EXCEL_ENGINE = 'openpyxl'
+
 warnings.filterwarnings('ignore')
 
 # ============================================
@@ -98,6 +126,9 @@ class KenyaMarketConfig:
         'Investment': ['CTUM', 'BRIT'],
         'Automobile': ['DTK']
     }
+    
+    # Reverse lookup: symbol -> sector
+    SYMBOL_TO_SECTOR = {symbol: sector for sector, symbols in SECTORS.items() for symbol in symbols}
 
 config = KenyaMarketConfig()
 
@@ -120,58 +151,154 @@ logger = logging.getLogger(__name__)
 # ============================================
 
 class DataCache:
-    """Persistent cache to minimize API calls and web scraping"""
+    """Persistent cache to minimize API calls and web scraping
+    
+    Each entry is a directory holding a JSON header (timestamp, symbol and any
+    non-DataFrame values) plus one zstd-compressed Feather file per DataFrame,
+    so cached statements load as columnar Arrow data instead of unpickled blocks.
+    """
+    
+    HEADER_FILE = 'header.json'
+    INDEX_COLUMN = '__index__'
+    OBJECT_FILE = 'object.pkl'
+    MEMORY_ENTRIES = 512
     
     def __init__(self, cache_dir='./nse_kenya_cache'):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        logger.info(f"Cache directory: {self.cache_dir}")
+        # In-process LRU of entries loaded or saved this run, keyed by entry path
+        self._memory = OrderedDict()
+        logger.info("Cache directory: %s", self.cache_dir)
     
     def get_cache_path(self, symbol: str, data_type: str = 'fundamentals') -> Path:
-        """Generate cache file path"""
+        """Generate cache entry directory path"""
         month_str = datetime.now().strftime('%Y%m')
-        return self.cache_dir / f"{symbol}_{data_type}_{month_str}.pkl"
+        return self.cache_dir / f"{symbol}_{data_type}_{month_str}"
     
     def is_cached(self, symbol: str, data_type: str = 'fundamentals') -> bool:
         """Check if fresh data exists (within current month)"""
-        cache_file = self.get_cache_path(symbol, data_type)
-        return cache_file.exists()
+        # The header is written last, so its presence marks a complete entry
+        return (self.get_cache_path(symbol, data_type) / self.HEADER_FILE).exists()
     
     def save(self, symbol: str, data: any, data_type: str = 'fundamentals'):
         """Save fetched data to cache"""
-        cache_file = self.get_cache_path(symbol, data_type)
-        with open(cache_file, 'wb') as f:
-            pickle.dump({
-                'timestamp': datetime.now(),
-                'symbol': symbol,
-                'data': data
-            }, f)
-        logger.debug(f"Cached {symbol} {data_type}")
+        cache_entry = self.get_cache_path(symbol, data_type)
+        cache_entry.mkdir(exist_ok=True)
+        
+        header = {
+            'timestamp': datetime.now().isoformat(),
+            'symbol': symbol,
+            'frames': {},
+            'values': {}
+        }
+        for key, value in data.items():
+            if key.startswith('_'):
+                continue  # Derived data (e.g. the field map) is rebuilt from the statements on use
+            if isinstance(value, pd.DataFrame):
+                # Feather needs a default index, so the row labels travel as a regular column
+                value.rename_axis(self.INDEX_COLUMN).reset_index().to_feather(
+                    cache_entry / f"{key}.feather", compression='zstd'
+                )
+                header['frames'][key] = value.index.name
+            else:
+                header['values'][key] = value
+        
+        with open(cache_entry / self.HEADER_FILE, 'w') as f:
+            json.dump(header, f, default=str)
+        self._remember(cache_entry, data)
+        logger.debug("Cached %s %s", symbol, data_type)
     
     def load(self, symbol: str, data_type: str = 'fundamentals'):
-        """Load cached data"""
-        cache_file = self.get_cache_path(symbol, data_type)
+        """Load cached data, from memory when this process has already read or written it"""
+        cache_entry = self.get_cache_path(symbol, data_type)
+        if cache_entry in self._memory:
+            self._memory.move_to_end(cache_entry)
+            return self._memory[cache_entry]
+        try:
+            with open(cache_entry / self.HEADER_FILE) as f:
+                header = json.load(f)
+            
+            data = dict(header['values'])
+            for key, index_name in header['frames'].items():
+                frame = pd.read_feather(cache_entry / f"{key}.feather")
+                data[key] = frame.set_index(self.INDEX_COLUMN).rename_axis(index_name)
+            self._remember(cache_entry, data)
+            return data
+        except Exception as e:
+            logger.warning("Cache load failed for %s: %s", symbol, e)
+            return None
+    
+    def _remember(self, cache_entry: Path, data: Dict):
+        """Keep an entry in the in-process LRU, evicting the least recently used beyond MEMORY_ENTRIES"""
+        self._memory[cache_entry] = data
+        self._memory.move_to_end(cache_entry)
+        if len(self._memory) > self.MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+    
+    def save_object(self, symbol: str, obj: any, data_type: str):
+        """Pickle a derived Python object (e.g. an analysis result) into the cache"""
+        cache_entry = self.get_cache_path(symbol, data_type)
+        cache_entry.mkdir(exist_ok=True)
+        with open(cache_entry / self.OBJECT_FILE, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.debug("Cached %s %s", symbol, data_type)
+    
+    def load_object(self, symbol: str, data_type: str):
+        """Load a pickled object; None when there is no entry"""
         try:
-            with open(cache_file, 'rb') as f:
-                cached = pickle.load(f)
-                return cached['data']
+            with open(self.get_cache_path(symbol, data_type) / self.OBJECT_FILE, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
         except Exception as e:
-            logger.warning(f"Cache load failed for {symbol}: {e}")
+            logger.warning("Cache load failed for %s: %s", symbol, e)
             return None
     
     def clear_old_cache(self, months_old: int = 2):
-        """Remove cache files older than specified months"""
-        cutoff_date = datetime.now() - timedelta(days=months_old * 30)
+        """Remove cache entries older than specified months"""
+        cutoff = (datetime.now() - timedelta(days=months_old * 30)).timestamp()
         removed_count = 0
-        for cache_file in self.cache_dir.glob('*.pkl'):
-            if cache_file.stat().st_mtime < cutoff_date.timestamp():
-                cache_file.unlink()
-                removed_count += 1
+        # scandir yields entry types from the directory listing and caches each entry's stat
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                    removed_count += 1
         if removed_count > 0:
-            logger.info(f"Removed {removed_count} old cache files")
+            logger.info("Removed %d old cache files", removed_count)
 
 cache = DataCache()
 
+ANALYSIS_VERSION = 1  # Bump whenever steps 1-5 change, so cached analysis results are recomputed
+
+# Everything besides the fundamentals that steps 1-5 read; changing any of it invalidates the cached analyses
+ANALYSIS_SETTINGS = (
+    ANALYSIS_VERSION,
+    config.DEBT_TO_EQUITY_MAX, config.MIN_PROFIT_YEARS, config.MIN_POSITIVE_OCF_YEARS,
+    config.MARGIN_DECLINE_THRESHOLD, config.MIN_REVENUE_CAGR, config.MIN_PROFIT_CAGR,
+    config.GROWTH_QUALITY_RATIO, config.TYPICAL_PE_RANGE, config.SECTORS,
+)
+
+def fundamentals_digest(company_data: Dict) -> str:
+    """
+    Content hash of a company's fundamentals, ignoring derived keys, and of the analysis settings;
+    keys the cached analysis results
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pickle.dumps(ANALYSIS_SETTINGS))
+    for key in sorted(key for key in company_data if not key.startswith('_')):
+        value = company_data[key]
+        if isinstance(value, pd.DataFrame):
+            # Hash cell contents rather than the pickled block layout, so frames read back from the cache match
+            digest.update(pickle.dumps((key, value.columns.tolist())))
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        else:
+            digest.update(pickle.dumps((key, value)))
+    return digest.hexdigest()
+
 # ============================================
 # RATE LIMITER
 # ============================================
@@ -183,21 +310,63 @@ class RateLimiter:
         self.calls_per_minute = calls_per_minute
         self.min_delay = 60.0 / calls_per_minute
         self.last_call = 0
+        self.lock = threading.Lock()
     
     def wait(self):
-        """Wait if necessary to respect rate limit"""
-        elapsed = time.time() - self.last_call
-        if elapsed < self.min_delay:
-            sleep_time = self.min_delay - elapsed
-            time.sleep(sleep_time)
-        self.last_call = time.time()
+        """Wait if necessary to respect rate limit (safe to share across fetch threads)"""
+        # Holding the lock while sleeping hands out call slots one at a time
+        with self.lock:
+            elapsed = time.time() - self.last_call
+            if elapsed < self.min_delay:
+                sleep_time = self.min_delay - elapsed
+                time.sleep(sleep_time)
+            self.last_call = time.time()
 
 rate_limiter = RateLimiter(calls_per_minute=20)
 
+# Fetch threads are created once and reused by every screening run; the rate limiter, not the
+# pool size, bounds request throughput
+io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='nse-io')
+atexit.register(io_executor.shutdown)
+
 # ============================================
 # NSE KENYA DATA FETCHING MODULE
 # ============================================
 
+# Numeric cell text: optional currency prefix, digits with separators, optional B/M/K scale
+NUMBER_RE = re.compile(r'^\s*(?:KES|Ksh)?\s*([-\d.,]+)\s*([BMK])?\s*$', re.I)
+SUFFIX_MULTIPLIERS = {'B': 1_000_000_000, 'M': 1_000_000, 'K': 1_000}
+
+# Company names for the predefined universe, used when a source gives no name
+COMPANY_NAMES = {
+    'SCOM': 'Safaricom PLC',
+    'EQTY': 'Equity Group Holdings',
+    'KCB': 'KCB Group',
+    'COOP': 'Co-operative Bank of Kenya',
+    'ABSA': 'Absa Bank Kenya',
+    'SCBK': 'Standard Chartered Bank Kenya',
+    'BAT': 'BAT Kenya',
+    'EABL': 'East African Breweries',
+    'BAMB': 'Bamburi Cement',
+    'TOTL': 'Total Energies Kenya',
+    'KNRE': 'KenGen',
+    'KPLC': 'Kenya Power & Lighting',
+    'ARM': 'ARM Cement',
+    'CABL': 'Carbacid Investments',
+    'NBK': 'National Bank of Kenya',
+    'DTK': 'D.T. Dobie',
+    'CTUM': 'Centum Investment',
+    'BRIT': 'Britam Holdings',
+    'NCBA': 'NCBA Group',
+    'SBIC': 'Stanbic Holdings'
+}
+
+def announcement_search_text(title: str, content: str) -> str:
+    """
+    Case-folded title and content that announcement keywords are matched against
+    """
+    return f"{title} {content}".casefold()
+
 class NSEKenyaDataFetcher:
     """
     Fetch data from multiple sources for NSE Kenya stocks
@@ -221,21 +390,20 @@ class NSEKenyaDataFetcher:
         
         try:
             url = f"{self.base_url_mystocks}/listed-companies"
-            response = self.session.get(url, timeout=15)
+            tree = self._get_html(url)
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+            if tree:
                 stocks_data = []
                 
-                tables = soup.find_all('table')
+                tables = tree.css('table')
                 for table in tables:
-                    rows = table.find_all('tr')[1:]
+                    rows = table.css('tr')[1:]
                     for row in rows:
-                        cols = row.find_all('td')
+                        cols = row.css('td')
                         if len(cols) >= 3:
-                            symbol = cols[0].text.strip()
-                            name = cols[1].text.strip()
-                            sector = cols[2].text.strip() if len(cols) > 2 else 'Unknown'
+                            symbol = cols[0].text().strip()
+                            name = cols[1].text().strip()
+                            sector = cols[2].text().strip() if len(cols) > 2 else 'Unknown'
                             
                             stocks_data.append({
                                 'Symbol': symbol,
@@ -245,130 +413,139 @@ class NSEKenyaDataFetcher:
                 
                 if stocks_data:
                     df = pd.DataFrame(stocks_data)
-                    logger.info(f"Fetched {len(df)} NSE stocks from myStocks.co.ke")
+                    logger.info("Fetched %d NSE stocks from myStocks.co.ke", len(df))
                     return df
         
         except Exception as e:
-            logger.warning(f"Failed to fetch from myStocks.co.ke: {e}")
+            logger.warning("Failed to fetch from myStocks.co.ke: %s", e)
         
         # Fallback: Use predefined major stocks
         logger.info("Using predefined stock universe (Top 20 NSE stocks)")
         stocks_data = []
         
         for symbol in config.INITIAL_TEST_UNIVERSE:
-            sector = 'Unknown'
-            for sect, symbols in config.SECTORS.items():
-                if symbol in symbols:
-                    sector = sect
-                    break
-            
             stocks_data.append({
                 'Symbol': symbol,
                 'Company_Name': self._get_company_name(symbol),
-                'Sector': sector
+                'Sector': config.SYMBOL_TO_SECTOR.get(symbol, 'Unknown')
             })
         
         return pd.DataFrame(stocks_data)
     
+    def _get_html(self, url: str) -> Optional[LexborHTMLParser]:
+        """Fetch and parse a page; None for error statuses and empty or non-HTML bodies"""
+        response = self.session.get(url, timeout=15)
+        if not response.ok or not response.content:
+            return None
+        
+        # myStocks sometimes answers with a JSON error page, which is not worth parsing
+        if 'html' not in response.headers.get('content-type', 'text/html'):
+            return None
+        
+        return LexborHTMLParser(response.content)
+    
     def _get_company_name(self, symbol: str) -> str:
         """Map symbol to company name"""
-        name_mapping = {
-            'SCOM': 'Safaricom PLC',
-            'EQTY': 'Equity Group Holdings',
-            'KCB': 'KCB Group',
-            'COOP': 'Co-operative Bank of Kenya',
-            'ABSA': 'Absa Bank Kenya',
-            'SCBK': 'Standard Chartered Bank Kenya',
-            'BAT': 'BAT Kenya',
-            'EABL': 'East African Breweries',
-            'BAMB': 'Bamburi Cement',
-            'TOTL': 'Total Energies Kenya',
-            'KNRE': 'KenGen',
-            'KPLC': 'Kenya Power & Lighting',
-            'ARM': 'ARM Cement',
-            'CABL': 'Carbacid Investments',
-            'NBK': 'National Bank of Kenya',
-            'DTK': 'D.T. Dobie',
-            'CTUM': 'Centum Investment',
-            'BRIT': 'Britam Holdings',
-            'NCBA': 'NCBA Group',
-            'SBIC': 'Stanbic Holdings'
-        }
-        return name_mapping.get(symbol, symbol)
+        return COMPANY_NAMES.get(symbol, symbol)
     
     def fetch_company_fundamentals(self, symbol: str) -> Optional[Dict]:
         """
         Fetch comprehensive financial data for a stock
         Returns dict with: financials, balance_sheet, cash_flow, info
         """
-        logger.info(f"Fetching fundamentals for {symbol}")
+        logger.info("Fetching fundamentals for %s", symbol)
         rate_limiter.wait()
         
-        # Try multiple sources
+        # Try multiple sources; the field map is attached here so every analysis step reuses it
         data = self._fetch_from_mystocks(symbol)
         if data:
+            _get_field_map(data)
             return data
         
         data = self._fetch_from_yahoo(symbol)
         if data:
+            _get_field_map(data)
             return data
         
-        logger.warning(f"No data sources available for {symbol}")
+        logger.warning("No data sources available for %s", symbol)
         return None
     
+    def fetch_fundamentals_batch(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch fundamentals for many symbols concurrently on the shared I/O executor
+        The shared rate limiter still spaces out requests; the worker threads overlap
+        network round trips and HTML parsing behind those gaps
+        """
+        return dict(zip(symbols, io_executor.map(self.fetch_company_fundamentals, symbols)))
+    
     def _fetch_from_mystocks(self, symbol: str) -> Optional[Dict]:
         """Scrape myStocks.co.ke for financial data"""
         try:
             url = f"{self.base_url_mystocks}/stock/{symbol.lower()}"
-            response = self.session.get(url, timeout=15)
+            tree = self._get_html(url)
             
-            if response.status_code != 200:
+            # Without financial tables the page is useless; bail before scraping info metadata
+            if not tree or not tree.css_first('table.financial-table'):
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
             financials_data = {}
             balance_sheet_data = {}
             cash_flow_data = {}
             info_data = {}
             
             # Extract company information
-            info_data['longName'] = soup.find('h1', class_='stock-name').text.strip() if soup.find('h1', class_='stock-name') else symbol
-            info_data['sector'] = soup.find('span', class_='sector').text.strip() if soup.find('span', class_='sector') else 'Unknown'
+            name_elem = tree.css_first('h1.stock-name')
+            info_data['longName'] = name_elem.text().strip() if name_elem else symbol
+            sector_elem = tree.css_first('span.sector')
+            info_data['sector'] = sector_elem.text().strip() if sector_elem else 'Unknown'
             
             # Extract current price and market cap
-            price_elem = soup.find('span', class_='current-price')
+            price_elem = tree.css_first('span.current-price')
             if price_elem:
-                info_data['currentPrice'] = self._parse_number(price_elem.text)
+                info_data['currentPrice'] = self._parse_number(price_elem.text())
             
-            market_cap_elem = soup.find('span', text=re.compile('Market Cap'))
-            if market_cap_elem:
-                market_cap_text = market_cap_elem.find_next('span').text
-                info_data['marketCap'] = self._parse_market_cap(market_cap_text)
+            # Market cap value sits in the first span after the "Market Cap" label
+            spans = tree.css('span')
+            for i, span in enumerate(spans[:-1]):
+                if 'Market Cap' in span.text():
+                    info_data['marketCap'] = self._parse_market_cap(spans[i + 1].text())
+                    break
             
             # Extract financial tables
-            tables = soup.find_all('table', class_='financial-table')
+            tables = tree.css('table.financial-table')
             
             for table in tables:
-                table_header = table.find('thead')
+                table_header = table.css_first('thead')
                 if not table_header:
                     continue
                 
-                header_text = table_header.text.lower()
-                year_cells = table_header.find_all('th')[1:]
-                years = [cell.text.strip() for cell in year_cells]
+                header_text = table_header.text().lower()
+                year_cells = table_header.css('th')[1:]
+                years = [cell.text().strip() for cell in year_cells]
                 
-                rows = table.find('tbody').find_all('tr')
+                # Put the year columns in chronological order once per table, so every metric's
+                # series (and the statement frames built from them) come out already sorted
+                order = sorted(range(len(years)), key=years.__getitem__)
+                years = [years[i] for i in order]
                 
+                rows = table.css_first('tbody').css('tr')
+                
+                # Gather every value cell of the table, then parse them in one vectorized pass
+                metric_rows = []
+                cell_texts = []
                 for row in rows:
-                    cells = row.find_all('td')
+                    cells = row.css('td')
                     if len(cells) < 2:
                         continue
                     
-                    metric_name = cells[0].text.strip()
-                    values = [self._parse_number(cell.text) for cell in cells[1:]]
-                    
-                    series_data = pd.Series(values, index=years)
+                    metric_rows.append((cells[0].text().strip(), len(cell_texts), len(cells) - 1))
+                    cell_texts.extend(cell.text() for cell in cells[1:])
+                
+                parsed = self._parse_numbers(cell_texts).to_numpy()
+                
+                for metric_name, start, count in metric_rows:
+                    values = parsed[start:start + count]
+                    series_data = pd.Series(values[order] if count == len(order) else values, index=years)
                     
                     if 'income' in header_text or 'profit' in header_text:
                         financials_data[metric_name] = series_data
@@ -382,14 +559,6 @@ class NSEKenyaDataFetcher:
             balance_sheet_df = pd.DataFrame(balance_sheet_data).T
             cash_flow_df = pd.DataFrame(cash_flow_data).T
             
-            # Ensure chronological order
-            if not financials_df.empty:
-                financials_df = financials_df.sort_index(axis=1)
-            if not balance_sheet_df.empty:
-                balance_sheet_df = balance_sheet_df.sort_index(axis=1)
-            if not cash_flow_df.empty:
-                cash_flow_df = cash_flow_df.sort_index(axis=1)
-            
             return {
                 'financials': financials_df,
                 'balance_sheet': balance_sheet_df,
@@ -399,7 +568,7 @@ class NSEKenyaDataFetcher:
             }
         
         except Exception as e:
-            logger.debug(f"myStocks.co.ke fetch failed for {symbol}: {e}")
+            logger.debug("myStocks.co.ke fetch failed for %s: %s", symbol, e)
             return None
     
     def _fetch_from_yahoo(self, symbol: str) -> Optional[Dict]:
@@ -407,14 +576,19 @@ class NSEKenyaDataFetcher:
         try:
             ticker = yf.Ticker(f"{symbol}.NR")
             
-            financials = ticker.financials.T if hasattr(ticker, 'financials') else pd.DataFrame()
-            balance_sheet = ticker.balance_sheet.T if hasattr(ticker, 'balance_sheet') else pd.DataFrame()
-            cash_flow = ticker.cashflow.T if hasattr(ticker, 'cashflow') else pd.DataFrame()
-            info = ticker.info if hasattr(ticker, 'info') else {}
-            
+            # Each attribute is a separate Yahoo request, so skip cash flow and info when there are no statements
+            financials = self._fetch_yahoo_statement(ticker, 'financials')
+            balance_sheet = self._fetch_yahoo_statement(ticker, 'balance_sheet')
             if financials.empty and balance_sheet.empty:
                 return None
             
+            cash_flow = self._fetch_yahoo_statement(ticker, 'cashflow')
+            try:
+                info = ticker.info
+            except Exception as e:
+                logger.debug("Yahoo Finance info unavailable for %s: %s", symbol, e)
+                info = {}
+            
             if not financials.empty:
                 financials = financials.sort_index()
             if not balance_sheet.empty:
@@ -431,31 +605,36 @@ class NSEKenyaDataFetcher:
             }
         
         except Exception as e:
-            logger.debug(f"Yahoo Finance fetch failed for {symbol}: {e}")
+            logger.debug("Yahoo Finance fetch failed for %s: %s", symbol, e)
             return None
     
-    def _parse_number(self, text: str) -> Optional[float]:
-        """Parse number from text (handles KES formatting)"""
-        if not text or text in ['-', 'N/A', '']:
+    def _fetch_yahoo_statement(self, ticker: yf.Ticker, statement: str) -> pd.DataFrame:
+        """Fetch one Yahoo statement transposed to one row per period; empty if the request fails"""
+        try:
+            return getattr(ticker, statement).T
+        except Exception as e:
+            logger.debug("Yahoo Finance %s unavailable for %s: %s", statement, ticker.ticker, e)
+            return pd.DataFrame()
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_number(text: str) -> Optional[float]:
+        """Parse number from text (handles KES formatting); memoized since pages repeat the same tokens"""
+        match = NUMBER_RE.match(text) if text else None
+        if not match:
             return None
         
-        text = text.replace('KES', '').replace('Ksh', '').replace(',', '').strip()
-        
-        multiplier = 1
-        if 'B' in text.upper():
-            multiplier = 1_000_000_000
-            text = text.upper().replace('B', '')
-        elif 'M' in text.upper():
-            multiplier = 1_000_000
-            text = text.upper().replace('M', '')
-        elif 'K' in text.upper():
-            multiplier = 1_000
-            text = text.upper().replace('K', '')
-        
         try:
-            return float(text) * multiplier
-        except:
+            value = float(match.group(1).replace(',', ''))
+        except ValueError:
             return None
+        return value * SUFFIX_MULTIPLIERS.get((match.group(2) or '').upper(), 1)
+    
+    def _parse_numbers(self, texts: List[str]) -> pd.Series:
+        """Vectorized _parse_number over many cells; unparseable cells become NaN"""
+        parts = pd.Series(texts, dtype=object).str.extract(NUMBER_RE)
+        numbers = pd.to_numeric(parts[0].str.replace(',', '', regex=False), errors='coerce')
+        return numbers * parts[1].str.upper().map(SUFFIX_MULTIPLIERS).fillna(1)
     
     def _parse_market_cap(self, text: str) -> Optional[float]:
         """Parse market cap value in KES"""
@@ -475,54 +654,192 @@ class NSEKenyaDataFetcher:
         """
         try:
             url = f"{self.base_url_mystocks}/announcements/{symbol.lower()}"
-            response = self.session.get(url, timeout=15)
+            tree = self._get_html(url)
             
-            if response.status_code != 200:
+            if not tree:
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
             announcements = []
             
-            announcement_divs = soup.find_all('div', class_='announcement-item')
+            announcement_divs = tree.css('div.announcement-item')
             
             for div in announcement_divs[:20]:
-                date_elem = div.find('span', class_='announcement-date')
-                title_elem = div.find('h3', class_='announcement-title')
-                content_elem = div.find('div', class_='announcement-content')
+                date_elem = div.css_first('span.announcement-date')
+                title_elem = div.css_first('h3.announcement-title')
+                content_elem = div.css_first('div.announcement-content')
                 
                 if date_elem and title_elem:
+                    title = title_elem.text().strip()
+                    content = content_elem.text().strip() if content_elem else ''
                     announcements.append({
-                        'date': date_elem.text.strip(),
-                        'title': title_elem.text.strip(),
-                        'content': content_elem.text.strip() if content_elem else ''
+                        'date': date_elem.text().strip(),
+                        'title': title,
+                        'content': content,
+                        '_lc': announcement_search_text(title, content)
                     })
             
             return announcements
         
         except Exception as e:
-            logger.debug(f"Announcements fetch failed for {symbol}: {e}")
+            logger.debug("Announcements fetch failed for %s: %s", symbol, e)
             return []
 
 # Initialize data fetcher
 data_fetcher = NSEKenyaDataFetcher()
 
+# ============================================
+# FIELD MAP
+# ============================================
+
+# Canonical field -> (statement, column aliases in lookup order)
+FIELD_ALIASES = {
+    'net_income': ('financials', ('Net Income', 'Profit After Tax', 'Net Profit', 'PAT')),
+    'revenue': ('financials', ('Total Revenue', 'Revenue', 'Sales', 'Turnover')),
+    'op_income': ('financials', ('Operating Income', 'EBIT', 'Operating Profit')),
+    'equity': ('balance_sheet', ('Total Stockholder Equity', 'Shareholders Equity', 'Total Equity', 'Equity')),
+    'assets': ('balance_sheet', ('Total Assets', 'Assets')),
+    'debt': ('balance_sheet', ('Total Debt', 'Long Term Debt', 'Debt')),
+    'liabilities': ('balance_sheet', ('Total Liabilities', 'Liabilities')),
+    'ocf': ('cash_flow', ('Operating Cash Flow', 'Cash from Operations', 'Operating Activities')),
+}
+
+STATEMENTS = ('financials', 'balance_sheet', 'cash_flow')
+
+@lru_cache(maxsize=4096)
+def _find_col(columns: frozenset, aliases: Tuple[str, ...]) -> Optional[str]:
+    """
+    First alias present in a statement's columns; statements from the same source share column sets
+    """
+    return next((alias for alias in aliases if alias in columns), None)
+
+def _build_field_map(company_data: Dict) -> Dict:
+    """
+    Resolve every canonical field once per company.
+    Fields are float64 arrays on a shared 'index' (the union of the statements' periods, NaN where
+    a statement has no row); '<statement>_rows' masks mark the periods each statement reports.
+    """
+    frames = {name: company_data.get(name, pd.DataFrame()) for name in STATEMENTS}
+    frame_columns = {name: frozenset(frame.columns) for name, frame in frames.items()}
+
+    columns = {}
+    for field, (statement, aliases) in FIELD_ALIASES.items():
+        col = _find_col(frame_columns[statement], aliases)
+        columns[field] = frames[statement][col] if col is not None else None
+
+    # Align on the union of the statements that supplied a field, as pandas does for Series arithmetic
+    index = None
+    for statement in STATEMENTS:
+        if any(columns[field] is not None for field, (source, _) in FIELD_ALIASES.items() if source == statement):
+            frame_index = frames[statement].index
+            index = frame_index if index is None else index.union(frame_index)
+    if index is None:
+        index = pd.Index([])
+
+    fields = {'index': index}
+    for statement in STATEMENTS:
+        fields[f'{statement}_rows'] = index.isin(frames[statement].index)
+    # Periods reported by both the cash flow statement and the income statement
+    fields['ocf_profit_rows'] = fields['cash_flow_rows'] & fields['financials_rows']
+    for field, series in columns.items():
+        fields[field] = series.reindex(index).to_numpy(dtype=np.float64) if series is not None else None
+
+    fields.update(_derive_ratios(fields))
+    return fields
+
+def _get_field_map(company_data: Dict) -> Dict:
+    """
+    The company's field map, built on first use and kept on company_data under '_fields'
+    """
+    fields = company_data.get('_fields')
+    if fields is None:
+        fields = company_data['_fields'] = _build_field_map(company_data)
+    return fields
+
+def _derive_ratios(fields: Dict) -> Dict:
+    """
+    ROE, ROCE and operating margin (%) on the field map's axis, shared by every analysis step
+    A ratio is None when one of its fields is missing
+    """
+    net_income, total_equity, total_assets = fields['net_income'], fields['equity'], fields['assets']
+    operating_income, revenue = fields['op_income'], fields['revenue']
+    
+    total_debt = fields['debt']
+    if total_debt is None:
+        total_debt = np.where(fields['balance_sheet_rows'], 0.0, np.nan)
+    
+    ratios = {'roe': None, 'roce': None, 'op_margin': None}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if net_income is not None and total_equity is not None:
+            ratios['roe'] = net_income / total_equity * 100
+        
+        if operating_income is not None and total_assets is not None and total_equity is not None:
+            capital_employed = total_assets - (total_assets - total_equity - total_debt)
+            ratios['roce'] = operating_income / capital_employed * 100
+        
+        if operating_income is not None and revenue is not None:
+            ratios['op_margin'] = operating_income / revenue * 100
+    
+    return ratios
+
+@dataclass(frozen=True, slots=True)
+class CompanyView:
+    """Company info fields resolved once per company, with the defaults the analysis steps use"""
+    company_name: Optional[str]
+    sector: Optional[str]
+    industry: Optional[str]
+    business_summary: Optional[str]
+    data_source: str
+    market_cap: Optional[float]
+    current_price: Optional[float]
+    shares_outstanding: Optional[float]
+    
+    @classmethod
+    def from_company_data(cls, symbol: str, company_data: Dict) -> 'CompanyView':
+        info = company_data.get('info', {})
+        return cls(
+            company_name=info.get('longName', data_fetcher._get_company_name(symbol)),
+            sector=info.get('sector', 'Unknown'),
+            industry=info.get('industry', info.get('sector', 'Unknown')),
+            business_summary=info.get('longBusinessSummary'),
+            data_source=company_data.get('source', 'Unknown'),
+            market_cap=info.get('marketCap'),
+            current_price=info.get('currentPrice'),
+            shares_outstanding=info.get('sharesOutstanding')
+        )
+
+def _field_values(fields: Dict, field: str) -> Optional[np.ndarray]:
+    """
+    A field's values over its own statement's periods, or None if the statement lacks it
+    """
+    values = fields[field]
+    if values is None:
+        return None
+    return values[fields[f'{FIELD_ALIASES[field][0]}_rows']]
+
+def _last(values: np.ndarray):
+    """
+    Latest value of a field's values, or 0 if the statement has no periods
+    """
+    return values[-1] if values.size else 0
+
 # ============================================
 # STEP 1: BUSINESS UNDERSTANDING
 # ============================================
 
-def analyze_business_basics(symbol: str, company_data: Dict) -> Dict:
+def analyze_business_basics(symbol: str, company_data: Dict, view: Optional[CompanyView] = None) -> Dict:
     """
     Extract and display basic company information
     """
-    info = company_data.get('info', {})
+    if view is None:
+        view = CompanyView.from_company_data(symbol, company_data)
     
     result = {
         'Symbol': symbol,
-        'Company_Name': info.get('longName', data_fetcher._get_company_name(symbol)),
-        'Sector': info.get('sector', 'Unknown'),
-        'Industry': info.get('industry', info.get('sector', 'Unknown')),
-        'Data_Source': company_data.get('source', 'Unknown'),
-        'Business_Summary': info.get('longBusinessSummary', 'N/A')[:200] + "..." if info.get('longBusinessSummary') else 'N/A',
+        'Company_Name': view.company_name,
+        'Sector': view.sector,
+        'Industry': view.industry,
+        'Data_Source': view.data_source,
+        'Business_Summary': view.business_summary[:200] + "..." if view.business_summary else 'N/A',
         'Human_Review_Flag': "⚠️ USER REVIEW REQUIRED: Can you explain this company's core business in one simple sentence?"
     }
     
@@ -532,7 +849,7 @@ def analyze_business_basics(symbol: str, company_data: Dict) -> Dict:
 # STEP 2: INDUSTRY & COMPETITIVE MOAT
 # ============================================
 
-def calculate_moat_indicators(company_data: Dict) -> Optional[Dict]:
+def calculate_moat_indicators(company_data: Dict, fields: Optional[Dict] = None) -> Optional[Dict]:
     """
     Calculate ROE, ROCE, Operating Margin trends over available years
     """
@@ -544,77 +861,41 @@ def calculate_moat_indicators(company_data: Dict) -> Optional[Dict]:
             logger.warning("Insufficient data for moat calculation")
             return None
         
-        # Extract fields with flexible naming
-        net_income = None
-        for col in ['Net Income', 'Profit After Tax', 'Net Profit', 'PAT']:
-            if col in financials.columns:
-                net_income = financials[col]
-                break
-        
-        total_equity = None
-        for col in ['Total Stockholder Equity', 'Shareholders Equity', 'Total Equity', 'Equity']:
-            if col in balance_sheet.columns:
-                total_equity = balance_sheet[col]
-                break
-        
-        total_assets = None
-        for col in ['Total Assets', 'Assets']:
-            if col in balance_sheet.columns:
-                total_assets = balance_sheet[col]
-                break
-        
-        total_debt = None
-        for col in ['Total Debt', 'Long Term Debt', 'Debt']:
-            if col in balance_sheet.columns:
-                total_debt = balance_sheet[col]
-                break
-        
-        if total_debt is None:
-            total_debt = pd.Series(0, index=balance_sheet.index)
-        
-        operating_income = None
-        for col in ['Operating Income', 'EBIT', 'Operating Profit']:
-            if col in financials.columns:
-                operating_income = financials[col]
-                break
-        
-        revenue = None
-        for col in ['Total Revenue', 'Revenue', 'Sales', 'Turnover']:
-            if col in financials.columns:
-                revenue = financials[col]
-                break
-        
-        # Calculate ROE
-        roe = None
-        if net_income is not None and total_equity is not None:
-            roe = (net_income / total_equity * 100).dropna()
-        
-        # Calculate ROCE
-        roce = None
-        if operating_income is not None and total_assets is not None and total_equity is not None:
-            capital_employed = total_assets - (total_assets - total_equity - total_debt)
-            roce = (operating_income / capital_employed * 100).dropna()
-        
-        # Calculate Operating Margin
-        operating_margin = None
-        if operating_income is not None and revenue is not None:
-            operating_margin = (operating_income / revenue * 100).dropna()
-        
-        # Get averages over available period
-        avg_roe = roe.tail(5).mean() if roe is not None and len(roe) >= 3 else None
-        avg_roce = roce.tail(5).mean() if roce is not None and len(roce) >= 3 else None
-        avg_margin = operating_margin.tail(5).mean() if operating_margin is not None and len(operating_margin) >= 3 else None
+        if fields is None:
+            fields = _get_field_map(company_data)
+        
+        years = fields['index']
+        roe, roce, operating_margin = fields['roe'], fields['roce'], fields['op_margin']
+        
+        # Average the last five years where each ratio is defined, and keep those years as the trend
+        labels = years.tolist()
+        averages = {}
+        trends = {}
+        for name, ratio in (('roe', roe), ('roce', roce), ('margin', operating_margin)):
+            averages[name] = None
+            trends[name] = {}
+            if ratio is not None:
+                # Positions of defined values (inf included, as dropna kept it); no masked copy of the ratio
+                defined = np.flatnonzero(~np.isnan(ratio))
+                if len(defined) >= 3:
+                    averages[name] = ratio[defined[-5:]].mean()
+                values = ratio.tolist()
+                trends[name] = {labels[i]: values[i] for i in defined.tolist()}
+        
+        avg_roe = averages['roe']
+        avg_roce = averages['roce']
+        avg_margin = averages['margin']
         
         # Calculate moat quality score
         moat_score = calculate_moat_score(avg_roe, avg_roce, avg_margin)
         
         return {
-            'ROE_5Y_Avg': round(avg_roe, 2) if avg_roe else None,
-            'ROCE_5Y_Avg': round(avg_roce, 2) if avg_roce else None,
-            'Operating_Margin_5Y_Avg': round(avg_margin, 2) if avg_margin else None,
-            'ROE_Trend': roe.to_dict() if roe is not None else {},
-            'ROCE_Trend': roce.to_dict() if roce is not None else {},
-            'Margin_Trend': operating_margin.to_dict() if operating_margin is not None else {},
+            'ROE_5Y_Avg': avg_roe if avg_roe else None,
+            'ROCE_5Y_Avg': avg_roce if avg_roce else None,
+            'Operating_Margin_5Y_Avg': avg_margin if avg_margin else None,
+            'ROE_Trend': trends['roe'],
+            'ROCE_Trend': trends['roce'],
+            'Margin_Trend': trends['margin'],
             'Moat_Quality_Score': moat_score
         }
     
@@ -622,6 +903,31 @@ def calculate_moat_indicators(company_data: Dict) -> Optional[Dict]:
         logger.error(f"Moat calculation error: {e}")
         return None
 
+# Moat score thresholds (a metric must exceed a threshold to earn its points)
+# Adjusted thresholds for Kenyan market
+ROE_THRESH = np.array([8, 12, 15])
+ROCE_THRESH = np.array([8, 12, 15])
+MARGIN_THRESH = np.array([0, 5, 10, 15])
+ROE_POINTS = np.array([0, 1, 2, 3])
+ROCE_POINTS = np.array([0, 1, 2, 3])
+MARGIN_POINTS = np.array([0, 1, 2, 3, 4])
+
+def batch_moat_scores(roes, roces, margins) -> np.ndarray:
+    """
+    Score many companies at once (0-10 scale); a NaN metric earns no points
+    """
+    roes, roces, margins = (np.asarray(values, dtype=np.float64) for values in (roes, roces, margins))
+    
+    def points(values, thresholds, table):
+        # side='left' counts the thresholds strictly below each value
+        earned = table[np.searchsorted(thresholds, values, side='left')]
+        return np.where(np.isnan(values), 0, earned)
+    
+    score = (points(roes, ROE_THRESH, ROE_POINTS) +
+             points(roces, ROCE_THRESH, ROCE_POINTS) +
+             points(margins, MARGIN_THRESH, MARGIN_POINTS))
+    return np.minimum(score, 10)
+
 def calculate_moat_score(roe: Optional[float], roce: Optional[float], margin: Optional[float]) -> int:
     """
     Scoring system for competitive moat (0-10 scale)
@@ -630,51 +936,25 @@ def calculate_moat_score(roe: Optional[float], roce: Optional[float], margin: Op
     if None in [roe, roce, margin]:
         return 0
     
-    score = 0
-    
-    # ROE scoring
-    if roe > 15:
-        score += 3
-    elif roe > 12:
-        score += 2
-    elif roe > 8:
-        score += 1
-    
-    # ROCE scoring
-    if roce > 15:
-        score += 3
-    elif roce > 12:
-        score += 2
-    elif roce > 8:
-        score += 1
-    
-    # Operating Margin scoring
-    if margin > 15:
-        score += 4
-    elif margin > 10:
-        score += 3
-    elif margin > 5:
-        score += 2
-    elif margin > 0:
-        score += 1
-    
-    return min(score, 10)
-
-def analyze_competitive_position(symbol: str, sector: str, company_data: Dict) -> Dict:
+    return int(batch_moat_scores([roe], [roce], [margin])[0])
+
+def analyze_competitive_position(symbol: str, sector: str, company_data: Dict,
+                                 fields: Optional[Dict] = None, view: Optional[CompanyView] = None) -> Dict:
     """
     Analyze company's competitive position vs peers
     """
     peers = data_fetcher.fetch_sector_peers(symbol, sector)
-    moat_metrics = calculate_moat_indicators(company_data)
+    moat_metrics = calculate_moat_indicators(company_data, fields)
     
-    info = company_data.get('info', {})
-    market_cap = info.get('marketCap', 0)
+    if view is None:
+        view = CompanyView.from_company_data(symbol, company_data)
+    market_cap = view.market_cap
     
     market_cap_billions = market_cap / 1_000_000_000 if market_cap else 0
     
     result = {
         'Competitors': peers,
-        'Market_Cap_KES_B': round(market_cap_billions, 2),
+        'Market_Cap_KES_B': market_cap_billions,
         'Moat_Metrics': moat_metrics,
         'Human_Review_Flag': "⚠️ USER REVIEW REQUIRED: Based on metrics and competitor list, assess the durability of competitive advantage (brand, cost, regulatory)."
     }
@@ -685,9 +965,73 @@ def analyze_competitive_position(symbol: str, sector: str, company_data: Dict) -
 # STEP 3: FINANCIAL HEALTH FILTERS
 # ============================================
 
-def apply_financial_health_filters(symbol: str, company_data: Dict) -> Tuple[bool, Dict]:
+@njit(cache=True, error_model='numpy')
+def _health_check_core(net_income, debt, equity, check_debt, operating_cf, ocf_profit, ocf_rows, operating_margin,
+                       min_profit_years, debt_to_equity_max, min_ocf_years, margin_decline_threshold, early_exit):
+    """
+    Numeric core of the health filters, cheapest first; with early_exit, stops at the first failure
+    Returns: (bitmask of failed filters, years checked, margin years, peak margin, margin decline,
+              debt-to-equity, OCF quality years)
+    """
+    failed = 0
+    margin_years = 0
+    peak_margin = np.nan
+    margin_decline = np.nan
+    debt_to_equity = 0.0
+    ocf_quality = 0
+    
+    # FILTER 1: Profit Consistency
+    available_years = net_income.shape[0]
+    required_years = min(min_profit_years, available_years)
+    for i in range(available_years - required_years, available_years):
+        if not net_income[i] > 0:
+            failed |= 1
+            break
+    
+    # FILTER 2: Margin Stability
+    if failed == 0 or not early_exit:
+        margins = np.empty(operating_margin.shape[0])
+        for i in range(operating_margin.shape[0]):
+            if not np.isnan(operating_margin[i]):
+                margins[margin_years] = operating_margin[i]
+                margin_years += 1
+        
+        if margin_years >= 3:
+            peak_margin = margins[margin_years - 3]
+            for i in range(margin_years - 2, margin_years):
+                if margins[i] > peak_margin:
+                    peak_margin = margins[i]
+            
+            if peak_margin > 0:
+                margin_decline = (peak_margin - margins[margin_years - 1]) / peak_margin
+                if not margin_decline < margin_decline_threshold:
+                    failed |= 2
+    
+    # FILTER 3: Debt-to-Equity Ratio
+    if (failed == 0 or not early_exit) and check_debt:
+        if equity > 0:
+            debt_to_equity = debt / equity
+        if not debt_to_equity < debt_to_equity_max:
+            failed |= 4
+    
+    # FILTER 4: Cash Flow Quality (over the aligned periods flagged in ocf_rows)
+    if failed == 0 or not early_exit:
+        common_years = 0
+        for i in range(operating_cf.shape[0]):
+            if ocf_rows[i]:
+                common_years += 1
+                if operating_cf[i] > ocf_profit[i]:
+                    ocf_quality += 1
+        if common_years >= min_ocf_years and ocf_quality < min_ocf_years:
+            failed |= 8
+    
+    return failed, required_years, margin_years, peak_margin, margin_decline, debt_to_equity, ocf_quality
+
+def apply_financial_health_filters(symbol: str, company_data: Dict, fields: Optional[Dict] = None,
+                                   early_exit: bool = True) -> Tuple[bool, Dict]:
     """
     Sequential elimination filters - CRITICAL STEP
+    Filters run cheapest first; early_exit=False runs them all and reports the first failure
     Returns: (Pass/Fail, dict of results)
     """
     financials = company_data.get('financials', pd.DataFrame())
@@ -701,144 +1045,67 @@ def apply_financial_health_filters(symbol: str, company_data: Dict) -> Tuple[boo
         results['Reason'] = 'No financial data available'
         return False, results
     
-    # Extract Net Income with flexible column naming
-    net_income = None
-    for col in ['Net Income', 'Profit After Tax', 'Net Profit', 'PAT']:
-        if col in financials.columns:
-            net_income = financials[col]
-            break
+    if fields is None:
+        fields = _get_field_map(company_data)
+    
+    net_income = _field_values(fields, 'net_income')
     
     if net_income is None:
         results['Status'] = 'REJECTED'
         results['Reason'] = 'Net Income data not found'
         return False, results
     
-    # FILTER 1: Profit Consistency
-    available_years = len(net_income)
-    required_years = min(config.MIN_PROFIT_YEARS, available_years)
-    
-    last_n_years = net_income.tail(required_years)
-    profit_check = (last_n_years > 0).all() if len(last_n_years) == required_years else False
+    no_values = np.empty(0)
+    has_margin = fields['op_margin'] is not None
+    operating_margin = fields['op_margin'][fields['financials_rows']] if has_margin else no_values
     
-    results['Filter_Results']['Profit_Consistency'] = profit_check
-    results['Filter_Results']['Years_Checked'] = required_years
-    
-    if not profit_check:
-        results['Status'] = 'REJECTED'
-        results['Reason'] = f'Profit not positive for all last {required_years} years'
-        return False, results
-    
-    # FILTER 2: Debt-to-Equity Ratio
+    # Latest balance sheet values; equity falls back to assets minus liabilities
+    total_debt = total_equity = None
     if not balance_sheet.empty:
-        total_debt = None
-        for col in ['Total Debt', 'Long Term Debt', 'Debt']:
-            if col in balance_sheet.columns:
-                total_debt = balance_sheet[col].iloc[-1] if not balance_sheet[col].empty else 0
-                break
-        
-        total_equity = None
-        for col in ['Total Stockholder Equity', 'Shareholders Equity', 'Total Equity', 'Equity']:
-            if col in balance_sheet.columns:
-                total_equity = balance_sheet[col].iloc[-1] if not balance_sheet[col].empty else 0
-                break
-        
-        if total_equity is None or total_equity == 0:
-            total_assets = None
-            total_liabilities = None
-            for col in ['Total Assets', 'Assets']:
-                if col in balance_sheet.columns:
-                    total_assets = balance_sheet[col].iloc[-1] if not balance_sheet[col].empty else 0
-                    break
-            for col in ['Total Liabilities', 'Liabilities']:
-                if col in balance_sheet.columns:
-                    total_liabilities = balance_sheet[col].iloc[-1] if not balance_sheet[col].empty else 0
-                    break
-            
-            if total_assets is not None and total_liabilities is not None:
-                total_equity = total_assets - total_liabilities
+        latest = {}
+        for field in ('debt', 'equity', 'assets', 'liabilities'):
+            values = _field_values(fields, field)
+            latest[field] = _last(values) if values is not None else None
         
-        debt_to_equity = 0
-        if total_debt is not None and total_equity is not None and total_equity > 0:
-            debt_to_equity = total_debt / total_equity
+        total_debt = latest['debt']
+        total_equity = latest['equity']
         
-        debt_check = debt_to_equity < config.DEBT_TO_EQUITY_MAX
-        results['Filter_Results']['Debt_to_Equity'] = round(debt_to_equity, 2)
-        results['Filter_Results']['Debt_Check_Pass'] = debt_check
-        
-        if not debt_check:
-            results['Status'] = 'REJECTED'
-            results['Reason'] = f'Debt-to-Equity too high: {debt_to_equity:.2f}'
-            return False, results
+        if total_equity is None or total_equity == 0:
+            if latest['assets'] is not None and latest['liabilities'] is not None:
+                total_equity = latest['assets'] - latest['liabilities']
     
-    else:
-        results['Filter_Results']['Debt_to_Equity'] = 'N/A'
-        results['Filter_Results']['Debt_Check_Pass'] = True
-    
-    # FILTER 3: Cash Flow Quality
-    if not cash_flow.empty:
-        operating_cf = None
-        for col in ['Operating Cash Flow', 'Cash from Operations', 'Operating Activities']:
-            if col in cash_flow.columns:
-                operating_cf = cash_flow[col]
-                break
-        
-        if operating_cf is not None and net_income is not None:
-            common_years = operating_cf.index.intersection(net_income.index)
-            if len(common_years) >= config.MIN_POSITIVE_OCF_YEARS:
-                ocf_quality = (operating_cf[common_years] > net_income[common_years]).sum()
-                cf_check = ocf_quality >= config.MIN_POSITIVE_OCF_YEARS
-                
-                results['Filter_Results']['OCF_Quality_Years'] = int(ocf_quality)
-                results['Filter_Results']['CF_Check_Pass'] = cf_check
-                
-                if not cf_check:
-                    results['Status'] = 'REJECTED'
-                    results['Reason'] = f'Poor cash flow quality: Only {ocf_quality} years OCF > Profit'
-                    return False, results
-            else:
-                results['Filter_Results']['OCF_Quality_Years'] = 'Insufficient Data'
-                results['Filter_Results']['CF_Check_Pass'] = True
-        else:
-            results['Filter_Results']['OCF_Quality_Years'] = 'N/A'
-            results['Filter_Results']['CF_Check_Pass'] = True
-    else:
-        results['Filter_Results']['OCF_Quality_Years'] = 'N/A'
-        results['Filter_Results']['CF_Check_Pass'] = True
+    # Cash flow is compared with profit over the periods both statements report
+    operating_cf = fields['ocf'] if not cash_flow.empty else None
+    ocf_rows = fields['ocf_profit_rows'] if operating_cf is not None else np.zeros(0, dtype=np.bool_)
     
-    # FILTER 4: Margin Stability
-    operating_income = None
-    revenue = None
+    has_ratio = total_debt is not None and total_equity is not None
+    failed, required_years, margin_years, peak_margin, margin_decline, debt_to_equity, ocf_quality = _health_check_core(
+        net_income, float(total_debt) if has_ratio else 0.0, float(total_equity) if has_ratio else 0.0,
+        not balance_sheet.empty, operating_cf if operating_cf is not None else no_values, fields['net_income'],
+        ocf_rows, operating_margin,
+        config.MIN_PROFIT_YEARS, config.DEBT_TO_EQUITY_MAX, config.MIN_POSITIVE_OCF_YEARS,
+        config.MARGIN_DECLINE_THRESHOLD, early_exit)
     
-    for col in ['Operating Income', 'EBIT', 'Operating Profit']:
-        if col in financials.columns:
-            operating_income = financials[col]
-            break
+    # Reasons of failed filters, in order; with early_exit the first one ends the checks
+    reasons = []
     
-    for col in ['Total Revenue', 'Revenue', 'Sales', 'Turnover']:
-        if col in financials.columns:
-            revenue = financials[col]
-            break
+    # FILTER 1: Profit Consistency
+    results['Filter_Results']['Profit_Consistency'] = not failed & 1
+    results['Filter_Results']['Years_Checked'] = required_years
     
-    if operating_income is not None and revenue is not None:
-        operating_margin = (operating_income / revenue * 100).dropna()
-        
-        if len(operating_margin) >= 3:
-            last_3y_margins = operating_margin.tail(3)
-            if len(last_3y_margins) >= 2:
-                peak_margin = last_3y_margins.max()
-                current_margin = last_3y_margins.iloc[-1]
-                
+    if failed & 1:
+        reasons.append(f'Profit not positive for all last {required_years} years')
+    
+    # FILTER 2: Margin Stability
+    if not (reasons and early_exit):
+        if has_margin:
+            if margin_years >= 3:
                 if peak_margin > 0:
-                    margin_decline = (peak_margin - current_margin) / peak_margin
-                    margin_check = margin_decline < config.MARGIN_DECLINE_THRESHOLD
-                    
                     results['Filter_Results']['Margin_Decline_Pct'] = round(margin_decline * 100, 1)
-                    results['Filter_Results']['Margin_Check_Pass'] = margin_check
+                    results['Filter_Results']['Margin_Check_Pass'] = not failed & 2
                     
-                    if not margin_check:
-                        results['Status'] = 'REJECTED'
-                        results['Reason'] = f'Operating margin declined {margin_decline*100:.1f}% from peak'
-                        return False, results
+                    if failed & 2:
+                        reasons.append(f'Operating margin declined {margin_decline*100:.1f}% from peak')
                 else:
                     results['Filter_Results']['Margin_Decline_Pct'] = 'N/A'
                     results['Filter_Results']['Margin_Check_Pass'] = True
@@ -846,11 +1113,41 @@ def apply_financial_health_filters(symbol: str, company_data: Dict) -> Tuple[boo
                 results['Filter_Results']['Margin_Decline_Pct'] = 'Insufficient Data'
                 results['Filter_Results']['Margin_Check_Pass'] = True
         else:
-            results['Filter_Results']['Margin_Decline_Pct'] = 'Insufficient Data'
+            results['Filter_Results']['Margin_Decline_Pct'] = 'N/A'
             results['Filter_Results']['Margin_Check_Pass'] = True
-    else:
-        results['Filter_Results']['Margin_Decline_Pct'] = 'N/A'
-        results['Filter_Results']['Margin_Check_Pass'] = True
+    
+    # FILTER 3: Debt-to-Equity Ratio
+    if not (reasons and early_exit):
+        if not balance_sheet.empty:
+            results['Filter_Results']['Debt_to_Equity'] = round(debt_to_equity, 2)
+            results['Filter_Results']['Debt_Check_Pass'] = not failed & 4
+            
+            if failed & 4:
+                reasons.append(f'Debt-to-Equity too high: {debt_to_equity:.2f}')
+        else:
+            results['Filter_Results']['Debt_to_Equity'] = 'N/A'
+            results['Filter_Results']['Debt_Check_Pass'] = True
+    
+    # FILTER 4: Cash Flow Quality
+    if not (reasons and early_exit):
+        if operating_cf is not None:
+            if np.count_nonzero(ocf_rows) >= config.MIN_POSITIVE_OCF_YEARS:
+                results['Filter_Results']['OCF_Quality_Years'] = ocf_quality
+                results['Filter_Results']['CF_Check_Pass'] = not failed & 8
+                
+                if failed & 8:
+                    reasons.append(f'Poor cash flow quality: Only {ocf_quality} years OCF > Profit')
+            else:
+                results['Filter_Results']['OCF_Quality_Years'] = 'Insufficient Data'
+                results['Filter_Results']['CF_Check_Pass'] = True
+        else:
+            results['Filter_Results']['OCF_Quality_Years'] = 'N/A'
+            results['Filter_Results']['CF_Check_Pass'] = True
+    
+    if reasons:
+        results['Status'] = 'REJECTED'
+        results['Reason'] = reasons[0]
+        return False, results
     
     # ALL FILTERS PASSED
     results['Status'] = 'PASSED'
@@ -862,7 +1159,31 @@ def apply_financial_health_filters(symbol: str, company_data: Dict) -> Tuple[boo
 # STEP 4: GROWTH POTENTIAL
 # ============================================
 
-def calculate_growth_metrics(company_data: Dict) -> Optional[Dict]:
+def tail_matrix(histories: List[Optional[np.ndarray]], width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Right-align the last `width` values of each history in a NaN-padded matrix
+    Returns: (matrix, number of values kept per row); missing histories keep none
+    """
+    matrix = np.full((len(histories), width), np.nan)
+    periods = np.zeros(len(histories), dtype=int)
+    for row, values in enumerate(histories):
+        if values is not None and len(values):
+            periods[row] = min(width, len(values))
+            matrix[row, width - periods[row]:] = values[-periods[row]:]
+    return matrix, periods
+
+def batch_cagr(history: np.ndarray, periods: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compound annual growth rate of each row of a right-aligned history matrix
+    Returns: (CAGRs, mask of rows with two or more periods and a positive starting value)
+    """
+    start = history[np.arange(len(history)), history.shape[1] - np.maximum(periods, 1)]
+    valid = (periods >= 2) & (start > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.power(history[:, -1] / start, 1.0 / np.maximum(periods - 1, 1)) - 1
+    return np.where(valid, cagr, np.nan), valid
+
+def calculate_growth_metrics(company_data: Dict, fields: Optional[Dict] = None) -> Optional[Dict]:
     """
     Calculate revenue/profit CAGR and growth quality
     """
@@ -873,25 +1194,12 @@ def calculate_growth_metrics(company_data: Dict) -> Optional[Dict]:
         if financials.empty:
             return None
         
-        # Extract data with flexible naming
-        revenue = None
-        for col in ['Total Revenue', 'Revenue', 'Sales', 'Turnover']:
-            if col in financials.columns:
-                revenue = financials[col]
-                break
-        
-        net_profit = None
-        for col in ['Net Income', 'Profit After Tax', 'Net Profit', 'PAT']:
-            if col in financials.columns:
-                net_profit = financials[col]
-                break
-        
-        operating_cf = None
-        if not cash_flow.empty:
-            for col in ['Operating Cash Flow', 'Cash from Operations', 'Operating Activities']:
-                if col in cash_flow.columns:
-                    operating_cf = cash_flow[col]
-                    break
+        if fields is None:
+            fields = _get_field_map(company_data)
+        
+        revenue = _field_values(fields, 'revenue')
+        net_profit = _field_values(fields, 'net_income')
+        operating_cf = fields['ocf'] if not cash_flow.empty else None
         
         # Initialize results
         results = {
@@ -904,53 +1212,38 @@ def calculate_growth_metrics(company_data: Dict) -> Optional[Dict]:
             'Growth_Data_Years': 0
         }
         
-        # Calculate CAGR
-        if revenue is not None and len(revenue) >= 2:
-            available_years = min(5, len(revenue))
-            revenue_data = revenue.tail(available_years)
-            
-            if available_years >= 2:
-                starting_rev = revenue_data.iloc[0]
-                ending_rev = revenue_data.iloc[-1]
-                
-                if starting_rev > 0:
-                    revenue_cagr = (ending_rev / starting_rev) ** (1/(available_years-1)) - 1
-                    results['Revenue_CAGR_5Y'] = round(revenue_cagr * 100, 2)
-                    results['Growth_Data_Years'] = available_years
+        # Calculate CAGR for revenue and profit together over their last five periods
+        history, periods = tail_matrix([revenue, net_profit], width=5)
+        (revenue_cagr, profit_cagr), valid = batch_cagr(history, periods)
         
-        if net_profit is not None and len(net_profit) >= 2:
-            available_years = min(5, len(net_profit))
-            profit_data = net_profit.tail(available_years)
-            
-            if available_years >= 2:
-                starting_profit = profit_data.iloc[0]
-                ending_profit = profit_data.iloc[-1]
-                
-                if starting_profit > 0:
-                    profit_cagr = (ending_profit / starting_profit) ** (1/(available_years-1)) - 1
-                    results['Profit_CAGR_5Y'] = round(profit_cagr * 100, 2)
+        if valid[0]:
+            results['Revenue_CAGR_5Y'] = revenue_cagr * 100
+            results['Growth_Data_Years'] = int(periods[0])
+        
+        if valid[1]:
+            results['Profit_CAGR_5Y'] = profit_cagr * 100
         
         # Growth Quality Ratio
         if operating_cf is not None and net_profit is not None:
-            common_years = operating_cf.index.intersection(net_profit.index)
-            if len(common_years) >= 3:
-                cumulative_ocf = operating_cf[common_years].sum()
-                cumulative_profit = net_profit[common_years].sum()
+            common_years = fields['ocf_profit_rows']
+            if np.count_nonzero(common_years) >= 3:
+                cumulative_ocf, cumulative_profit = np.nansum(
+                    [operating_cf[common_years], fields['net_income'][common_years]], axis=1)
                 
                 if cumulative_profit > 0:
                     growth_quality_ratio = cumulative_ocf / cumulative_profit
-                    results['Growth_Quality_Ratio'] = round(growth_quality_ratio, 2)
+                    results['Growth_Quality_Ratio'] = growth_quality_ratio
         
         # Recent Growth
         if revenue is not None and len(revenue) >= 2:
-            recent_rev_growth = ((revenue.iloc[-1] / revenue.iloc[-2]) - 1) if revenue.iloc[-2] != 0 else None
+            recent_rev_growth = ((revenue[-1] / revenue[-2]) - 1) if revenue[-2] != 0 else None
             if recent_rev_growth is not None:
-                results['Recent_Revenue_Growth'] = round(recent_rev_growth * 100, 2)
+                results['Recent_Revenue_Growth'] = recent_rev_growth * 100
         
         if net_profit is not None and len(net_profit) >= 2:
-            recent_profit_growth = ((net_profit.iloc[-1] / net_profit.iloc[-2]) - 1) if net_profit.iloc[-2] != 0 else None
+            recent_profit_growth = ((net_profit[-1] / net_profit[-2]) - 1) if net_profit[-2] != 0 else None
             if recent_profit_growth is not None:
-                results['Recent_Profit_Growth'] = round(recent_profit_growth * 100, 2)
+                results['Recent_Profit_Growth'] = recent_profit_growth * 100
         
         # Determine if passes growth criteria
         revenue_check = (results['Revenue_CAGR_5Y'] is not None and 
@@ -976,48 +1269,60 @@ def calculate_growth_metrics(company_data: Dict) -> Optional[Dict]:
 # STEP 5: VALUATION DISCIPLINE
 # ============================================
 
-def calculate_valuation_score(symbol: str, company_data: Dict, peers: List[str]) -> Optional[Dict]:
+# Valuation score bands: below 0.9, [0.9, 1.1), 1.1 and above
+VALUATION_THRESH = np.array([0.9, 1.1])
+VALUATION_LABELS = np.array(['UNDERVALUED', 'FAIRLY VALUED', 'OVERVALUED'])
+
+# P/E bands relative to the typical range: below it, inside it (upper bound inclusive), above it
+PE_RANGE_THRESH = np.array([config.TYPICAL_PE_RANGE[0], np.nextafter(config.TYPICAL_PE_RANGE[1], np.inf)])
+PE_ABSOLUTE_COMPONENT = np.array([0.8, 1.0, 1.2])
+PE_RANGE_LABELS = np.array(['POTENTIALLY UNDERVALUED', 'WITHIN TYPICAL RANGE', 'POTENTIALLY OVERVALUED'])
+PE_RANGE_SCORES = np.array([0.9, 1.0, 1.2])
+
+def calculate_valuation_score(symbol: str, company_data: Dict, peers: List[str],
+                              fields: Optional[Dict] = None, view: Optional[CompanyView] = None) -> Optional[Dict]:
     """
     Compare current valuation to historical average and peer median
     """
     try:
-        info = company_data.get('info', {})
         financials = company_data.get('financials', pd.DataFrame())
         
         if financials.empty:
             return None
         
+        if view is None:
+            view = CompanyView.from_company_data(symbol, company_data)
+        
         # Get current price and shares
-        current_price = info.get('currentPrice')
+        current_price = view.current_price
         if not current_price:
             return None
         
+        if fields is None:
+            fields = _get_field_map(company_data)
+        
         # Extract EPS
-        net_profit = None
-        for col in ['Net Income', 'Profit After Tax', 'Net Profit', 'PAT']:
-            if col in financials.columns:
-                net_profit = financials[col]
-                break
+        net_profit = _field_values(fields, 'net_income')
         
         # Get shares outstanding
-        shares_outstanding = info.get('sharesOutstanding')
+        shares_outstanding = view.shares_outstanding
         if not shares_outstanding and net_profit is not None:
-            market_cap = info.get('marketCap')
+            market_cap = view.market_cap
             if market_cap and current_price:
                 shares_outstanding = market_cap / current_price
         
         # Calculate current P/E
         current_pe = None
         if net_profit is not None and shares_outstanding:
-            eps_current = net_profit.iloc[-1] / shares_outstanding if net_profit.iloc[-1] else None
+            eps_current = net_profit[-1] / shares_outstanding if net_profit[-1] else None
             if eps_current and eps_current > 0:
                 current_pe = current_price / eps_current
         
         # Calculate historical P/E
         historical_pe_avg = None
         if net_profit is not None and shares_outstanding:
-            last_3y_profit = net_profit.tail(3)
-            avg_eps = last_3y_profit.mean() / shares_outstanding if not last_3y_profit.empty else None
+            last_3y_profit = net_profit[-3:]
+            avg_eps = np.nanmean(last_3y_profit) / shares_outstanding if len(last_3y_profit) else None
             if avg_eps and avg_eps > 0:
                 historical_pe_avg = current_price / avg_eps
         
@@ -1025,11 +1330,9 @@ def calculate_valuation_score(symbol: str, company_data: Dict, peers: List[str])
         current_pb = None
         balance_sheet = company_data.get('balance_sheet', pd.DataFrame())
         if not balance_sheet.empty:
-            total_equity = None
-            for col in ['Total Stockholder Equity', 'Shareholders Equity', 'Total Equity', 'Equity']:
-                if col in balance_sheet.columns:
-                    total_equity = balance_sheet[col].iloc[-1] if not balance_sheet[col].empty else 0
-                    break
+            total_equity = _field_values(fields, 'equity')
+            if total_equity is not None:
+                total_equity = _last(total_equity)
             
             if total_equity and shares_outstanding and total_equity > 0:
                 book_value_per_share = total_equity / shares_outstanding
@@ -1045,41 +1348,25 @@ def calculate_valuation_score(symbol: str, company_data: Dict, peers: List[str])
         if current_pe and historical_pe_avg and peer_pe_median:
             historical_component = current_pe / historical_pe_avg if historical_pe_avg else 1
             peer_component = current_pe / peer_pe_median if peer_pe_median else 1
-            absolute_component = 1.0
-            
-            if current_pe < config.TYPICAL_PE_RANGE[0]:
-                absolute_component = 0.8
-            elif current_pe > config.TYPICAL_PE_RANGE[1]:
-                absolute_component = 1.2
+            absolute_component = PE_ABSOLUTE_COMPONENT[np.digitize(current_pe, PE_RANGE_THRESH)].item()
             
             valuation_score = (historical_component * 0.4 + 
                              peer_component * 0.4 + 
                              absolute_component * 0.2)
             
-            if valuation_score < 0.9:
-                classification = "UNDERVALUED"
-            elif valuation_score < 1.1:
-                classification = "FAIRLY VALUED"
-            else:
-                classification = "OVERVALUED"
+            classification = str(VALUATION_LABELS[np.digitize(valuation_score, VALUATION_THRESH)])
         elif current_pe:
-            if current_pe < config.TYPICAL_PE_RANGE[0]:
-                classification = "POTENTIALLY UNDERVALUED"
-                valuation_score = 0.9
-            elif current_pe > config.TYPICAL_PE_RANGE[1]:
-                classification = "POTENTIALLY OVERVALUED"
-                valuation_score = 1.2
-            else:
-                classification = "WITHIN TYPICAL RANGE"
-                valuation_score = 1.0
+            pe_band = np.digitize(current_pe, PE_RANGE_THRESH)
+            classification = str(PE_RANGE_LABELS[pe_band])
+            valuation_score = PE_RANGE_SCORES[pe_band].item()
         
         return {
-            'Current_Price_KES': round(current_price, 2),
-            'Current_PE': round(current_pe, 2) if current_pe else None,
-            'Current_PB': round(current_pb, 2) if current_pb else None,
-            'Historical_PE_3Y_Avg': round(historical_pe_avg, 2) if historical_pe_avg else None,
-            'Peer_Median_PE': round(peer_pe_median, 2) if peer_pe_median else None,
-            'Valuation_Score': round(valuation_score, 3) if valuation_score else None,
+            'Current_Price_KES': current_price,
+            'Current_PE': current_pe if current_pe else None,
+            'Current_PB': current_pb if current_pb else None,
+            'Historical_PE_3Y_Avg': historical_pe_avg if historical_pe_avg else None,
+            'Peer_Median_PE': peer_pe_median if peer_pe_median else None,
+            'Valuation_Score': valuation_score if valuation_score else None,
             'Classification': classification,
             'Human_Review_Flag': f"💰 Stock is {classification} relative to history and peers. Determine your margin of safety."
         }
@@ -1092,6 +1379,66 @@ def calculate_valuation_score(symbol: str, company_data: Dict, peers: List[str])
 # STEP 6: MANAGEMENT BEHAVIOR
 # ============================================
 
+RED_FLAG_KEYWORDS = [
+    'pledge', 'pledged', 'insider sell', 'promoter reduction',
+    'loss', 'decline', 'decrease', 'warning', 'caution',
+    'resignation', 'exit', 'departure'
+]
+
+POSITIVE_KEYWORDS = [
+    'buyback', 'bonus', 'dividend', 'promoter increase',
+    'growth', 'increase', 'expansion', 'profit', 'record',
+    'appointment', 'strategic', 'partnership'
+]
+
+# One alternation per keyword list, so each announcement is scanned once per list
+# Keywords match anywhere in the lowercased text (e.g. 'loss' also matches 'losses')
+RED_FLAG_RE = re.compile('|'.join(map(re.escape, RED_FLAG_KEYWORDS)))
+POSITIVE_RE = re.compile('|'.join(map(re.escape, POSITIVE_KEYWORDS)))
+
+def _keyword_matcher(keywords: List[str], pattern: re.Pattern):
+    """
+    Return a text -> bool test for any keyword; an Aho-Corasick automaton walks the text once
+    regardless of keyword count, with the alternation regex as the fallback
+    """
+    if ahocorasick is None:
+        return lambda text: pattern.search(text) is not None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return lambda text: next(automaton.iter(text), None) is not None
+
+has_red_flag = _keyword_matcher(RED_FLAG_KEYWORDS, RED_FLAG_RE)
+has_positive_signal = _keyword_matcher(POSITIVE_KEYWORDS, POSITIVE_RE)
+
+# Announcement date formats, tried in order
+ANNOUNCEMENT_DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%b %d, %Y']
+ISO_DATE_PATTERN = r'\d{4}-\d{2}-\d{2}'
+
+def parse_announcement_dates(date_strings: List[str]) -> pd.Series:
+    """
+    Parse announcement dates; NaT where no format matches
+    Plain ISO dates (the common case) are converted in one datetime64 call, the rest go through the format list
+    """
+    dates = pd.Series(date_strings, dtype=object)
+    is_iso = dates.str.fullmatch(ISO_DATE_PATTERN, na=False).to_numpy()
+    parsed_dates = pd.Series(pd.NaT, index=dates.index, dtype='datetime64[s]')
+    try:
+        parsed_dates[is_iso] = np.array(dates[is_iso].tolist(), dtype='datetime64[D]')
+    except ValueError:  # An impossible date such as 2024-02-30; leave every string to the format list
+        is_iso = np.zeros(len(dates), dtype=bool)
+    
+    # First matching format wins
+    others = dates[~is_iso]
+    if len(others):
+        other_dates = None
+        for fmt in ANNOUNCEMENT_DATE_FORMATS:
+            parsed = pd.to_datetime(others, format=fmt, errors='coerce')
+            other_dates = parsed if other_dates is None else other_dates.fillna(parsed)
+        parsed_dates[~is_iso] = other_dates
+    return parsed_dates
+
 def analyze_management_signals(symbol: str) -> Dict:
     """
     Analyze corporate announcements for management signals
@@ -1108,54 +1455,31 @@ def analyze_management_signals(symbol: str) -> Dict:
                 'Human_Review_Flag': "⚪ MANAGEMENT SIGNAL: Neutral. No recent announcements found."
             }
         
-        red_flag_keywords = [
-            'pledge', 'pledged', 'insider sell', 'promoter reduction',
-            'loss', 'decline', 'decrease', 'warning', 'caution',
-            'resignation', 'exit', 'departure'
-        ]
-        
-        positive_keywords = [
-            'buyback', 'bonus', 'dividend', 'promoter increase',
-            'growth', 'increase', 'expansion', 'profit', 'record',
-            'appointment', 'strategic', 'partnership'
-        ]
-        
         red_flags = 0
         positive_signals = 0
         recent_announcements = []
         
         cutoff_date = datetime.now() - timedelta(days=180)
         
-        for announcement in announcements:
+        # Undated or unparseable announcements count as recent
+        parsed_dates = parse_announcement_dates([announcement.get('date', '') for announcement in announcements])
+        is_recent = (parsed_dates.isna() | (parsed_dates >= cutoff_date)).to_numpy()
+        
+        for i in np.flatnonzero(is_recent):
+            announcement = announcements[i]
             try:
-                ann_date_str = announcement.get('date', '')
-                ann_date = None
+                # Built once at fetch time; announcements from elsewhere are folded here
+                text = announcement.get('_lc')
+                if text is None:
+                    text = announcement_search_text(announcement.get('title', ''), announcement.get('content', ''))
                 
-                for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%b %d, %Y']:
-                    try:
-                        ann_date = datetime.strptime(ann_date_str, fmt)
-                        break
-                    except:
-                        continue
+                if has_red_flag(text):
+                    red_flags += 1
                 
-                if not ann_date:
-                    ann_date = datetime.now()
+                if has_positive_signal(text):
+                    positive_signals += 1
                 
-                if ann_date >= cutoff_date:
-                    text = (announcement.get('title', '') + ' ' + 
-                           announcement.get('content', '')).lower()
-                    
-                    for keyword in red_flag_keywords:
-                        if keyword in text:
-                            red_flags += 1
-                            break
-                    
-                    for keyword in positive_keywords:
-                        if keyword in text:
-                            positive_signals += 1
-                            break
-                    
-                    recent_announcements.append(announcement)
+                recent_announcements.append(announcement)
             
             except Exception as e:
                 logger.debug(f"Error analyzing announcement for {symbol}: {e}")
@@ -1194,84 +1518,173 @@ def analyze_management_signals(symbol: str) -> Dict:
 # COMPOSITE SCORING SYSTEM
 # ============================================
 
+# Composite feature vector layout: health passed, D/E (NaN if not numeric), moat score, growth passed,
+# revenue CAGR, profit CAGR (0 if missing), valuation band, management signal code
+MANAGEMENT_SIGNAL_CODES = {'POSITIVE': 0, 'NEUTRAL': 1, 'NEGATIVE': 2}  # Anything else (e.g. ERROR) is 3
+
+# Category weights: financial health, moat strength, growth potential, valuation, management
+COMPOSITE_WEIGHTS = np.array([0.25, 0.20, 0.20, 0.20, 0.15])
+
+# Valuation band per classification returned by calculate_valuation_score; anything else
+# (e.g. INSUFFICIENT DATA) is 3
+VALUATION_BAND_CODES = {
+    'UNDERVALUED': 0, 'POTENTIALLY UNDERVALUED': 0,
+    'FAIRLY VALUED': 1, 'WITHIN TYPICAL RANGE': 1,
+    'OVERVALUED': 2, 'POTENTIALLY OVERVALUED': 2,
+}
+
+# Category scores indexed by valuation band and management signal code
+VALUATION_BAND_SCORES = np.array([9.0, 7.0, 3.0, 5.0])
+MANAGEMENT_SIGNAL_SCORES = np.array([9.0, 7.0, 3.0, 5.0])
+
+# Composite inputs and the value used when a stock's analysis lacks one
+COMPOSITE_INPUT_DEFAULTS = {
+    'Financial_Health_Status': None, 'Debt_to_Equity': None, 'Moat_Score': 0, 'Passes_Growth_Criteria': False,
+    'Revenue_CAGR_5Y': 0, 'Profit_CAGR_5Y': 0, 'Valuation_Class': '', 'Management_Signal': 'NEUTRAL',
+}
+
+def batch_composite_features(columns: Dict[str, list]) -> np.ndarray:
+    """
+    Encode the composite score inputs of many stocks, given as one list per input column, as a (stocks x 8) matrix
+    """
+    def numbers(name):
+        return np.array([0.0 if value is None else value for value in columns[name]], dtype=np.float64)
+    
+    return np.column_stack([
+        np.array(columns['Financial_Health_Status'], dtype=object) == 'PASSED',
+        # 'N/A' when the ratio was not computed
+        [value if isinstance(value, (int, float)) else np.nan for value in columns['Debt_to_Equity']],
+        numbers('Moat_Score'),
+        np.array(columns['Passes_Growth_Criteria'], dtype=bool),
+        numbers('Revenue_CAGR_5Y'),
+        numbers('Profit_CAGR_5Y'),
+        [VALUATION_BAND_CODES.get(value, 3) for value in columns['Valuation_Class']],
+        [MANAGEMENT_SIGNAL_CODES.get(value, 3) for value in columns['Management_Signal']],
+    ]).astype(np.float64)
+
+def batch_composite_scores(features: np.ndarray) -> np.ndarray:
+    """
+    Unrounded composite scores for a (stocks x 8) feature matrix, one column operation per category
+    """
+    (health_passed, debt_to_equity, moat_score, growth_passed,
+     revenue_cagr, profit_cagr, valuation_band, management_signal) = np.atleast_2d(features).T
+    
+    has_debt_ratio = debt_to_equity != 0
+    debt_bonus = np.select([has_debt_ratio & (debt_to_equity < 0.5), has_debt_ratio & (debt_to_equity < 0.8)],
+                           [1.0, 0.5], default=0.0)
+    financial_health = np.where(health_passed != 0, 8.0 + debt_bonus, 0.0)
+    
+    moat_strength = np.minimum(moat_score / 10.0 * 10, 10.0)
+    
+    # Average of the CAGRs that are present (non-zero), then a bonus ladder; NaN compares False and earns nothing
+    has_revenue, has_profit = revenue_cagr != 0, profit_cagr != 0
+    avg_growth = np.where(has_revenue & has_profit, (revenue_cagr + profit_cagr) / 2,
+                          np.where(has_revenue, revenue_cagr, profit_cagr))
+    growth_bonus = np.select([avg_growth > 15, avg_growth > 10], [2.0, 1.0], default=0.0)
+    growth_potential = np.where(growth_passed != 0, 7.0 + growth_bonus, 4.0)
+    
+    valuation = VALUATION_BAND_SCORES[valuation_band.astype(np.intp)]
+    management = MANAGEMENT_SIGNAL_SCORES[management_signal.astype(np.intp)]
+    
+    # Multiply-then-sum adds left to right like the old per-stock scorer, so the unrounded scores match it
+    # bit for bit (a BLAS dot reorders the sum). The rounding callers apply does not: np.round scales by 100
+    # and rounds half to even, so scores near a .xx5 tie can come out 0.01 away from Python's round()
+    scores = np.column_stack([financial_health, moat_strength, growth_potential, valuation, management])
+    return (scores * COMPOSITE_WEIGHTS).sum(axis=1)
+
 def calculate_composite_score(stock_analysis: Dict) -> float:
     """
-    Calculate overall score (0-10) based on all criteria
+    Calculate overall score (0-10) based on all criteria, as a one-row batch
     """
-    weights = {
-        'financial_health': 0.25,
-        'moat_strength': 0.20,
-        'growth_potential': 0.20,
-        'valuation': 0.20,
-        'management': 0.15
-    }
-    
-    scores = {}
-    
-    # Financial Health Score
-    financial_health = stock_analysis.get('Financial_Health_Status')
-    if financial_health == 'PASSED':
-        scores['financial_health'] = 8.0
-        debt_to_equity = stock_analysis.get('Debt_to_Equity')
-        if debt_to_equity and debt_to_equity < 0.5:
-            scores['financial_health'] += 1.0
-        elif debt_to_equity and debt_to_equity < 0.8:
-            scores['financial_health'] += 0.5
-    else:
-        scores['financial_health'] = 0.0
-    
-    # Moat Strength Score
-    moat_score = stock_analysis.get('Moat_Score', 0)
-    scores['moat_strength'] = min(moat_score / 10.0 * 10, 10.0)
-    
-    # Growth Potential Score
-    growth_criteria = stock_analysis.get('Passes_Growth_Criteria', False)
-    revenue_cagr = stock_analysis.get('Revenue_CAGR_5Y', 0)
-    profit_cagr = stock_analysis.get('Profit_CAGR_5Y', 0)
-    
-    if growth_criteria:
-        scores['growth_potential'] = 7.0
-        avg_growth = (revenue_cagr + profit_cagr) / 2 if revenue_cagr and profit_cagr else revenue_cagr or profit_cagr or 0
-        if avg_growth > 15:
-            scores['growth_potential'] += 2.0
-        elif avg_growth > 10:
-            scores['growth_potential'] += 1.0
-    else:
-        scores['growth_potential'] = 4.0
-    
-    # Valuation Score
-    valuation_class = stock_analysis.get('Valuation_Class', '')
-    if 'UNDERVALUED' in valuation_class:
-        scores['valuation'] = 9.0
-    elif 'FAIRLY VALUED' in valuation_class or 'WITHIN TYPICAL RANGE' in valuation_class:
-        scores['valuation'] = 7.0
-    elif 'OVERVALUED' in valuation_class:
-        scores['valuation'] = 3.0
-    else:
-        scores['valuation'] = 5.0
-    
-    # Management Score
-    mgmt_signal = stock_analysis.get('Management_Signal', 'NEUTRAL')
-    if mgmt_signal == 'POSITIVE':
-        scores['management'] = 9.0
-    elif mgmt_signal == 'NEUTRAL':
-        scores['management'] = 7.0
-    elif mgmt_signal == 'NEGATIVE':
-        scores['management'] = 3.0
-    else:
-        scores['management'] = 5.0
-    
-    # Calculate weighted composite score
-    composite_score = 0
-    for category, weight in weights.items():
-        composite_score += scores.get(category, 5.0) * weight
-    
-    return round(composite_score, 2)
+    columns = {name: [stock_analysis.get(name, default)] for name, default in COMPOSITE_INPUT_DEFAULTS.items()}
+    return float(np.round(batch_composite_scores(batch_composite_features(columns))[0], 2))
 
 # ============================================
 # MAIN ORCHESTRATION FUNCTION
 # ============================================
 
+def analyze_symbol_pipeline(symbol: str, company_data: Dict) -> Dict:
+    """
+    CPU-bound analysis steps (3, 1, 2, 4, 5) for one symbol; no network access, so it can run in a worker process
+    Later steps are skipped once the symbol is rejected or has no growth data
+    """
+    fields = _get_field_map(company_data)
+    passed, financial_results = apply_financial_health_filters(symbol, company_data, fields)
+    analysis = {'Passed': passed, 'Financial_Results': financial_results}
+    if not passed:
+        return analysis
+    
+    view = CompanyView.from_company_data(symbol, company_data)
+    business_info = analyze_business_basics(symbol, company_data, view)
+    moat_info = analyze_competitive_position(symbol, view.sector, company_data, fields, view)
+    growth_info = calculate_growth_metrics(company_data, fields)
+    valuation_info = None
+    if growth_info:
+        valuation_info = calculate_valuation_score(symbol, company_data, moat_info.get('Competitors', []),
+                                                   fields, view)
+    
+    analysis.update({
+        'Business_Info': business_info,
+        'Moat_Info': moat_info,
+        'Growth_Info': growth_info,
+        'Valuation_Info': valuation_info
+    })
+    return analysis
+
+def _stock_row(symbol: str, analysis: Dict, mgmt_info: Dict) -> Tuple:
+    """
+    Report values for a stock that completed all six steps, in STOCK_ROW_FIELDS order
+    """
+    financial_results = analysis['Financial_Results']
+    business_info = analysis['Business_Info']
+    moat_info = analysis['Moat_Info']
+    moat_metrics = moat_info.get('Moat_Metrics', {})
+    growth_info = analysis['Growth_Info']
+    valuation_info = analysis['Valuation_Info']
+    return (
+        symbol,
+        business_info['Company_Name'],
+        business_info['Sector'],
+        moat_info.get('Market_Cap_KES_B'),
+        moat_metrics.get('Moat_Quality_Score', 0),
+        moat_metrics.get('ROE_5Y_Avg'),
+        moat_metrics.get('ROCE_5Y_Avg'),
+        moat_metrics.get('Operating_Margin_5Y_Avg'),
+        growth_info.get('Revenue_CAGR_5Y'),
+        growth_info.get('Profit_CAGR_5Y'),
+        growth_info.get('Growth_Quality_Ratio'),
+        growth_info.get('Passes_Growth_Criteria', False),
+        valuation_info.get('Current_Price_KES'),
+        valuation_info.get('Current_PE'),
+        valuation_info.get('Current_PB'),
+        valuation_info.get('Valuation_Score'),
+        valuation_info.get('Classification'),
+        mgmt_info['Management_Signal'],
+        financial_results['Status'],
+        financial_results['Filter_Results'].get('Debt_to_Equity'),
+        financial_results['Filter_Results'].get('OCF_Quality_Years'),
+        financial_results['Filter_Results'].get('Years_Checked')
+    )
+
+# Action tiers by composite score: below 5, [5, 6), [6, 7), [7, 8), 8 and above
+ACTION_THRESH = np.array([5.0, 6.0, 7.0, 8.0])
+ACTION_LABELS = np.array(['AVOID', 'WATCH', 'HOLD', 'BUY', 'STRONG BUY'])
+
+# Column dtypes of the screening result, in report order; text and mixed number/'N/A'
+# columns are objects, missing floats become NaN
+SCREEN_RESULT_DTYPE = np.dtype([
+    ('Symbol', 'O'), ('Company', 'O'), ('Sector', 'O'),
+    ('Market_Cap_KES_B', 'f8'), ('Moat_Score', 'i8'),
+    ('ROE_5Y_Avg', 'f8'), ('ROCE_5Y_Avg', 'f8'), ('Oper_Margin_5Y_Avg', 'f8'),
+    ('Revenue_CAGR_5Y', 'f8'), ('Profit_CAGR_5Y', 'f8'), ('Growth_Quality_Ratio', 'f8'),
+    ('Passes_Growth_Criteria', '?'),
+    ('Current_Price_KES', 'f8'), ('Current_PE', 'f8'), ('Current_PB', 'f8'),
+    ('Valuation_Score', 'f8'), ('Valuation_Class', 'O'), ('Management_Signal', 'O'),
+    ('Financial_Health_Status', 'O'), ('Debt_to_Equity', 'O'), ('OCF_Quality_Years', 'O'),
+    ('Profit_Consistency_Years', 'i8'), ('Composite_Score', 'f8'), ('Action', 'O'),
+])
+STOCK_ROW_FIELDS = SCREEN_RESULT_DTYPE.names[:-2]  # Everything but the composite score and action
+
 def screen_stocks(universe_size: int = 20) -> pd.DataFrame:
     """
     Main function to run the complete screening process
@@ -1296,141 +1709,121 @@ def screen_stocks(universe_size: int = 20) -> pd.DataFrame:
     print(f"\n📊 Analyzing {len(universe)} NSE Kenya stocks")
     print(f"Starting time: {datetime.now().strftime('%H:%M:%S')}\n")
     
-    results_list = []
-    passed_stocks = []
-    
-    # Process each stock
-    for idx, row in universe.iterrows():
-        symbol = row['Symbol']
-        print(f"\n--- Analyzing {symbol} ({idx+1}/{len(universe)}) ---")
+    symbols = universe['Symbol'].tolist()
+    
+    # Check cache first, then fetch every miss in one concurrent batch
+    cached_data = {symbol: cache.load(symbol, 'fundamentals') for symbol in symbols}
+    missing_symbols = [symbol for symbol, data in cached_data.items() if not data]
+    fetched_data = data_fetcher.fetch_fundamentals_batch(missing_symbols) if missing_symbols else {}
+    
+    # Cache fresh fetches, then run the CPU-bound steps for every symbol with data across worker processes
+    company_data_by_symbol = {}
+    for symbol in symbols:
+        if cached_data[symbol]:
+            company_data_by_symbol[symbol] = cached_data[symbol]
+        elif fetched_data[symbol] is not None:
+            company_data_by_symbol[symbol] = fetched_data[symbol]
+            cache.save(symbol, fetched_data[symbol], 'fundamentals')
+    
+    # Steps 1-5 depend only on the fundamentals, so results from an earlier run with identical data are reused
+    digests = {symbol: fundamentals_digest(data) for symbol, data in company_data_by_symbol.items()}
+    analyses = {}
+    for symbol, digest in digests.items():
+        stored = cache.load_object(f"{symbol}_{digest}", 'analysis')
+        if stored is not None:
+            analyses[symbol] = stored
+    
+    analyzed_symbols = [symbol for symbol in company_data_by_symbol if symbol not in analyses]
+    analyzed_data = [company_data_by_symbol[symbol] for symbol in analyzed_symbols]
+    if len(analyzed_symbols) < 2:
+        # Starting worker processes costs more than analyzing a single symbol in place
+        fresh_analyses = dict(zip(analyzed_symbols, map(analyze_symbol_pipeline, analyzed_symbols, analyzed_data)))
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            fresh_analyses = dict(zip(analyzed_symbols, executor.map(
+                analyze_symbol_pipeline, analyzed_symbols, analyzed_data, chunksize=8)))
+    for symbol, analysis in fresh_analyses.items():
+        cache.save_object(f"{symbol}_{digests[symbol]}", analysis, 'analysis')
+    analyses.update(fresh_analyses)
+    
+    # Step 6 fetches announcements for every stock that gets that far; overlap those round trips too
+    mgmt_symbols = [symbol for symbol in symbols if symbol in analyses and analyses[symbol]['Passed']
+                    and analyses[symbol].get('Growth_Info') and analyses[symbol].get('Valuation_Info')]
+    mgmt_infos = dict(zip(mgmt_symbols, io_executor.map(analyze_management_signals, mgmt_symbols)))
+    
+    # Every stock reaching step 6 completes; lay their report values out as one list per column
+    # (in universe order) and score them all in one batch
+    rows = [_stock_row(symbol, analyses[symbol], mgmt_infos[symbol]) for symbol in mgmt_symbols]
+    columns = {name: list(values) for name, values in zip(STOCK_ROW_FIELDS, zip(*rows))}
+    row_of = {symbol: i for i, symbol in enumerate(mgmt_symbols)}
+    if rows:
+        scores = batch_composite_scores(batch_composite_features(columns))
+        columns['Composite_Score'] = np.round(scores, 2).tolist()
+        columns['Action'] = ACTION_LABELS[np.searchsorted(ACTION_THRESH, columns['Composite_Score'],
+                                                          side='right')].tolist()
+    
+    # Report each stock's outcome; step-by-step progress is only logged at DEBUG level
+    for idx, symbol in enumerate(symbols, start=1):
+        logger.debug("--- Analyzing %s (%d/%d) ---", symbol, idx, len(symbols))
+        
+        if cached_data[symbol]:
+            logger.debug("  📂 Using cached data for %s", symbol)
+        elif symbol not in analyses:
+            print(f"  ❌ Skipping {symbol} - data unavailable")
+            continue
         
-        # Check cache first
-        cached_data = cache.load(symbol, 'fundamentals')
-        if cached_data:
-            company_data = cached_data
-            print(f"  📂 Using cached data for {symbol}")
-        else:
-            # Fetch fresh data
-            company_data = data_fetcher.fetch_company_fundamentals(symbol)
-            if company_data is None:
-                print(f"  ❌ Skipping {symbol} - data unavailable")
-                continue
-            
-            # Cache the data
-            cache.save(symbol, company_data, 'fundamentals')
+        analysis = analyses[symbol]
         
         # STEP 3: Apply financial filters
-        print(f"  📊 Step 3: Financial Health Check...")
-        passed, financial_results = apply_financial_health_filters(symbol, company_data)
+        logger.debug("  📊 Step 3: Financial Health Check...")
+        passed, financial_results = analysis['Passed'], analysis['Financial_Results']
         
         if not passed:
             print(f"  ❌ {symbol} REJECTED: {financial_results['Reason']}")
             continue
         
-        print(f"  ✅ {symbol} passed financial health filters")
-        
-        # For passing stocks, perform full analysis
-        stock_analysis = {'Symbol': symbol}
+        logger.debug("  ✅ %s passed financial health filters", symbol)
         
         # STEP 1: Business basics
-        print(f"  🏢 Step 1: Business Analysis...")
-        business_info = analyze_business_basics(symbol, company_data)
-        stock_analysis.update({
-            'Company': business_info['Company_Name'],
-            'Sector': business_info['Sector']
-        })
+        logger.debug("  🏢 Step 1: Business Analysis...")
         
         # STEP 2: Moat analysis
-        print(f"  🛡️  Step 2: Competitive Moat Analysis...")
-        sector = business_info['Sector']
-        moat_info = analyze_competitive_position(symbol, sector, company_data)
-        moat_metrics = moat_info.get('Moat_Metrics', {})
-        
-        stock_analysis.update({
-            'Market_Cap_KES_B': moat_info.get('Market_Cap_KES_B'),
-            'Moat_Score': moat_metrics.get('Moat_Quality_Score', 0),
-            'ROE_5Y_Avg': moat_metrics.get('ROE_5Y_Avg'),
-            'ROCE_5Y_Avg': moat_metrics.get('ROCE_5Y_Avg'),
-            'Oper_Margin_5Y_Avg': moat_metrics.get('Operating_Margin_5Y_Avg')
-        })
+        logger.debug("  🛡️  Step 2: Competitive Moat Analysis...")
         
         # STEP 4: Growth metrics
-        print(f"  📈 Step 4: Growth Potential Analysis...")
-        growth_info = calculate_growth_metrics(company_data)
+        logger.debug("  📈 Step 4: Growth Potential Analysis...")
+        growth_info = analysis['Growth_Info']
         
         if not growth_info:
             print(f"  ⚠️ {symbol} - No growth data available")
             continue
         
-        stock_analysis.update({
-            'Revenue_CAGR_5Y': growth_info.get('Revenue_CAGR_5Y'),
-            'Profit_CAGR_5Y': growth_info.get('Profit_CAGR_5Y'),
-            'Growth_Quality_Ratio': growth_info.get('Growth_Quality_Ratio'),
-            'Passes_Growth_Criteria': growth_info.get('Passes_Growth_Criteria', False)
-        })
-        
         if not growth_info.get('Passes_Growth_Criteria', False):
             print(f"  ⚠️ {symbol} - Weak growth profile")
         
         # STEP 5: Valuation
-        print(f"  💰 Step 5: Valuation Analysis...")
-        peers = moat_info.get('Competitors', [])
-        valuation_info = calculate_valuation_score(symbol, company_data, peers)
+        logger.debug("  💰 Step 5: Valuation Analysis...")
         
-        if not valuation_info:
+        if not analysis['Valuation_Info']:
             print(f"  ⚠️ {symbol} - No valuation data available")
             continue
         
-        stock_analysis.update({
-            'Current_Price_KES': valuation_info.get('Current_Price_KES'),
-            'Current_PE': valuation_info.get('Current_PE'),
-            'Current_PB': valuation_info.get('Current_PB'),
-            'Valuation_Score': valuation_info.get('Valuation_Score'),
-            'Valuation_Class': valuation_info.get('Classification')
-        })
-        
         # STEP 6: Management
-        print(f"  👥 Step 6: Management Behavior Analysis...")
-        mgmt_info = analyze_management_signals(symbol)
-        stock_analysis['Management_Signal'] = mgmt_info['Management_Signal']
-        
-        # Financial health details from Step 3
-        stock_analysis.update({
-            'Financial_Health_Status': financial_results['Status'],
-            'Debt_to_Equity': financial_results['Filter_Results'].get('Debt_to_Equity'),
-            'OCF_Quality_Years': financial_results['Filter_Results'].get('OCF_Quality_Years'),
-            'Profit_Consistency_Years': financial_results['Filter_Results'].get('Years_Checked')
-        })
+        logger.debug("  👥 Step 6: Management Behavior Analysis...")
+        composite, action = columns['Composite_Score'][row_of[symbol]], columns['Action'][row_of[symbol]]
         
-        # Calculate composite score
-        stock_analysis['Composite_Score'] = calculate_composite_score(stock_analysis)
-        
-        # Determine action recommendation
-        composite = stock_analysis['Composite_Score']
-        if composite >= 8.0:
-            action = "STRONG BUY"
-        elif composite >= 7.0:
-            action = "BUY"
-        elif composite >= 6.0:
-            action = "HOLD"
-        elif composite >= 5.0:
-            action = "WATCH"
-        else:
-            action = "AVOID"
-        
-        stock_analysis['Action'] = action
-        
-        passed_stocks.append(stock_analysis)
         print(f"  ✅ {symbol} ANALYSIS COMPLETE - {action}")
         print(f"     Composite Score: {composite}/10")
     
     # Create final report
-    if passed_stocks:
-        final_df = pd.DataFrame(passed_stocks)
-        final_df = final_df.sort_values('Composite_Score', ascending=False)
+    if rows:
+        # Each column list becomes one typed array; the stable sort keeps tied scores in universe order
+        final_df = pd.DataFrame({name: np.array(columns[name], dtype=SCREEN_RESULT_DTYPE[name])
+                                 for name in SCREEN_RESULT_DTYPE.names})
+        final_df = final_df.iloc[np.argsort(-final_df['Composite_Score'].to_numpy(), kind='stable')]
         
         print("\n" + "=" * 70)
-        print(f"ANALYSIS COMPLETE: {len(passed_stocks)} stocks passed initial filters")
+        print(f"ANALYSIS COMPLETE: {len(rows)} stocks passed initial filters")
         print(f"Completion time: {datetime.now().strftime('%H:%M:%S')}")
         print("=" * 70)
         
@@ -1443,6 +1836,92 @@ def screen_stocks(universe_size: int = 20) -> pd.DataFrame:
 # REPORT GENERATION
 # ============================================
 
+# Display templates for report columns; missing values show as 'N/A'
+DISPLAY_FORMATS = {
+    'Current_Price_KES': '{:,.2f}',
+    'Market_Cap_KES_B': '{:.2f}B',
+    'Revenue_CAGR_5Y': '{}%',
+    'Profit_CAGR_5Y': '{}%',
+}
+
+HTML_REPORT_TEMPLATE = string.Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>NSE Kenya Stock Screener Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        h1 { color: #2c3e50; }
+        h2 { color: #34495e; margin-top: 30px; }
+        table { border-collapse: collapse; width: 100%; margin-top: 20px; }
+        th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+        th { background-color: #f2f2f2; font-weight: bold; }
+        tr:nth-child(even) { background-color: #f9f9f9; }
+        .strong-buy { background-color: #d4edda; }
+        .buy { background-color: #d1ecf1; }
+        .hold { background-color: #fff3cd; }
+        .watch { background-color: #f8d7da; }
+        .avoid { background-color: #f5c6cb; }
+    </style>
+</head>
+<body>
+    <h1>NSE Kenya Stock Screener Report</h1>
+    <p>Generated: $generated</p>
+    <p>Stocks Analyzed: $stock_count</p>
+    
+    <h2>Top Recommendations</h2>
+    $table
+    
+    <h2>Analysis Summary</h2>
+    <ul>
+        <li>Average Composite Score: $avg_score/10</li>
+        <li>Strong Buy Recommendations: $strong_buy</li>
+        <li>Buy Recommendations: $buy</li>
+        <li>Average P/E Ratio: $avg_pe</li>
+    </ul>
+    
+    <h2>Investment Framework Applied</h2>
+    <ol>
+        <li><strong>Business Understanding</strong>: Simple, understandable companies</li>
+        <li><strong>Competitive Moat</strong>: Sustainable competitive advantages</li>
+        <li><strong>Financial Health</strong>: Profitability, cash flow, manageable debt</li>
+        <li><strong>Growth Potential</strong>: Sustainable revenue and earnings growth</li>
+        <li><strong>Valuation Discipline</strong>: Price determines future returns</li>
+        <li><strong>Management Behavior</strong>: Insider confidence and alignment</li>
+    </ol>
+    
+    <p><em>Note: This is a screening tool, not investment advice. Always conduct your own research.</em></p>
+</body>
+</html>
+""")
+
+def _format_column(values: pd.Series, template: str, missing: str = 'N/A') -> pd.Series:
+    """
+    Format every non-null value of a column with a str.format template in one map pass
+    """
+    formatted = values.map(template.format, na_action='ignore')
+    return pd.Series(np.where(values.notna(), formatted, missing), index=values.index)
+
+def _html_table(frame: pd.DataFrame) -> str:
+    """
+    Render the display frame as the report's HTML table
+    Each column is formatted and escaped in one vectorized pass and rows are joined as plain strings,
+    skipping DataFrame.to_html's per-cell formatter machinery; floats show 2 decimals, nulls 'N/A'
+    """
+    cells = []
+    for name in frame.columns:
+        values = frame[name]
+        template = '{:.2f}' if pd.api.types.is_float_dtype(values) else '{}'
+        text = _format_column(values, template).astype(str)
+        escaped = text.str.replace('&', '&amp;').str.replace('<', '&lt;').str.replace('>', '&gt;')
+        cells.append(('      <td>' + escaped + '</td>\n').tolist())
+    
+    header = ''.join(f"      <th>{html.escape(str(name), quote=False)}</th>\n" for name in frame.columns)
+    body = ''.join(f"    <tr>\n{''.join(row)}    </tr>\n" for row in zip(*cells))
+    return (f'<table border="1" class="dataframe">\n'
+            f'  <thead>\n    <tr style="text-align: right;">\n{header}    </tr>\n  </thead>\n'
+            f'  <tbody>\n{body}  </tbody>\n</table>')
+
 def generate_report(df: pd.DataFrame, output_format: str = 'both'):
     """
     Generate formatted output report
@@ -1451,6 +1930,9 @@ def generate_report(df: pd.DataFrame, output_format: str = 'both'):
         print("No stocks to report")
         return
     
+    # Analysis steps return unrounded metrics; round every numeric column once for the report
+    df = df.round({**dict.fromkeys(df.columns, 2), 'Valuation_Score': 3})
+    
     timestamp = datetime.now().strftime('%Y%m%d_%H%M')
     
     # Select and order columns for display
@@ -1466,83 +1948,34 @@ def generate_report(df: pd.DataFrame, output_format: str = 'both'):
     display_df = df[available_columns]
     
     # Format numeric columns
-    if 'Current_Price_KES' in display_df.columns:
-        display_df['Current_Price_KES'] = display_df['Current_Price_KES'].apply(
-            lambda x: f"{x:,.2f}" if pd.notnull(x) else 'N/A'
-        )
-    
-    if 'Market_Cap_KES_B' in display_df.columns:
-        display_df['Market_Cap_KES_B'] = display_df['Market_Cap_KES_B'].apply(
-            lambda x: f"{x:.2f}B" if pd.notnull(x) else 'N/A'
-        )
-    
-    if 'Revenue_CAGR_5Y' in display_df.columns:
-        display_df['Revenue_CAGR_5Y'] = display_df['Revenue_CAGR_5Y'].apply(
-            lambda x: f"{x}%" if pd.notnull(x) else 'N/A'
-        )
-    
-    if 'Profit_CAGR_5Y' in display_df.columns:
-        display_df['Profit_CAGR_5Y'] = display_df['Profit_CAGR_5Y'].apply(
-            lambda x: f"{x}%" if pd.notnull(x) else 'N/A'
-        )
+    for column, template in DISPLAY_FORMATS.items():
+        if column in display_df.columns:
+            display_df[column] = _format_column(display_df[column], template)
     
     if 'Debt_to_Equity' in display_df.columns:
-        display_df['Debt_to_Equity'] = display_df['Debt_to_Equity'].apply(
-            lambda x: f"{x:.2f}" if pd.notnull(x) and not isinstance(x, str) else x
-        )
+        # Numbers only; 'N/A' markers and nulls pass through unchanged
+        debt_to_equity = pd.to_numeric(display_df['Debt_to_Equity'], errors='coerce')
+        display_df['Debt_to_Equity'] = display_df['Debt_to_Equity'].where(
+            debt_to_equity.isna(), debt_to_equity.map('{:.2f}'.format, na_action='ignore')
+        ).infer_objects()
+    
+    # One pass over the summary columns serves both the HTML and Excel summaries
+    action_counts = df['Action'].value_counts().to_dict()
+    avg_score = f"{df['Composite_Score'].mean():.2f}"
+    avg_pe = f"{df['Current_PE'].mean():.2f}" if 'Current_PE' in df.columns else 'N/A'
+    avg_market_cap = f"{df['Market_Cap_KES_B'].mean():.2f}" if 'Market_Cap_KES_B' in df.columns else 'N/A'
     
     # Generate HTML report
     if output_format in ['html', 'both']:
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>NSE Kenya Stock Screener Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                h1 {{ color: #2c3e50; }}
-                h2 {{ color: #34495e; margin-top: 30px; }}
-                table {{ border-collapse: collapse; width: 100%; margin-top: 20px; }}
-                th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-                th {{ background-color: #f2f2f2; font-weight: bold; }}
-                tr:nth-child(even) {{ background-color: #f9f9f9; }}
-                .strong-buy {{ background-color: #d4edda; }}
-                .buy {{ background-color: #d1ecf1; }}
-                .hold {{ background-color: #fff3cd; }}
-                .watch {{ background-color: #f8d7da; }}
-                .avoid {{ background-color: #f5c6cb; }}
-            </style>
-        </head>
-        <body>
-            <h1>NSE Kenya Stock Screener Report</h1>
-            <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p>Stocks Analyzed: {len(df)}</p>
-            
-            <h2>Top Recommendations</h2>
-            {display_df.to_html(index=False, classes='dataframe')}
-            
-            <h2>Analysis Summary</h2>
-            <ul>
-                <li>Average Composite Score: {df['Composite_Score'].mean():.2f}/10</li>
-                <li>Strong Buy Recommendations: {(df['Action'] == 'STRONG BUY').sum()}</li>
-                <li>Buy Recommendations: {(df['Action'] == 'BUY').sum()}</li>
-                <li>Average P/E Ratio: {df['Current_PE'].mean():.2f if 'Current_PE' in df.columns else 'N/A'}</li>
-            </ul>
-            
-            <h2>Investment Framework Applied</h2>
-            <ol>
-                <li><strong>Business Understanding</strong>: Simple, understandable companies</li>
-                <li><strong>Competitive Moat</strong>: Sustainable competitive advantages</li>
-                <li><strong>Financial Health</strong>: Profitability, cash flow, manageable debt</li>
-                <li><strong>Growth Potential</strong>: Sustainable revenue and earnings growth</li>
-                <li><strong>Valuation Discipline</strong>: Price determines future returns</li>
-                <li><strong>Management Behavior</strong>: Insider confidence and alignment</li>
-            </ol>
-            
-            <p><em>Note: This is a screening tool, not investment advice. Always conduct your own research.</em></p>
-        </body>
-        </html>
-        """
+        html_content = HTML_REPORT_TEMPLATE.substitute(
+            generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            stock_count=len(df),
+            table=_html_table(display_df),
+            avg_score=avg_score,
+            strong_buy=action_counts.get('STRONG BUY', 0),
+            buy=action_counts.get('BUY', 0),
+            avg_pe=avg_pe
+        )
         
         html_file = f"nse_kenya_screener_{timestamp}.html"
         with open(html_file, 'w', encoding='utf-8') as f:
@@ -1559,7 +1992,7 @@ def generate_report(df: pd.DataFrame, output_format: str = 'both'):
     if output_format in ['excel', 'both']:
         try:
             excel_file = f"nse_kenya_screener_{timestamp}.xlsx"
-            with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+            with pd.ExcelWriter(excel_file, engine=EXCEL_ENGINE) as writer:
                 df.to_excel(writer, sheet_name='Stock Analysis', index=False)
                 
                 summary_data = {
@@ -1573,11 +2006,11 @@ def generate_report(df: pd.DataFrame, output_format: str = 'both'):
                     ],
                     'Value': [
                         len(df),
-                        f"{df['Composite_Score'].mean():.2f}/10",
-                        (df['Action'] == 'STRONG BUY').sum(),
-                        (df['Action'] == 'BUY').sum(),
-                        f"{df['Current_PE'].mean():.2f}" if 'Current_PE' in df.columns else 'N/A',
-                        f"{df['Market_Cap_KES_B'].mean():.2f}" if 'Market_Cap_KES_B' in df.columns else 'N/A'
+                        f"{avg_score}/10",
+                        action_counts.get('STRONG BUY', 0),
+                        action_counts.get('BUY', 0),
+                        avg_pe,
+                        avg_market_cap
                     ]
                 }
                 summary_df = pd.DataFrame(summary_data)
@@ -1620,18 +2053,22 @@ def run_test_analysis():
     for symbol in test_stocks:
         print(f"\nTesting {symbol}...")
         
-        company_data = data_fetcher.fetch_company_fundamentals(symbol)
+        company_data = cache.load(symbol, 'fundamentals')
         if not company_data:
-            print(f"  ❌ No data for {symbol}")
-            continue
+            company_data = data_fetcher.fetch_company_fundamentals(symbol)
+            if not company_data:
+                print(f"  ❌ No data for {symbol}")
+                continue
+            cache.save(symbol, company_data, 'fundamentals')
         
-        passed, results = apply_financial_health_filters(symbol, company_data)
+        fields = _get_field_map(company_data)
+        passed, results = apply_financial_health_filters(symbol, company_data, fields)
         print(f"  Financial Health: {'PASSED' if passed else 'FAILED'}")
         
         if passed:
-            moat_info = calculate_moat_indicators(company_data)
-            growth_info = calculate_growth_metrics(company_data)
-            valuation_info = calculate_valuation_score(symbol, company_data, [])
+            moat_info = calculate_moat_indicators(company_data, fields)
+            growth_info = calculate_growth_metrics(company_data, fields)
+            valuation_info = calculate_valuation_score(symbol, company_data, [], fields)
             mgmt_info = analyze_management_signals(symbol)
             
             print(f"  Moat Score: {moat_info.get('Moat_Quality_Score', 'N/A') if moat_info else 'N/A'}")
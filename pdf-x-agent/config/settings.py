@@ -34,5 +34,13 @@ MAX_POST_LENGTH = 280
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 
+# Vector store HNSW index settings (only applied when the collection is first created)
+HNSW_M = 16  # Graph links per node
+HNSW_CONSTRUCTION_EF = 200  # Build-time candidate list: higher = better recall, slower inserts
+HNSW_SEARCH_EF = 100  # Query-time candidate list: higher = better recall, slower queries
+HNSW_NUM_THREADS = os.cpu_count() or 1
+HNSW_BATCH_SIZE = 500  # Vectors buffered before they are added to the index
+HNSW_SYNC_THRESHOLD = 1000  # Vectors added before the index is persisted to disk
+
 # Logging
 LOG_LEVEL = "INFO"
\ No newline at end of file
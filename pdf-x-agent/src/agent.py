@@ -2,6 +2,11 @@ import schedule
 import time
 import random
 import json
+import copy
+import hashlib
+import queue
+import threading
+import atexit
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -16,56 +21,137 @@ from utils.file_handler import FileHandler
 from utils.logger import logger
 
 class PDFXAgent:
+    # Append-only event logs, each with the state header counter that tracks its length
+    EVENT_COUNTERS = {"posted_tweets": "total_tweets", "errors": "error_count"}
+    # Algorithm behind processed_files hashes; state files without it were hashed with MD5
+    HASH_ALGORITHM = "blake2b"
+    
     def __init__(self):
         self.pdf_processor = PDFProcessor()
         self.analyzer = TextAnalyzer()
-        self.vector_store = DocumentVectorStore()
+        self.vector_store = DocumentVectorStore(analyzer=self.analyzer)
         self.x_poster = XPoster()
         self.file_handler = FileHandler()
         
-        # State tracking
-        self.state_file = Path(__file__).parent.parent / "data" / "agent_state.json"
+        # State tracking: a small JSON header, with tweets and errors in append-only JSONL logs
+        data_dir = Path(__file__).parent.parent / "data"
+        self.state_file = data_dir / "agent_state.json"
+        self.event_logs = {name: data_dir / f"{name}.jsonl" for name in self.EVENT_COUNTERS}
         self.load_state()
         
+        # State files are written by a background thread so posting never waits on the disk;
+        # the queue is drained before the interpreter exits
+        self._state_queue = queue.Queue()
+        threading.Thread(target=self._state_writer, name="state-writer", daemon=True).start()
+        atexit.register(self._state_queue.join)
+        
     def load_state(self):
         """Load agent state from file"""
         try:
             if self.state_file.exists():
                 self.state = self.file_handler.read_json(self.state_file)
                 logger.info(f"Loaded state from {self.state_file}")
+                
+                # Older state files kept the full event lists inline; move them into the logs once
+                if any(name in self.state for name in self.EVENT_COUNTERS):
+                    for name in self.EVENT_COUNTERS:
+                        for entry in self.state.pop(name, []):
+                            self.log_event(name, entry)
+                    self.file_handler.write_json(self.state, self.state_file)
+                
+                if self.state.get("hash_algorithm") != self.HASH_ALGORITHM:
+                    try:
+                        self._migrate_file_hashes()
+                        self.state["hash_algorithm"] = self.HASH_ALGORITHM
+                        self.file_handler.write_json(self.state, self.state_file)
+                    except Exception as e:
+                        # Keep the loaded state; the migration is retried on the next load
+                        logger.error(f"Error migrating file hashes: {e}")
             else:
                 self.state = {
                     "last_run": None,
                     "processed_files": [],
-                    "posted_tweets": [],
+                    "hash_algorithm": self.HASH_ALGORITHM,
+                    "total_tweets": 0,
                     "total_runs": 0,
-                    "errors": []
+                    "error_count": 0
                 }
         except Exception as e:
             logger.error(f"Error loading state: {e}")
             self.state = {
                 "last_run": None,
                 "processed_files": [],
-                "posted_tweets": [],
+                "hash_algorithm": self.HASH_ALGORITHM,
+                "total_tweets": 0,
                 "total_runs": 0,
-                "errors": []
+                "error_count": 0
             }
     
+    def _migrate_file_hashes(self):
+        """
+        Rehash processed files still recorded with their MD5 hash, in the state and the document index,
+        so unchanged files aren't re-processed and re-embedded after the switch to BLAKE2b
+        """
+        migrated = {}
+        for entry in self.state["processed_files"]:
+            pdf_path = PDF_DIR / entry["filename"]
+            if not pdf_path.is_file():
+                continue
+            legacy_hash = hashlib.md5()
+            with open(pdf_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    legacy_hash.update(block)
+            # A mismatch means the file changed since, or the entry already holds a BLAKE2b hash
+            if legacy_hash.hexdigest() != entry["hash"]:
+                continue
+            entry["hash"] = self.pdf_processor.get_file_hash(pdf_path)
+            migrated[entry["filename"]] = (legacy_hash.hexdigest(), entry["hash"])
+        
+        if migrated:
+            self.vector_store.rehash_documents(migrated)
+            logger.info(f"Migrated {len(migrated)} processed file hashes from MD5 to BLAKE2b")
+    
     def save_state(self):
-        """Save agent state to file"""
+        """Queue a snapshot of the agent state for the background writer"""
         try:
             self.state["last_run"] = str(datetime.now())
-            self.file_handler.write_json(self.state, self.state_file)
-            logger.debug("State saved")
+            self._state_queue.put(copy.deepcopy(self.state))
         except Exception as e:
             logger.error(f"Error saving state: {e}")
     
+    def _state_writer(self):
+        """Write queued state snapshots in order, skipping to the newest when several are waiting"""
+        while True:
+            snapshots = [self._state_queue.get()]
+            while True:
+                try:
+                    snapshots.append(self._state_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                # write_json logs and returns False on failure rather than raising
+                if self.file_handler.write_json(snapshots[-1], self.state_file):
+                    logger.debug("State saved")
+                else:
+                    logger.error(f"Error saving state to {self.state_file}")
+            finally:
+                for _ in snapshots:
+                    self._state_queue.task_done()
+    
+    def log_event(self, name: str, entry: Dict[str, Any]):
+        """Append one entry to an event log; only its count is kept in the state header"""
+        with open(self.event_logs[name], 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        counter = self.EVENT_COUNTERS[name]
+        self.state[counter] = self.state.get(counter, 0) + 1
+    
     def process_new_documents(self) -> List[Dict[str, Any]]:
         """Find and process new PDF documents"""
         logger.info("🔍 Scanning for new PDF documents...")
         
         # Get all PDF files
-        pdf_files = list(PDF_DIR.glob("*.pdf"))
+        pdf_files = self.file_handler.get_files(PDF_DIR)
         
         if not pdf_files:
             logger.warning(f"No PDF files found in {PDF_DIR}")
@@ -73,18 +159,25 @@ class PDFXAgent:
         
         logger.info(f"Found {len(pdf_files)} PDF files")
         
-        # Process new files
+        # Process new files, checking each against a set of (filename, hash) pairs already done
         new_documents = []
+        processed = {(f["filename"], f["hash"]) for f in self.state["processed_files"]}
+        # A file whose modification time and size match its processed entry keeps that entry's hash
+        known_stats = {f["filename"]: ((f["mtime_ns"], f["size"]), f["hash"])
+                       for f in self.state["processed_files"] if "mtime_ns" in f}
         for pdf_file in pdf_files:
-            file_hash = self.pdf_processor.get_file_hash(pdf_file)
+            stat = pdf_file.stat()
+            file_stat = (stat.st_mtime_ns, stat.st_size)
+            known_stat, file_hash = known_stats.get(pdf_file.name, (None, None))
+            if known_stat != file_stat:
+                file_hash = self.pdf_processor.get_file_hash(pdf_file)
             
             # Check if already processed
-            if any(f["filename"] == pdf_file.name and f["hash"] == file_hash 
-                  for f in self.state["processed_files"]):
+            if (pdf_file.name, file_hash) in processed:
                 continue
             
             # Process the PDF
-            doc_data = self.pdf_processor.process_single_pdf(pdf_file)
+            doc_data = self.pdf_processor.process_single_pdf(pdf_file, file_hash)
             if doc_data:
                 new_documents.append(doc_data)
                 
@@ -92,8 +185,11 @@ class PDFXAgent:
                 self.state["processed_files"].append({
                     "filename": pdf_file.name,
                     "hash": file_hash,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
                     "processed_at": str(datetime.now())
                 })
+                processed.add((pdf_file.name, file_hash))
         
         if new_documents:
             logger.info(f"📄 Processed {len(new_documents)} new documents")
@@ -160,7 +256,7 @@ class PDFXAgent:
             
             if result and result.get("success"):
                 # Log the successful post
-                self.state["posted_tweets"].append({
+                self.log_event("posted_tweets", {
                     "timestamp": str(datetime.now()),
                     "tweet_id": result.get("tweet_id"),
                     "topic": analysis.get("main_topic"),
@@ -177,7 +273,7 @@ class PDFXAgent:
                 logger.error(f"❌ Post failed: {error_msg}")
                 
                 # Log error
-                self.state["errors"].append({
+                self.log_event("errors", {
                     "timestamp": str(datetime.now()),
                     "error": error_msg,
                     "post_preview": post[:100] + "..."
@@ -188,7 +284,7 @@ class PDFXAgent:
         except Exception as e:
             logger.error(f"Error in create_and_post: {e}")
             
-            self.state["errors"].append({
+            self.log_event("errors", {
                 "timestamp": str(datetime.now()),
                 "error": str(e)
             })
@@ -203,9 +299,9 @@ class PDFXAgent:
             "agent": {
                 "total_runs": self.state["total_runs"],
                 "last_run": self.state["last_run"],
-                "total_tweets": len(self.state["posted_tweets"]),
+                "total_tweets": self.state.get("total_tweets", 0),
                 "total_documents": len(self.state["processed_files"]),
-                "error_count": len(self.state["errors"])
+                "error_count": self.state.get("error_count", 0)
             },
             "vector_store": vector_stats,
             "models": {
@@ -242,7 +338,7 @@ class PDFXAgent:
                 
                 if not pdf_name:
                     # List available PDFs
-                    pdf_files = list(PDF_DIR.glob("*.pdf"))
+                    pdf_files = self.file_handler.get_files(PDF_DIR)
                     if pdf_files:
                         print("\nAvailable PDFs:")
                         for i, pdf in enumerate(pdf_files, 1):
@@ -323,14 +419,13 @@ class PDFXAgent:
         
         try:
             while True:
+                # Sleep straight through to the next run instead of waking every minute; capped at an
+                # hour so clock changes are picked up
+                delay = schedule.idle_seconds()
+                if delay is not None and delay > 0:
+                    print(f"\r⏳ Next run at: {schedule.next_run():%Y-%m-%d %H:%M:%S}", end="", flush=True)
+                    time.sleep(min(delay, 3600))
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
-                
-                # Show next run time
-                next_run = schedule.next_run()
-                if next_run:
-                    remaining = next_run - datetime.now()
-                    print(f"\r⏳ Next run in: {str(remaining).split('.')[0]}", end="", flush=True)
                     
         except KeyboardInterrupt:
             print("\n\n🛑 Agent stopped by user")
@@ -339,10 +434,19 @@ class PDFXAgent:
         """Run the agent once"""
         logger.info("🚀 Starting agent run...")
         
+        # Authenticating with X is a network round trip independent of the document work,
+        # so it runs alongside it instead of blocking the first post
+        auth_thread = None
+        if not self.x_poster.authenticated:
+            auth_thread = threading.Thread(target=self.x_poster.authenticate, name="x-auth", daemon=True)
+            auth_thread.start()
+        
         # Process new documents
         self.process_new_documents()
         
         # Create and post
+        if auth_thread:
+            auth_thread.join()
         success = self.create_and_post(topic)
         
         if success:
@@ -1,36 +1,87 @@
 import pdfplumber
 import PyPDF2
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import repeat
+import mmap
+import multiprocessing
 import hashlib
 import json
-from typing import List, Dict, Any
+import os
+import numpy as np
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from config.settings import PDF_DIR, PROCESSED_DIR
 from utils.file_handler import FileHandler
 from utils.logger import logger
 
+# Below this many pages, starting page workers costs more than extracting serially
+PARALLEL_PAGE_THRESHOLD = 50
+
+@contextmanager
+def _mapped(pdf_path: Path):
+    """
+    Memory-map a PDF read-only for the parsers; the OS pages it in on demand and can drop
+    clean pages under pressure, and the parsers' many small seeks and reads skip the syscalls
+    """
+    with open(pdf_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+def _extract_page_range(pdf_path: Path, start: int, stop: int) -> List[str]:
+    """Extract text from pages [start, stop); runs in a worker process with its own PDF handle"""
+    with _mapped(pdf_path) as mapped, pdfplumber.open(mapped) as pdf:
+        return [page.extract_text() for page in pdf.pages[start:stop]]
+
 class PDFProcessor:
     def __init__(self):
         self.pdf_dir = PDF_DIR
         self.processed_dir = PROCESSED_DIR
         self.file_handler = FileHandler()
         
-    def extract_text_from_pdf(self, pdf_path: Path) -> str:
-        """Extract text from PDF using multiple methods"""
+    def extract_text_from_pdf(self, pdf_path: Path, mapped: Optional[mmap.mmap] = None) -> Tuple[str, int]:
+        """
+        Extract text and the page count from PDF using multiple methods;
+        reuses `mapped` if the caller already mapped the file
+        """
         text = ""
+        page_count = 0
         
         try:
-            # Method 1: pdfplumber (better for tables)
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            # Method 2: PyPDF2 (fallback)
-            if len(text.strip()) < 100:
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
+            with nullcontext(mapped) if mapped is not None else _mapped(pdf_path) as mapped:
+                # Method 1: pdfplumber (better for tables)
+                # pdfminer is pure Python and holds the GIL, so long documents are split into page ranges
+                # for worker processes, unless this already is one of process_all_pdfs' workers or there is
+                # only one core (a lone worker just re-opens and re-parses the file)
+                with pdfplumber.open(mapped) as pdf:
+                    page_count = len(pdf.pages)
+                    
+                    # Image-only scans have no text layer for either parser; reject them before extracting
+                    # every page and re-parsing the file with PyPDF2
+                    if not any(page.chars for page in pdf.pages[:3]):
+                        logger.info(f"scanned_only: no embedded text on the first pages of {pdf_path.name}")
+                        return "", page_count
+                    
+                    parallel = (page_count >= PARALLEL_PAGE_THRESHOLD and (os.cpu_count() or 1) > 1
+                                and multiprocessing.parent_process() is None)
+                    if not parallel:
+                        page_texts = [page.extract_text() for page in pdf.pages]
+                
+                if parallel:
+                    workers = min(8, os.cpu_count() or 1)
+                    step = -(-page_count // workers)
+                    starts = range(0, page_count, step)
+                    with ProcessPoolExecutor(max_workers=workers) as executor:
+                        page_texts = [page_text for texts in executor.map(
+                            _extract_page_range, repeat(pdf_path), starts, [start + step for start in starts])
+                            for page_text in texts]
+                
+                text = ''.join(page_text + "\n" for page_text in page_texts if page_text)
+                
+                # Method 2: PyPDF2 (fallback)
+                if len(text.strip()) < 100:
+                    pdf_reader = PyPDF2.PdfReader(mapped)
                     for page in pdf_reader.pages:
                         page_text = page.extract_text()
                         if page_text:
@@ -39,33 +90,45 @@ class PDFProcessor:
         except Exception as e:
             logger.error(f"Error extracting text from {pdf_path}: {e}")
             
-        return text.strip()
+        return text.strip(), page_count
     
-    def get_file_hash(self, pdf_path: Path) -> str:
-        """Generate MD5 hash for file"""
+    def get_file_hash(self, pdf_path: Path, mapped: Optional[mmap.mmap] = None) -> str:
+        """
+        Generate a BLAKE2b hash for file, streamed in 1 MB blocks so large scans are never held in memory;
+        an existing mapping of the file is hashed directly instead
+        """
+        file_hash = hashlib.blake2b(digest_size=16)
+        if mapped is not None:
+            file_hash.update(mapped)
+            return file_hash.hexdigest()
+        
         with open(pdf_path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+            for block in iter(lambda: f.read(1 << 20), b''):
+                file_hash.update(block)
+        return file_hash.hexdigest()
     
-    def process_single_pdf(self, pdf_path: Path) -> Dict[str, Any]:
-        """Process a single PDF file"""
+    def process_single_pdf(self, pdf_path: Path, file_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Process a single PDF file; pass `file_hash` when the caller has already hashed it"""
         try:
             # Check if PDF exists
             if not pdf_path.exists():
                 logger.error(f"PDF not found: {pdf_path}")
                 return None
             
-            # Get file hash
-            file_hash = self.get_file_hash(pdf_path)
-            
-            # Check if already processed
-            processed_file = self.processed_dir / f"{pdf_path.stem}_{file_hash}.json"
-            if processed_file.exists():
-                logger.info(f"Already processed: {pdf_path.name}")
-                return self.file_handler.read_json(processed_file)
-            
-            # Extract text
-            logger.info(f"Processing: {pdf_path.name}")
-            text = self.extract_text_from_pdf(pdf_path)
+            # Map the file once: the hash and both parsers read the same pages
+            with _mapped(pdf_path) as mapped:
+                # Get file hash
+                file_hash = file_hash or self.get_file_hash(pdf_path, mapped)
+                
+                # Check if already processed
+                processed_file = self.processed_dir / f"{pdf_path.stem}_{file_hash}.json"
+                if processed_file.exists():
+                    logger.info(f"Already processed: {pdf_path.name}")
+                    return self.file_handler.read_json(processed_file)
+                
+                # Extract text
+                logger.info(f"Processing: {pdf_path.name}")
+                text, page_count = self.extract_text_from_pdf(pdf_path, mapped)
             
             if not text or len(text) < 100:
                 logger.warning(f"Minimal text extracted from {pdf_path.name}")
@@ -78,10 +141,10 @@ class PDFProcessor:
                 "hash": file_hash,
                 "content": text,
                 "metadata": {
-                    "pages": text.count('\n') // 50 + 1,
+                    "pages": page_count,
                     "characters": len(text),
                     "words": len(text.split()),
-                    "processed_at": str(Path.timestamp(pdf_path))
+                    "processed_at": str(datetime.now())
                 }
             }
             
@@ -95,12 +158,12 @@ class PDFProcessor:
             logger.error(f"Error processing {pdf_path}: {e}")
             return None
     
-    def process_all_pdfs(self) -> List[Dict[str, Any]]:
-        """Process all PDFs in the directory"""
+    def process_all_pdfs(self, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process all PDFs in the directory, extracting them in parallel worker processes"""
         processed_docs = []
         
         # Get all PDF files
-        pdf_files = list(self.pdf_dir.glob("*.pdf"))
+        pdf_files = self.file_handler.get_files(self.pdf_dir)
         
         if not pdf_files:
             logger.warning(f"No PDF files found in {self.pdf_dir}")
@@ -108,11 +171,12 @@ class PDFProcessor:
         
         logger.info(f"Found {len(pdf_files)} PDF files")
         
-        # Process each PDF
-        for pdf_file in pdf_files:
-            doc_data = self.process_single_pdf(pdf_file)
-            if doc_data:
-                processed_docs.append(doc_data)
+        # Text extraction is CPU-bound, so spread the PDFs over all but one core
+        workers = workers or max(1, (os.cpu_count() or 1) - 1)
+        with ProcessPoolExecutor(max_workers=min(workers, len(pdf_files))) as executor:
+            for doc_data in executor.map(self.process_single_pdf, pdf_files):
+                if doc_data:
+                    processed_docs.append(doc_data)
         
         logger.info(f"Total processed: {len(processed_docs)} documents")
         return processed_docs
@@ -120,17 +184,23 @@ class PDFProcessor:
     def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
         """Split text into overlapping chunks"""
         words = text.split()
-        chunks = []
         
         if len(words) <= chunk_size:
             return [' '.join(words)]
         
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            chunks.append(chunk)
-            
-            if i + chunk_size >= len(words):
-                break
+        # Join the words once and locate each word in the joined string, so every chunk is a
+        # single slice rather than a list slice plus its own join
+        joined = ' '.join(words)
+        lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+        word_ends = np.cumsum(lengths + 1) - 1
+        word_starts = word_ends - lengths
+        
+        # Chunks start every chunk_size - overlap words and stop after the first one reaching the end
+        first_words = np.arange(0, len(words), chunk_size - overlap)
+        first_words = first_words[:np.searchsorted(first_words + chunk_size, len(words)) + 1]
+        last_words = np.minimum(first_words + chunk_size, len(words)) - 1
+        chunks = [joined[start:end] for start, end in
+                  zip(word_starts[first_words].tolist(), word_ends[last_words].tolist())]
         
-        logger.debug(f"Split text into {len(chunks)} chunks")
+        logger.debug("Split text into %d chunks", len(chunks))
         return chunks
\ No newline at end of file
@@ -1,16 +1,56 @@
 import ollama
 import json
 import re
+import hashlib
+import sqlite3
+import numpy as np
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 import logging
-from config.settings import OLLAMA_BASE_URL, LLM_MODEL, EMBEDDING_MODEL
+from config.settings import OLLAMA_BASE_URL, LLM_MODEL, EMBEDDING_MODEL, DATA_DIR
+from utils.file_handler import FileHandler
 from utils.logger import logger
 
+EMBEDDING_CACHE_SIZE = 10_000  # In-memory entries; the SQLite tier keeps everything
+
+# A whole JSON string (escapes included) or a single brace; matching strings whole skips braces inside them
+_JSON_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|[{}]')
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text, or None if there is none"""
+    start = text.find('{')
+    if start < 0:
+        return None
+    
+    depth = 0
+    for token in _JSON_TOKEN_RE.finditer(text, start):
+        if token.group() == '{':
+            depth += 1
+        elif token.group() == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:token.end()]
+    return None
+
 class TextAnalyzer:
     def __init__(self):
         self.llm_model = LLM_MODEL  # qwen2.5:4b
         self.embedding_model = EMBEDDING_MODEL  # nomic-embed-text
         
+        # Embedding cache keyed by (model, SHA-256 of the embedded text): an in-memory LRU
+        # in front of a SQLite table that persists unit-length float16 vectors across runs
+        self._embedding_cache = OrderedDict()
+        self._embedding_db = sqlite3.connect(DATA_DIR / "embedding_cache.db")
+        self._embedding_db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings_f16 "
+            "(model TEXT, hash BLOB, vec BLOB, PRIMARY KEY (model, hash))"
+        )
+        
+        # Parsed document analyses, one JSON file per (model, text sample) hash
+        self.analysis_cache_dir = DATA_DIR / "cache" / "analyses"
+        self.analysis_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.file_handler = FileHandler()
+        
         # Test Ollama connection
         self.test_connection()
     
@@ -39,24 +79,75 @@ class TextAnalyzer:
             logger.info("Make sure Ollama is running: 'ollama serve'")
             return False
     
+    def _cached_embedding(self, key: bytes) -> Optional[List[float]]:
+        """Look up an embedding in memory, then on disk"""
+        cache_key = (self.embedding_model, key)
+        if cache_key in self._embedding_cache:
+            self._embedding_cache.move_to_end(cache_key)
+            return self._embedding_cache[cache_key]
+        
+        row = self._embedding_db.execute(
+            "SELECT vec FROM embeddings_f16 WHERE model = ? AND hash = ?", cache_key
+        ).fetchone()
+        if row is None:
+            return None
+        embedding = np.frombuffer(row[0], dtype=np.float16).astype(np.float32).tolist()
+        self._remember_embedding(cache_key, embedding)
+        return embedding
+    
+    def _store_embeddings(self, embeddings: Dict[bytes, List[float]]):
+        """Save fresh embeddings in memory and on disk, in one transaction"""
+        for key, embedding in embeddings.items():
+            self._remember_embedding((self.embedding_model, key), embedding)
+        with self._embedding_db:
+            self._embedding_db.executemany(
+                "INSERT OR REPLACE INTO embeddings_f16 (model, hash, vec) VALUES (?, ?, ?)",
+                [(self.embedding_model, key, np.asarray(embedding, dtype=np.float16).tobytes())
+                 for key, embedding in embeddings.items()]
+            )
+    
+    def _remember_embedding(self, cache_key: tuple, embedding: List[float]):
+        """Keep an embedding in the in-memory LRU, evicting the least recently used"""
+        self._embedding_cache[cache_key] = embedding
+        self._embedding_cache.move_to_end(cache_key)
+        if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+            self._embedding_cache.popitem(last=False)
+    
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings using Ollama"""
-        embeddings = []
+        """Generate embeddings using Ollama, reusing cached vectors for text seen before"""
+        prompts = [text[:10000] for text in texts]  # Limit text length
+        keys = [hashlib.sha256(prompt.encode('utf-8')).digest() for prompt in prompts]
+        found = {}
+        missing = {}  # key -> prompt, each distinct uncached text once
+        for key, prompt in zip(keys, prompts):
+            if key not in found and key not in missing:
+                embedding = self._cached_embedding(key)
+                if embedding is None:
+                    missing[key] = prompt
+                else:
+                    found[key] = embedding
         
-        for text in texts:
+        # Every uncached text goes to Ollama in a single batched request
+        if missing:
             try:
-                response = ollama.embeddings(
+                response = ollama.embed(
                     model=self.embedding_model,
-                    prompt=text[:10000]  # Limit text length
+                    input=list(missing.values())
                 )
-                embeddings.append(response["embedding"])
-                logger.debug(f"Generated embedding for text ({len(text)} chars)")
+                # Normalized once here, cosine similarity is a plain dot product downstream; the
+                # components are rounded to float16 (ample for cosine ranking) so the cache stores
+                # 2 bytes each and a cache hit returns exactly what a fresh request does
+                vectors = np.asarray(response["embeddings"], dtype=np.float32)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+                fresh = dict(zip(missing, vectors.astype(np.float16).astype(np.float32).tolist()))
+                self._store_embeddings(fresh)
+                found.update(fresh)
+                logger.debug("Generated %d embeddings in one request", len(fresh))
             except Exception as e:
-                logger.error(f"Error generating embedding: {e}")
-                # Return zero vector as fallback
-                embeddings.append([0.0] * 768)
+                logger.error(f"Error generating embeddings: {e}")
         
-        return embeddings
+        # Zero vector as fallback for anything that failed
+        return [found.get(key, [0.0] * 768) for key in keys]
     
     def analyze_document(self, text: str, max_chars: int = 3000) -> Dict[str, Any]:
         """Analyze document content using Qwen model"""
@@ -78,33 +169,42 @@ Provide JSON with these keys:
 
 IMPORTANT: Return ONLY valid JSON, no other text."""
 
+        # The same model and sample give the same analysis, so parsed results are kept on disk by hash
+        cache_key = hashlib.sha256(f"{self.llm_model}|{text_sample}".encode('utf-8')).hexdigest()
+        cache_file = self.analysis_cache_dir / f"{cache_key}.json"
+        
         try:
-            logger.info(f"Analyzing document with {self.llm_model}...")
-            response = ollama.generate(
-                model=self.llm_model,
-                prompt=prompt,
-                options={'temperature': 0.2, 'num_predict': 500}
-            )
-            
-            response_text = response['response'].strip()
-            logger.debug(f"Raw response: {response_text[:200]}...")
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            
-            if json_match:
-                result = json.loads(json_match.group())
-                logger.info(f"✓ Analysis complete. Topic: {result.get('main_topic', 'Unknown')}")
+            result = self.file_handler.read_json(cache_file) if cache_file.exists() else None
+            if result:
+                logger.info(f"✓ Reusing cached analysis. Topic: {result.get('main_topic', 'Unknown')}")
             else:
-                logger.warning("Could not parse JSON from response")
-                result = {
-                    "main_topic": "Document Analysis",
-                    "key_points": ["Content analysis completed"],
-                    "tone": "informative",
-                    "summary": text_sample[:200] + "...",
-                    "hashtags": ["#document", "#analysis", "#ai"],
-                    "audience": "general"
-                }
+                logger.info(f"Analyzing document with {self.llm_model}...")
+                response = ollama.generate(
+                    model=self.llm_model,
+                    prompt=prompt,
+                    options={'temperature': 0.2, 'num_predict': 500}
+                )
+                
+                response_text = response['response'].strip()
+                logger.debug("Raw response: %s...", response_text[:200])
+                
+                # Extract JSON from response
+                json_text = _extract_json_object(response_text)
+                
+                if json_text:
+                    result = json.loads(json_text)
+                    logger.info(f"✓ Analysis complete. Topic: {result.get('main_topic', 'Unknown')}")
+                    self.file_handler.write_json(result, cache_file)
+                else:
+                    logger.warning("Could not parse JSON from response")
+                    result = {
+                        "main_topic": "Document Analysis",
+                        "key_points": ["Content analysis completed"],
+                        "tone": "informative",
+                        "summary": text_sample[:200] + "...",
+                        "hashtags": ["#document", "#analysis", "#ai"],
+                        "audience": "general"
+                    }
             
             # Add metadata
             result["analysis_model"] = self.llm_model
@@ -1,103 +1,288 @@
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import sqlite3
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from pathlib import Path
-from config.settings import EMBEDDINGS_DIR
+from config.settings import (
+    EMBEDDINGS_DIR,
+    HNSW_M, HNSW_CONSTRUCTION_EF, HNSW_SEARCH_EF,
+    HNSW_NUM_THREADS, HNSW_BATCH_SIZE, HNSW_SYNC_THRESHOLD
+)
 from src.text_analyzer import TextAnalyzer
+from src.pdf_processor import PDFProcessor
 from utils.logger import logger
 
+EMBED_BATCH_SIZE = 512  # Chunks per embedding request when ingesting many documents
+
+# PersistentClients by resolved path, shared by every store in the process instead of reopened
+_CLIENT_CACHE = {}
+_CLIENT_LOCK = threading.Lock()
+
+def _get_client(path: Path):
+    """Return the process-wide ChromaDB client for path, opening it on first use"""
+    import chromadb  # Deferred: chromadb pulls in a large dependency tree on import
+    from chromadb.config import Settings
+    
+    key = str(Path(path).resolve())
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            client = chromadb.PersistentClient(
+                path=key,
+                settings=Settings(anonymized_telemetry=False)
+            )
+            _CLIENT_CACHE[key] = client
+        return client
+
+# Everything a search result is built from; never the stored embeddings themselves
+SEARCH_INCLUDE = ["documents", "metadatas", "distances"]
+
+class QueryCache:
+    """Thread-safe LRU cache of search results with a time-to-live"""
+    
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def make_key(query: str, n_results: int, filter_metadata: Optional[Dict]) -> bytes:
+        """Key a search by its query text, result count and filter"""
+        filter_key = json.dumps(filter_metadata, sort_keys=True)
+        return hashlib.blake2b(f"{query}|{n_results}|{filter_key}".encode()).digest()
+    
+    def get(self, key: bytes) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[1] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+    
+    def put(self, key: bytes, results: List[Dict[str, Any]], stored_at: float) -> None:
+        """Cache results for key, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (list(results), stored_at)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every cached result, e.g. after the collection changes"""
+        with self._lock:
+            self._entries.clear()
+
 class DocumentVectorStore:
-    def __init__(self):
-        self.analyzer = TextAnalyzer()
+    def __init__(self, analyzer: Optional[TextAnalyzer] = None, preload_model: bool = False):
+        self.analyzer = analyzer or TextAnalyzer()
+        self.pdf_processor = PDFProcessor()  # Owns chunk_text
         self.embeddings_dir = EMBEDDINGS_DIR
+        self.query_cache = QueryCache()
         
         # Initialize ChromaDB
-        self.client = chromadb.PersistentClient(
-            path=str(self.embeddings_dir),
-            settings=Settings(anonymized_telemetry=False)
-        )
+        self.client = _get_client(self.embeddings_dir)
         
         # Create or get collection
         try:
             self.collection = self.client.get_or_create_collection(
                 name="pdf_documents",
-                metadata={"hnsw:space": "cosine", "description": "PDF document embeddings"}
+                metadata={
+                    "hnsw:space": "cosine",
+                    "hnsw:M": HNSW_M,
+                    "hnsw:construction_ef": HNSW_CONSTRUCTION_EF,
+                    "hnsw:search_ef": HNSW_SEARCH_EF,
+                    "hnsw:num_threads": HNSW_NUM_THREADS,
+                    "hnsw:batch_size": HNSW_BATCH_SIZE,
+                    "hnsw:sync_threshold": HNSW_SYNC_THRESHOLD,
+                    "description": "PDF document embeddings"
+                }
             )
             logger.info("Vector store initialized")
         except Exception as e:
             logger.error(f"Error initializing vector store: {e}")
             raise
+        
+        # Filename -> chunk count index beside the Chroma files, so listing documents and
+        # stats don't pull every chunk's metadata out of the collection
+        self._doc_index = sqlite3.connect(self.embeddings_dir / "doc_index.sqlite", check_same_thread=False)
+        self._doc_index.execute(
+            "CREATE TABLE IF NOT EXISTS docs (filename TEXT PRIMARY KEY, chunks INT, hash TEXT)"
+        )
+        self._backfill_doc_index()
+        
+        # Have Ollama load the embedding model now rather than on the first real query
+        if preload_model:
+            self.analyzer.get_embeddings(["warmup"])
     
-    def add_document(self, document: Dict[str, Any]) -> bool:
-        """Add a single document to vector store"""
-        try:
-            # Check if document already exists
-            existing = self.collection.get(
-                where={"filename": document["filename"]},
-                limit=1
+    def _backfill_doc_index(self):
+        """Build the document index from the collection once, for stores created before it existed"""
+        if self._doc_index.execute("SELECT 1 FROM docs LIMIT 1").fetchone() or not self.collection.count():
+            return
+        
+        results = self.collection.get(include=["metadatas"])
+        docs = {}
+        for metadata in results['metadatas']:
+            chunks, _ = docs.get(metadata['filename'], (0, None))
+            docs[metadata['filename']] = (chunks + 1, metadata.get('hash'))
+        self._index_documents(docs)
+        logger.info(f"Indexed {len(docs)} existing documents")
+    
+    def _index_documents(self, docs: Dict[str, Tuple[int, str]]):
+        """Record filename -> (chunk count, hash) in the document index"""
+        with self._doc_index:
+            self._doc_index.executemany(
+                "INSERT OR REPLACE INTO docs (filename, chunks, hash) VALUES (?, ?, ?)",
+                [(filename, chunks, file_hash) for filename, (chunks, file_hash) in docs.items()]
             )
-            
-            if existing['ids']:
-                logger.info(f"Document {document['filename']} already exists")
-                return True
-            
-            # Chunk the document
-            chunks = self.analyzer.chunk_text(document["content"])
-            
-            # Generate embeddings
-            embeddings = self.analyzer.get_embeddings(chunks)
-            
-            # Prepare metadata for each chunk
-            ids = []
-            metadatas = []
-            documents = []
-            
-            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                chunk_id = f"{document['filename']}_{document['hash']}_{i}"
-                
-                metadata = {
-                    "filename": document["filename"],
-                    "filepath": document["filepath"],
-                    "hash": document["hash"],
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    **document.get("metadata", {})
-                }
-                
-                ids.append(chunk_id)
-                metadatas.append(metadata)
-                documents.append(chunk)
-            
-            # Add to collection
-            self.collection.add(
-                embeddings=embeddings,
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
+    
+    def rehash_documents(self, hashes: Dict[str, Tuple[str, str]]):
+        """Swap indexed hashes, filename -> (old hash, new hash), for documents still stored under the old one"""
+        with self._doc_index:
+            self._doc_index.executemany(
+                "UPDATE docs SET hash = ? WHERE filename = ? AND hash = ?",
+                [(new_hash, filename, old_hash) for filename, (old_hash, new_hash) in hashes.items()]
             )
+    
+    def _stored_hashes(self, filenames) -> Dict[str, str]:
+        """Content hash of each of the given documents already in the store, from the document index"""
+        rows = self._doc_index.execute(
+            "SELECT filename, hash FROM docs WHERE filename IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(filenames)),)
+        )
+        return dict(rows)
+    
+    def _unindex_documents(self, filenames: List[str]):
+        """Remove documents from the document index"""
+        with self._doc_index:
+            self._doc_index.execute(
+                "DELETE FROM docs WHERE filename IN (SELECT value FROM json_each(?))",
+                (json.dumps(filenames),)
+            )
+    
+    def _chunk_records(self, document: Dict[str, Any], chunks: List[str]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Build the ids and metadata Chroma stores for each chunk of a document"""
+        ids = []
+        metadatas = []
+        
+        for i in range(len(chunks)):
+            chunk_id = f"{document['filename']}_{document['hash']}_{i}"
             
-            logger.info(f"✓ Added {document['filename']} ({len(chunks)} chunks)")
-            return True
+            metadata = {
+                "filename": document["filename"],
+                "filepath": document["filepath"],
+                "hash": document["hash"],
+                "chunk_index": i,
+                "total_chunks": len(chunks),
+                **document.get("metadata", {})
+            }
             
-        except Exception as e:
-            logger.error(f"Error adding document {document.get('filename', 'unknown')}: {e}")
-            return False
+            ids.append(chunk_id)
+            metadatas.append(metadata)
+        
+        return ids, metadatas
+    
+    def add_document(self, document: Dict[str, Any]) -> bool:
+        """Add a single document to vector store"""
+        return self.add_documents([document]) == 1
     
     def add_documents(self, documents: List[Dict[str, Any]]) -> int:
-        """Add multiple documents to vector store"""
-        success_count = 0
+        """Add multiple documents to vector store in one bulk write"""
+        if not documents:
+            return 0
         
-        for doc in documents:
-            if self.add_document(doc):
-                success_count += 1
+        # One indexed existence lookup, batched embedding and upserts for the whole batch,
+        # instead of a Chroma metadata query, an embedding pass and an add per document
+        try:
+            stored = self._stored_hashes({doc["filename"] for doc in documents})
+            
+            ids, metadatas, chunks = [], [], []
+            added = {}
+            unchanged = set()
+            replaced = []
+            for doc in documents:
+                filename = doc["filename"]
+                if filename in added or filename in unchanged:
+                    continue
+                if stored.get(filename) == doc["hash"]:
+                    logger.info(f"Document {filename} already exists")
+                    unchanged.add(filename)
+                    continue
+                if filename in stored:
+                    replaced.append(filename)  # Content changed since it was stored
+                doc_chunks = self.pdf_processor.chunk_text(doc["content"])
+                doc_ids, doc_metadatas = self._chunk_records(doc, doc_chunks)
+                ids.extend(doc_ids)
+                metadatas.extend(doc_metadatas)
+                chunks.extend(doc_chunks)
+                added[filename] = (len(doc_chunks), doc["hash"])
+            
+            if replaced:
+                # Drop the old versions' chunks; their ids carry the old hash, so upserts won't overwrite them
+                self.collection.delete(where={"filename": {"$in": replaced}})
+                self.query_cache.clear()
+                logger.info(f"Replacing {len(replaced)} changed documents")
+            
+            if chunks:
+                # Embed in slices on this thread (get_embeddings sends each distinct chunk once) and
+                # hand each slice to a writer thread, so Chroma's write of one slice overlaps the
+                # embedding request for the next
+                with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-writer") as writer:
+                    writes = []
+                    for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+                        stop = start + EMBED_BATCH_SIZE
+                        writes.append(writer.submit(
+                            self.collection.upsert,
+                            embeddings=self.analyzer.get_embeddings(chunks[start:stop]),
+                            documents=chunks[start:stop],
+                            metadatas=metadatas[start:stop],
+                            ids=ids[start:stop]
+                        ))
+                try:
+                    for write in writes:
+                        write.result()
+                except Exception:
+                    # Don't leave half-written documents behind to be mistaken for stored ones, nor cached searches
+                    # that returned them
+                    self.collection.delete(ids=ids)
+                    self.query_cache.clear()
+                    if replaced:
+                        self._unindex_documents(replaced)
+                    raise
+                self.query_cache.clear()
+                self._index_documents(added)
+            
+            for filename, (chunk_count, _) in added.items():
+                logger.info(f"✓ Added {filename} ({chunk_count} chunks)")
+            success_count = sum(1 for doc in documents if doc["filename"] in unchanged or doc["filename"] in added)
+            
+        except Exception as e:
+            logger.error(f"Error adding documents to vector store: {e}")
+            success_count = 0
         
         logger.info(f"Added {success_count}/{len(documents)} documents to vector store")
         return success_count
     
     def search(self, query: str, n_results: int = 3, filter_metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """Search for similar documents"""
+        cache_key = QueryCache.make_key(query, n_results, filter_metadata)
+        cached = self.query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Generate query embedding
             query_embedding = self.analyzer.get_embeddings([query])[0]
@@ -107,12 +292,14 @@ class DocumentVectorStore:
                 results = self.collection.query(
                     query_embeddings=[query_embedding],
                     n_results=n_results,
-                    where=filter_metadata
+                    where=filter_metadata,
+                    include=SEARCH_INCLUDE
                 )
             else:
                 results = self.collection.query(
                     query_embeddings=[query_embedding],
-                    n_results=n_results
+                    n_results=n_results,
+                    include=SEARCH_INCLUDE
                 )
             
             # Format results
@@ -127,6 +314,7 @@ class DocumentVectorStore:
                     })
             
             logger.info(f"Search found {len(formatted_results)} results")
+            self.query_cache.put(cache_key, formatted_results, time.time())
             return formatted_results
             
         except Exception as e:
@@ -137,18 +325,26 @@ class DocumentVectorStore:
         """Get all chunks for a specific document"""
         try:
             results = self.collection.get(
-                where={"filename": filename}
+                where={"filename": filename},
+                include=["documents", "metadatas"]
             )
             
-            chunks = []
-            for i in range(len(results['ids'])):
-                chunks.append({
-                    'id': results['ids'][i],
-                    'content': results['documents'][i],
-                    'metadata': results['metadatas'][i]
-                })
+            # chunk_index runs 0..n-1, so each chunk is placed straight into its slot
+            chunks = [None] * len(results['ids'])
+            for chunk_id, content, metadata in zip(results['ids'], results['documents'], results['metadatas']):
+                index = metadata['chunk_index']
+                if 0 <= index < len(chunks) and chunks[index] is None:
+                    chunks[index] = {
+                        'id': chunk_id,
+                        'content': content,
+                        'metadata': metadata
+                    }
             
-            chunks.sort(key=lambda x: x['metadata']['chunk_index'])
+            if any(chunk is None for chunk in chunks):
+                # Gaps or duplicates in chunk_index: fall back to sorting
+                chunks = [{'id': chunk_id, 'content': content, 'metadata': metadata}
+                          for chunk_id, content, metadata in zip(results['ids'], results['documents'], results['metadatas'])]
+                chunks.sort(key=lambda x: x['metadata']['chunk_index'])
             return chunks
             
         except Exception as e:
@@ -158,13 +354,7 @@ class DocumentVectorStore:
     def get_all_documents(self) -> List[str]:
         """Get list of all document filenames in vector store"""
         try:
-            results = self.collection.get()
-            filenames = set()
-            
-            for metadata in results['metadatas']:
-                filenames.add(metadata['filename'])
-            
-            return sorted(list(filenames))
+            return [row[0] for row in self._doc_index.execute("SELECT filename FROM docs ORDER BY filename")]
             
         except Exception as e:
             logger.error(f"Error getting document list: {e}")
@@ -174,6 +364,8 @@ class DocumentVectorStore:
         """Delete a document from vector store"""
         try:
             self.collection.delete(where={"filename": filename})
+            self.query_cache.clear()
+            self._unindex_documents([filename])
             logger.info(f"Deleted document: {filename}")
             return True
         except Exception as e:
@@ -183,16 +375,17 @@ class DocumentVectorStore:
     def get_stats(self) -> Dict[str, Any]:
         """Get vector store statistics"""
         try:
-            results = self.collection.get()
-            
-            total_chunks = len(results['ids']) if results['ids'] else 0
-            unique_docs = len(set(m['filename'] for m in results['metadatas'])) if results['metadatas'] else 0
+            unique_docs, total_chunks = self._doc_index.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chunks), 0) FROM docs"
+            ).fetchone()
             
             return {
                 "total_chunks": total_chunks,
                 "unique_documents": unique_docs,
                 "collection_name": self.collection.name,
-                "embedding_model": self.analyzer.embedding_model
+                "embedding_model": self.analyzer.embedding_model,
+                "query_cache_hits": self.query_cache.hits,
+                "query_cache_misses": self.query_cache.misses
             }
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
@@ -1,7 +1,8 @@
-import tweepy
 import logging
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
 import time
+import random
+import unicodedata
 from config.settings import (
     X_API_KEY, X_API_SECRET,
     X_ACCESS_TOKEN, X_ACCESS_SECRET,
@@ -9,15 +10,59 @@ from config.settings import (
 )
 from utils.logger import logger
 
+if TYPE_CHECKING:
+    import tweepy
+
+RATE_LIMIT_WINDOW = 900  # X rate limits reset every 15 minutes at most
+
+# Code point ranges X counts as 1 toward the post limit; everything else (CJK, emoji, ...) counts 2
+_LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+
+def _joins_previous(ch: str, cluster: str) -> bool:
+    """Whether ch extends the character cluster before it (accents, emoji modifiers and ZWJ sequences, flags)"""
+    cp = ord(ch)
+    return bool(
+        unicodedata.combining(ch)
+        or cp == 0x200D or cluster[-1] == "\u200d"  # Zero-width joiner sequences
+        or 0xFE00 <= cp <= 0xFE0F  # Variation selectors
+        or 0x1F3FB <= cp <= 0x1F3FF  # Skin tones
+        or 0xE0020 <= cp <= 0xE007F  # Tag sequences (subdivision flags)
+        or (0x1F1E6 <= cp <= 0x1F1FF and len(cluster) == 1 and 0x1F1E6 <= ord(cluster) <= 0x1F1FF)  # Flag pairs
+    )
+
+def _clusters(text: str) -> List[str]:
+    """Split text into user-perceived characters, so truncation never cuts one in half"""
+    clusters = []
+    for ch in text:
+        if clusters and _joins_previous(ch, clusters[-1]):
+            clusters[-1] += ch
+        else:
+            clusters.append(ch)
+    return clusters
+
+def _cluster_weight(cluster: str) -> int:
+    cp = ord(cluster[0])
+    return 1 if any(low <= cp <= high for low, high in _LIGHT_RANGES) else 2
+
+def weighted_length(text: str) -> int:
+    """Length of text as X counts it against the post limit"""
+    if text.isascii():
+        return len(text)
+    return sum(map(_cluster_weight, _clusters(text)))
+
 class XPoster:
     def __init__(self):
         self.client = None
         self.api_v1 = None
         self.max_length = MAX_POST_LENGTH
         self.authenticated = False
+        self.screen_name = None
+        self.rate_limit_strikes = 0  # Consecutive 429s, for backoff when X sends no reset time
         
     def authenticate(self) -> bool:
         """Authenticate with X API"""
+        import tweepy  # Deferred: tweepy is only needed once the agent actually talks to X
+        
         try:
             # Check if credentials are provided
             if not all([X_API_KEY, X_API_SECRET, X_ACCESS_TOKEN, X_ACCESS_SECRET]):
@@ -43,6 +88,7 @@ class XPoster:
             
             # Verify credentials
             user = self.api_v1.verify_credentials()
+            self.screen_name = user.screen_name
             logger.info(f"✓ Authenticated with X as @{user.screen_name}")
             self.authenticated = True
             return True
@@ -56,18 +102,22 @@ class XPoster:
     
     def post_tweet(self, text: str, media_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Post a tweet to X"""
+        import tweepy
+        
         if not self.authenticated and not self.authenticate():
             logger.error("Cannot post: Not authenticated")
             return None
         
         try:
-            # Validate text length
-            if len(text) > self.max_length:
-                logger.warning(f"Text too long ({len(text)} chars), truncating...")
-                text = text[:self.max_length-3] + "..."
+            # Validate text length, weighted the way X counts it
+            length = weighted_length(text)
+            if length > self.max_length:
+                logger.warning(f"Text too long ({length} chars), truncating...")
+                text = self._truncate(text)
             
             logger.info(f"Posting tweet ({len(text)} chars)...")
-            logger.debug(f"Tweet content: {text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Tweet content: %s", text)
             
             # Post with media if provided
             if media_path:
@@ -90,12 +140,12 @@ class XPoster:
                 response = self.client.create_tweet(text=text)
             
             if response.data:
+                self.rate_limit_strikes = 0
                 tweet_id = response.data['id']
                 logger.info(f"✓ Tweet posted successfully! ID: {tweet_id}")
                 
-                # Get tweet URL
-                user = self.api_v1.verify_credentials()
-                tweet_url = f"https://twitter.com/{user.screen_name}/status/{tweet_id}"
+                # Get tweet URL (screen name cached at authentication, saving a round trip per post)
+                tweet_url = f"https://twitter.com/{self.screen_name}/status/{tweet_id}"
                 logger.info(f"Tweet URL: {tweet_url}")
                 
                 return {
@@ -109,14 +159,33 @@ class XPoster:
                 logger.error("No response data from X API")
                 return None
                 
-        except tweepy.TweepyException as e:
+        except tweepy.TooManyRequests as e:
+            logger.error(f"X API error: {e}")
+            
+            # Wait only until the limit resets
+            wait = self._rate_limit_wait(e)
+            logger.warning(f"Rate limit exceeded. Waiting {wait:.0f} seconds...")
+            time.sleep(wait)
+            
+            return {
+                "success": False,
+                "error": str(e),
+                "text": text
+            }
+        except tweepy.Unauthorized as e:
             logger.error(f"X API error: {e}")
             
-            # Rate limit handling
-            if "429" in str(e):
-                logger.warning("Rate limit exceeded. Waiting 15 minutes...")
-                time.sleep(900)  # Wait 15 minutes
+            # Credentials were rejected: authenticate afresh before the next post
+            logger.warning("X rejected the credentials, will re-authenticate")
+            self.authenticated = False
             
+            return {
+                "success": False,
+                "error": str(e),
+                "text": text
+            }
+        except tweepy.TweepyException as e:
+            logger.error(f"X API error: {e}")
             return {
                 "success": False,
                 "error": str(e),
@@ -126,15 +195,48 @@ class XPoster:
             logger.error(f"Unexpected error posting tweet: {e}")
             return None
     
+    def _truncate(self, text: str, suffix: str = "...") -> str:
+        """Cut text to the post limit on a character boundary, ending it with suffix"""
+        if weighted_length(text) <= self.max_length:
+            return text
+        
+        budget = self.max_length - weighted_length(suffix)
+        if text.isascii():
+            return text[:budget] + suffix
+        
+        kept = []
+        for cluster in _clusters(text):
+            budget -= _cluster_weight(cluster)
+            if budget < 0:
+                break
+            kept.append(cluster)
+        return "".join(kept) + suffix
+    
+    def _rate_limit_wait(self, error: "tweepy.TooManyRequests") -> float:
+        """Seconds to wait after a 429: until X's x-rate-limit-reset time, else exponential backoff"""
+        self.rate_limit_strikes += 1
+        jitter = random.uniform(0, 2)
+        
+        reset = error.response.headers.get("x-rate-limit-reset") if error.response is not None else None
+        if reset is not None:
+            try:
+                return min(max(1, int(reset) - int(time.time())), RATE_LIMIT_WINDOW) + jitter
+            except ValueError:
+                pass
+        
+        return min(30 * 2 ** (self.rate_limit_strikes - 1), RATE_LIMIT_WINDOW) + jitter
+    
     def reply_to_tweet(self, text: str, tweet_id: str) -> Optional[Dict[str, Any]]:
         """Reply to an existing tweet"""
+        import tweepy
+        
         if not self.authenticated and not self.authenticate():
             logger.error("Cannot reply: Not authenticated")
             return None
         
         try:
             response = self.client.create_tweet(
-                text=text[:self.max_length],
+                text=self._truncate(text),
                 in_reply_to_tweet_id=tweet_id
             )
             
@@ -149,6 +251,8 @@ class XPoster:
             
         except tweepy.TweepyException as e:
             logger.error(f"Error posting reply: {e}")
+            if isinstance(e, tweepy.Unauthorized):
+                self.authenticated = False
             return None
     
     def get_rate_limit_status(self) -> Dict[str, Any]:
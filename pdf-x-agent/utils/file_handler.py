@@ -1,12 +1,29 @@
+import os
 import json
 import yaml
 import pickle
+import numpy as np
 from pathlib import Path
 from typing import Any, Dict, List
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module reads and writes the same files, only slower
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    # numpy arrays (e.g. embeddings) are serialized directly, without a .tolist() copy
+    JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _to_list(obj: Any) -> Any:
+    """json fallback for numpy arrays and scalars, which orjson serializes natively"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 class FileHandler:
     """Handle file operations"""
     
@@ -14,6 +31,8 @@ class FileHandler:
     def read_json(filepath: Path) -> Dict:
         """Read JSON file"""
         try:
+            if orjson is not None:
+                return orjson.loads(Path(filepath).read_bytes())
             with open(filepath, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
@@ -24,8 +43,11 @@ class FileHandler:
     def write_json(data: Any, filepath: Path) -> bool:
         """Write to JSON file"""
         try:
+            if orjson is not None:
+                Path(filepath).write_bytes(orjson.dumps(data, option=JSON_OPTIONS))
+                return True
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                json.dump(data, f, indent=2, ensure_ascii=False, default=_to_list)
             return True
         except Exception as e:
             logger.error(f"Error writing JSON {filepath}: {e}")
@@ -52,11 +74,39 @@ class FileHandler:
             logger.error(f"Error writing pickle {filepath}: {e}")
             return False
     
+    @staticmethod
+    def read_npy(filepath: Path, mmap: bool = True) -> Any:
+        """Read a .npy array, memory-mapped read-only by default so nothing is copied up front"""
+        try:
+            return np.load(filepath, mmap_mode='r' if mmap else None, allow_pickle=False)
+        except Exception as e:
+            logger.error(f"Error reading array {filepath}: {e}")
+            return None
+    
+    @staticmethod
+    def write_npy(array: Any, filepath: Path) -> bool:
+        """Write an array to a .npy file"""
+        try:
+            np.save(filepath, np.asarray(array), allow_pickle=False)
+            return True
+        except Exception as e:
+            logger.error(f"Error writing array {filepath}: {e}")
+            return False
+    
     @staticmethod
     def get_files(directory: Path, pattern: str = "*.pdf") -> List[Path]:
         """Get all files matching pattern in directory"""
         try:
-            return list(directory.glob(pattern))
+            suffix = pattern[1:]
+            if not pattern.startswith("*") or any(c in suffix for c in "*?["):
+                return list(Path(directory).glob(pattern))
+            
+            # Plain "*<suffix>" patterns: one scandir pass, matching names without fnmatch or a
+            # stat per entry (normcase keeps the match case-insensitive on Windows, like glob)
+            suffix = os.path.normcase(suffix)
+            with os.scandir(directory) as entries:
+                return [Path(entry.path) for entry in entries
+                        if os.path.normcase(entry.name).endswith(suffix) and entry.is_file()]
         except Exception as e:
             logger.error(f"Error getting files from {directory}: {e}")
             return []
\ No newline at end of file
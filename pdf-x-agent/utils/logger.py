@@ -1,8 +1,18 @@
 import logging
+import logging.handlers
+import atexit
+import os
+import queue
 import sys
 from pathlib import Path
 from datetime import datetime
 
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate a day's log file past 10 MB
+LOG_BACKUP_COUNT = 5
+
+# One background listener per logger name, doing the console and file writes off the caller's thread
+_listeners = {}
+
 def setup_logger(name: str, log_level: str = "INFO") -> logging.Logger:
     """Setup and return a logger instance"""
     
@@ -16,6 +26,8 @@ def setup_logger(name: str, log_level: str = "INFO") -> logging.Logger:
     
     # Clear existing handlers
     logger.handlers.clear()
+    if name in _listeners:
+        _listeners.pop(name).stop()
     
     # Create formatters
     console_format = logging.Formatter(
@@ -30,15 +42,38 @@ def setup_logger(name: str, log_level: str = "INFO") -> logging.Logger:
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
     
     # File handler
     log_file = log_dir / f"{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+    )
     file_handler.setFormatter(file_format)
-    logger.addHandler(file_handler)
+    
+    # Log calls only enqueue the record; the listener thread formats and writes it
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler)
+    listener.start()
+    _listeners[name] = listener
     
     return logger
 
+@atexit.register
+def _stop_listeners():
+    """Flush queued records to the console and file before the interpreter exits"""
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+def _log_directly_in_child():
+    """Forked workers inherit the queue handler but not the listener thread, so they write directly"""
+    for name, listener in _listeners.items():
+        logging.getLogger(name).handlers = list(listener.handlers)
+    _listeners.clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_log_directly_in_child)
+
 # Create default logger
 logger = setup_logger("pdf_x_agent")
\ No newline at end of file